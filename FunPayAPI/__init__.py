@@ -1,6 +1,7 @@
 # START OF FILE FunPayCortex/FunPayAPI/__init__.py
 
 from .account import Account
+from .async_account import AsyncAccount
 from .updater.runner import Runner
 from .updater import events
 from .common import exceptions, utils, enums
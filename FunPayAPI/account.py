@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Literal, Any, Optional, IO
+from typing import TYPE_CHECKING, Literal, Any, Optional, IO, Callable, Generator, TypeVar
 
 import FunPayAPI.common.enums
 from FunPayAPI.common.utils import parse_currency, RegularExpressions
@@ -10,6 +10,7 @@ if TYPE_CHECKING:
 
 from requests_toolbelt import MultipartEncoder
 from bs4 import BeautifulSoup
+from lxml import html as lxml_html, etree
 from datetime import datetime, timedelta
 
 import tls_client
@@ -27,8 +28,47 @@ from . import types
 from .common import exceptions, utils, enums
 
 logger = logging.getLogger("FunPayAPI.account")
+
+
+def _has_class(class_name: str) -> str:
+    """
+    Возвращает XPath-условие "у элемента есть класс class_name" (аналог поиска по классу в BeautifulSoup).
+    """
+    return f'contains(concat(" ", normalize-space(@class), " "), " {class_name} ")'
+
+
+def _first(element, xpath: str):
+    """
+    Возвращает первый элемент, найденный по XPath, или :obj:`None`.
+    """
+    result = element.xpath(xpath)
+    return result[0] if result else None
+
+
+SALES_ROWS_XPATH = etree.XPath(f'//a[{_has_class("tc-item")}]')
+"""Строки заказов на странице продаж (https://funpay.com/orders/trade)."""
+SALES_ROW_FIELDS = frozenset(("tc-order", "order-desc", "tc-price", "media-user-name", "text-muted", "tc-date-time"))
+"""Классы элементов строки заказа, из которых берутся поля заказа (берется первый элемент с классом)."""
+SALES_DATE_RE = re.compile(r"\s*(?:(сегодня|сьогодні|today|вчера|вчора|yesterday)|(\d{1,2})\s+(\S+?)(?:\s+(\d{4}))?),"
+                           r"\s*(\d{1,2}):(\d{2})")
+"""Дата заказа: "сегодня, 12:34", "вчера, 12:34", "5 мая, 12:34" или "5 мая 2023, 12:34"."""
+SALES_YESTERDAY_WORDS = frozenset(("вчера", "вчора", "yesterday"))
+"""Слова "вчера" в дате заказа."""
 PRIVATE_CHAT_ID_RE = re.compile(r"users-\d+-\d+$")
 
+_T = TypeVar("_T")
+Steps = Generator[tuple[tuple, dict], Any, _T]
+"""Генератор запросов операции: отдает аргументы :meth:`Account.method` (см. :func:`_request`), получает ответы
+и возвращает результат операции (см. :meth:`Account._run_steps`)."""
+
+
+def _request(request_method: Literal["post", "get"], api_method: str, headers: dict, payload: Any,
+             **kwargs) -> tuple[tuple, dict]:
+    """
+    Упаковывает аргументы :meth:`Account.method` для генератора запросов.
+    """
+    return (request_method, api_method, headers, payload), kwargs
+
 
 class Account:
     def __init__(self, golden_key: str, user_agent: str | None = None,
@@ -57,6 +97,15 @@ class Account:
         self.last_429_err_time: float = 0
         self.last_flood_err_time: float = 0
         self.last_multiuser_flood_err_time: float = 0
+        self.keep_order_html: bool = True
+        """Сохранять ли HTML страницы заказа в :attr:`FunPayAPI.types.Order.html` (по умолчанию в :meth:`get_order`)."""
+        self.keep_html: bool = True
+        """Сохранять ли HTML код в объектах сообщений, чатов, заказов и лотов (:attr:`FunPayAPI.types.Message.html`,
+        :attr:`FunPayAPI.types.ChatShortcut.html` и т.д.). Если HTML никому не нужен, выключение заметно уменьшает
+        расход памяти (и экономит сериализацию HTML)."""
+        self.request_hook: Callable[[str, int, float], None] | None = None
+        """Вызывается после каждой попытки запроса в :meth:`method` с аргументами: api_method, код ответа
+        (0 - ошибка соединения), время запроса (в секундах). Используется для сбора метрик."""
         self.__locale: Literal["ru", "en", "uk"] | None = None
         self.__default_locale: Literal["ru", "en", "uk"] | None = locale
         self.__profile_parse_locale: Literal["ru", "en", "uk"] | None = locale
@@ -120,13 +169,15 @@ class Account:
         if hasattr(self._thread_local, "session"):
             self._thread_local.session.proxies = value if value else {}
 
-    def method(self, request_method: Literal["post", "get"], api_method: str, headers: dict, payload: Any,
-               exclude_phpsessid: bool = False, raise_not_200: bool = False,
-               locale: Literal["ru", "en", "uk"] | None = None) -> requests.Response:
-        
-        # ИЗМЕНЕНИЕ: Убрана принудительная проверка наличия прокси
-        # if not self._proxy: ... raise ... (УДАЛЕНО)
-        
+    def _prepare_request(self, request_method: Literal["post", "get"], api_method: str, headers: dict, payload: Any,
+                         exclude_phpsessid: bool = False,
+                         locale: Literal["ru", "en", "uk"] | None = None) -> tuple[str, dict, Any]:
+        """
+        Готовит запрос к FunPay (общая часть :meth:`method` и
+        :meth:`FunPayAPI.async_account.AsyncAccount.method`).
+
+        :return: (URL, заголовки, тело запроса).
+        """
         def normalize_url(api_method: str, locale: Literal["ru", "en", "uk"] | None = None) -> str:
             api_method = "https://funpay.com/" if api_method == "https://funpay.com" else api_method
             url = api_method if api_method.startswith("https://funpay.com/") else "https://funpay.com/" + api_method
@@ -165,7 +216,17 @@ class Account:
         if isinstance(payload, MultipartEncoder):
             data_arg = payload.to_string()
             req_headers["Content-Type"] = payload.content_type
+        return link, req_headers, data_arg
 
+    def method(self, request_method: Literal["post", "get"], api_method: str, headers: dict, payload: Any,
+               exclude_phpsessid: bool = False, raise_not_200: bool = False,
+               locale: Literal["ru", "en", "uk"] | None = None) -> requests.Response:
+        
+        # ИЗМЕНЕНИЕ: Убрана принудительная проверка наличия прокси
+        # if not self._proxy: ... raise ... (УДАЛЕНО)
+        
+        link, req_headers, data_arg = self._prepare_request(request_method, api_method, headers, payload,
+                                                            exclude_phpsessid, locale)
         response = None
         attempts = 5
         
@@ -179,6 +240,7 @@ class Account:
             current_session.proxies = {}
 
         for i in range(attempts):
+            start = time.perf_counter()
             try:
                 response = current_session.execute_request(
                     method=request_method.upper(),
@@ -188,6 +250,8 @@ class Account:
                     timeout_seconds=self.requests_timeout,
                     allow_redirects=True
                 )
+                if self.request_hook:
+                    self.request_hook(api_method, response.status_code, time.perf_counter() - start)
                 
                 if response.status_code == 429:
                     self.last_429_err_time = time.time()
@@ -202,6 +266,8 @@ class Account:
                 
             except Exception as e:
                 logger.error(f"Ошибка tls_client: {e}")
+                if self.request_hook:
+                    self.request_hook(api_method, 0, time.perf_counter() - start)
                 if i == attempts - 1:
                     fake_resp = requests.Response()
                     fake_resp.status_code = 0
@@ -209,6 +275,13 @@ class Account:
                     raise exceptions.RequestFailedError(fake_resp)
                 time.sleep(1)
 
+        return self._check_response(response, link, raise_not_200, current_session)
+
+    def _check_response(self, response, link: str, raise_not_200: bool, session) -> requests.Response:
+        """
+        Дополняет ответ tls_client атрибутами requests.Response и проверяет код ответа
+        (общая часть :meth:`method` и :meth:`FunPayAPI.async_account.AsyncAccount.method`).
+        """
         if not hasattr(response, 'json'):
             def json_func():
                 return json.loads(response.text)
@@ -219,7 +292,7 @@ class Account:
 
         if not hasattr(response, 'cookies'):
             response.cookies = requests.cookies.RequestsCookieJar()
-            for cookie_name, cookie_val in current_session.cookies.items():
+            for cookie_name, cookie_val in session.cookies.items():
                 response.cookies.set(cookie_name, cookie_val)
 
         if response.status_code == 403:
@@ -240,7 +313,26 @@ class Account:
             r.headers = response.headers
             raise exceptions.RequestFailedError(r)
             
-        return response            
+        return response
+
+    def _run_steps(self, steps: Steps[_T]) -> _T:
+        """
+        Выполняет операцию, описанную генератором запросов: запросы генератора отправляются через :meth:`method`,
+        а ответы передаются обратно в генератор.
+
+        Подготовка запросов и разбор ответов живут в генераторе, поэтому :class:`FunPayAPI.async_account.AsyncAccount`
+        выполняет те же операции, отправляя запросы асинхронно.
+
+        :param steps: генератор запросов.
+
+        :return: результат операции.
+        """
+        try:
+            args, kwargs = next(steps)
+            while True:
+                args, kwargs = steps.send(self.method(*args, **kwargs))
+        except StopIteration as e:
+            return e.value
 
     def get(self, update_phpsessid: bool = True) -> Account:
         if not self.is_initiated:
@@ -403,7 +495,7 @@ class Account:
                     del attributes[i]
 
             lot_obj = types.LotShortcut(offer_id, server, description, amount, price, currency, subcategory_obj, seller,
-                                        auto, promo, attributes, str(offer))
+                                        auto, promo, attributes, str(offer) if self.keep_html else None)
             result.append(lot_obj)
         return result
 
@@ -454,7 +546,7 @@ class Account:
             amount = int(amount) if amount and amount.isdigit() else None
             active = "warning" not in offer.get("class", [])
             lot_obj = types.MyLotShortcut(offer_id, server, description, amount, price, currency, subcategory_obj,
-                                          auto, active, str(offer))
+                                          auto, active, str(offer) if self.keep_html else None)
             result.append(lot_obj)
         return result
 
@@ -564,6 +656,13 @@ class Account:
 
     def get_chats_histories(self, chats_data: dict[int | str, str | None],
                             interlocutor_ids: list[int] | None = None) -> dict[int, list[types.Message]]:
+        return self._run_steps(self._get_chats_histories_steps(chats_data, interlocutor_ids))
+
+    def _get_chats_histories_steps(self, chats_data: dict[int | str, str | None],
+                                   interlocutor_ids: list[int] | None = None) -> Steps[dict[int, list[types.Message]]]:
+        """
+        Генератор запросов :meth:`get_chats_histories` (см. :meth:`_run_steps`).
+        """
         headers = {
             "accept": "*/*",
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
@@ -580,7 +679,7 @@ class Account:
             "request": False,
             "csrf_token": self.csrf_token
         }
-        response = self.method("post", "runner/", headers, payload, raise_not_200=True)
+        response = yield _request("post", "runner/", headers, payload, raise_not_200=True)
         json_response = response.json()
 
         result = {}
@@ -664,6 +763,18 @@ class Account:
                      interlocutor_id: Optional[int] = None,
                      image_id: Optional[int] = None, add_to_ignore_list: bool = True,
                      update_last_saved_message: bool = False, leave_as_unread: bool = False) -> types.Message:
+        return self._run_steps(self._send_message_steps(chat_id, text, chat_name, interlocutor_id, image_id,
+                                                        add_to_ignore_list, update_last_saved_message,
+                                                        leave_as_unread))
+
+    def _send_message_steps(self, chat_id: int | str, text: Optional[str] = None, chat_name: Optional[str] = None,
+                            interlocutor_id: Optional[int] = None,
+                            image_id: Optional[int] = None, add_to_ignore_list: bool = True,
+                            update_last_saved_message: bool = False,
+                            leave_as_unread: bool = False) -> Steps[types.Message]:
+        """
+        Генератор запросов :meth:`send_message` (см. :meth:`_run_steps`).
+        """
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
@@ -697,7 +808,7 @@ class Account:
             "csrf_token": self.csrf_token
         }
 
-        response = self.method("post", "runner/", headers, payload, raise_not_200=True)
+        response = yield _request("post", "runner/", headers, payload, raise_not_200=True)
         json_response = response.json()
         if not (resp := json_response.get("response")):
              r = requests.Response()
@@ -734,7 +845,7 @@ class Account:
             </div>
             """
             message_obj = types.Message(0, message_text, chat_id, chat_name, interlocutor_id, self.username, self.id,
-                                        fake_html, None,
+                                        fake_html if self.keep_html else None, None,
                                         None)
         else:
             mes = json_response["objects"][0]["data"]["messages"][-1]
@@ -756,7 +867,7 @@ class Account:
                 raise e
             message_obj = types.Message(int(mes["id"]), message_text, chat_id, chat_name, interlocutor_id,
                                         self.username, self.id,
-                                        mes["html"], image_link, image_name)
+                                        mes["html"] if self.keep_html else None, image_link, image_name)
         if self.runner and isinstance(chat_id, int):
             if add_to_ignore_list and message_obj.id:
                 self.runner.mark_as_by_bot(chat_id, message_obj.id)
@@ -925,6 +1036,13 @@ class Account:
 
     def raise_lots(self, category_id: int, subcategories: Optional[list[int | types.SubCategory]] = None,
                    exclude: list[int] | None = None) -> bool:
+        return self._run_steps(self._raise_lots_steps(category_id, subcategories, exclude))
+
+    def _raise_lots_steps(self, category_id: int, subcategories: Optional[list[int | types.SubCategory]] = None,
+                          exclude: list[int] | None = None) -> Steps[bool]:
+        """
+        Генератор запросов :meth:`raise_lots` (см. :meth:`_run_steps`).
+        """
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         if not (category := self.get_category(category_id)):
@@ -956,7 +1074,7 @@ class Account:
             "node_ids[]": [i.id for i in subcats]
         }
 
-        response = self.method("post", "lots/raise", headers, payload, raise_not_200=True)
+        response = yield _request("post", "lots/raise", headers, payload, raise_not_200=True)
         json_response = response.json()
         logger.debug(f"Ответ FunPay (поднятие категорий): {json_response}.")
         
@@ -977,11 +1095,18 @@ class Account:
             raise exceptions.RaiseError(r, category, json_response.get("msg"), None)
 
     def get_user(self, user_id: int, locale: Literal["ru", "en", "uk"] | None = None) -> types.UserProfile:
+        return self._run_steps(self._get_user_steps(user_id, locale))
+
+    def _get_user_steps(self, user_id: int,
+                        locale: Literal["ru", "en", "uk"] | None = None) -> Steps[types.UserProfile]:
+        """
+        Генератор запросов :meth:`get_user` (см. :meth:`_run_steps`).
+        """
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         if not locale:
             locale = self.__profile_parse_locale
-        response = self.method("get", f"users/{user_id}/", {"accept": "*/*"}, {}, raise_not_200=True, locale=locale)
+        response = yield _request("get", f"users/{user_id}/", {"accept": "*/*"}, {}, raise_not_200=True, locale=locale)
         if locale:
             self.locale = self.__default_locale
         html_response = response.content.decode()
@@ -1043,7 +1168,7 @@ class Account:
                         self.currency = currency
                 lot_obj = types.LotShortcut(offer_id, server, description, amount, price, currency, subcategory_obj,
                                             None, auto,
-                                            None, None, str(j))
+                                            None, None, str(j) if self.keep_html else None)
                 user_obj.add_lot(lot_obj)
         return user_obj
 
@@ -1079,7 +1204,25 @@ class Account:
     def get_order_shortcut(self, order_id: str) -> types.OrderShortcut:
         return self.runner.saved_orders.get(order_id, self.get_sales(id=order_id)[1][0])
 
-    def get_order(self, order_id: str, locale: Literal["ru", "en", "uk"] | None = None) -> types.Order:
+    def get_order(self, order_id: str, locale: Literal["ru", "en", "uk"] | None = None,
+                  keep_html: bool | None = None) -> types.Order:
+        """
+        Получает полную информацию о заказе.
+
+        :param order_id: ID заказа.
+        :param locale: локаль, в которой нужно получить страницу заказа.
+        :param keep_html: сохранять ли HTML страницы в :attr:`FunPayAPI.types.Order.html`
+            (по умолчанию - :attr:`keep_order_html`).
+
+        :return: объект заказа.
+        """
+        return self._run_steps(self._get_order_steps(order_id, locale, keep_html))
+
+    def _get_order_steps(self, order_id: str, locale: Literal["ru", "en", "uk"] | None = None,
+                         keep_html: bool | None = None) -> Steps[types.Order]:
+        """
+        Генератор запросов :meth:`get_order` (см. :meth:`_run_steps`).
+        """
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         headers = {
@@ -1087,10 +1230,158 @@ class Account:
         }
         if not locale:
             locale = self.__order_parse_locale
-        response = self.method("get", f"orders/{order_id}/", headers, {}, raise_not_200=True, locale=locale)
+        response = yield _request("get", f"orders/{order_id}/", headers, {}, raise_not_200=True, locale=locale)
         if locale:
             self.locale = self.__default_locale
         html_response = response.content.decode()
+        try:
+            order = self.__parse_order_page(order_id, html_response, response)
+        except exceptions.UnauthorizedError:
+            raise
+        except Exception:
+            logger.debug(f"Не удалось разобрать страницу заказа {order_id} через lxml, использую BeautifulSoup.",
+                         exc_info=True)
+            order = self.__parse_order_page_bs(order_id, html_response, response)
+        if not (self.keep_order_html if keep_html is None else keep_html):
+            order.html = None
+        return order
+
+    def __parse_order_page(self, order_id: str, html_response: str, response) -> types.Order:
+        """
+        Разбирает страницу заказа через lxml: дерево строится в C, а граница параметров лота (<hr>)
+        определяется за один проход по документу вместо find_previous("hr") для каждого param-item.
+        """
+        root = lxml_html.fromstring(html_response)
+        if _first(root, f'//div[{_has_class("user-link-name")}]') is None:
+            r = requests.Response()
+            r.status_code = 403
+            r._content = response.content
+            r.url = f"orders/{order_id}/"
+            raise exceptions.UnauthorizedError(r)
+
+        self.__update_csrf_token(root)
+
+        if (span := _first(root, f'//span[{_has_class("text-warning")}]')) is not None and span.text_content() in (
+                "Возврат", "Повернення", "Refund"):
+            status = types.OrderStatuses.REFUNDED
+        elif (span := _first(root, f'//span[{_has_class("text-success")}]')) is not None and \
+                span.text_content() in ("Закрыт", "Закрито", "Closed"):
+            status = types.OrderStatuses.CLOSED
+        else:
+            status = types.OrderStatuses.PAID
+
+        short_description = None
+        full_description = None
+        sum_ = None
+        currency = FunPayAPI.common.enums.Currency.UNKNOWN
+        subcategory = None
+        order_secrets = []
+        stop_params = False
+        lot_params = []
+        buyer_params = {}
+
+        param_items, hr_seen = [], False
+        for element in root.iter("hr", "div"):
+            if element.tag == "hr":
+                hr_seen = True
+            elif "param-item" in (element.get("class") or "").split():
+                param_items.append((element, hr_seen))
+
+        amount = 1
+        for div, after_hr in param_items:
+            if (h := div.find(".//h5")) is None:
+                continue
+            if not stop_params and after_hr:
+                stop_params = True
+
+            h_text = h.text_content()
+            if h_text in ("Краткое описание", "Короткий опис", "Short description"):
+                stop_params = True
+                short_description = div.find(".//div").text_content()
+            elif h_text in ("Подробное описание", "Докладний опис", "Detailed description"):
+                stop_params = True
+                full_description = div.find(".//div").text_content()
+            elif h_text in ("Сумма", "Сума", "Total"):
+                sum_ = float(div.find(".//span").text_content().replace(" ", ""))
+                currency = parse_currency(div.find(".//strong").text_content())
+            elif h_text in ("Категория", "Категорія", "Category",
+                            "Валюта", "Currency"):
+                subcategory_link = div.find(".//a").get("href")
+                subcategory_split = subcategory_link.split("/")
+                subcategory_id = int(subcategory_split[-2])
+                subcategory_type = types.SubCategoryTypes.COMMON if "lots" in subcategory_link else \
+                    types.SubCategoryTypes.CURRENCY
+                subcategory = self.get_subcategory(subcategory_type, subcategory_id)
+            elif h_text in ("Оплаченный товар", "Оплаченные товары",
+                            "Оплачений товар", "Оплачені товари",
+                            "Paid product", "Paid products"):
+                order_secrets = [i.text_content() for i in div.xpath(f'.//span[{_has_class("secret-placeholder")}]')]
+            elif h_text in ("Количество", "Amount", "Кількість"):
+                div2 = _first(div, f'.//div[{_has_class("text-bold")}]')
+                if div2 is not None:
+                    match = RegularExpressions().PRODUCTS_AMOUNT_ORDER.fullmatch(div2.text_content())
+                    if match:
+                        amount = int(match.group(1).replace(" ", ""))
+            elif h_text in ("Відкрито", "Открыт", "Open"):
+                continue
+            elif h_text in ("Закрито", "Закрыт", "Closed"):
+                continue
+            elif not stop_params and h_text not in ("Игра", "Гра", "Game"):
+                div2 = div.find(".//div")
+                if div2 is not None:
+                    res = div2.text_content().strip()
+                    lot_params.append((h_text, res))
+            elif stop_params:
+                div2 = _first(div, f'.//div[{_has_class("text-bold")}]')
+                if div2 is not None:
+                    buyer_params[h_text] = div2.text_content()
+        if not stop_params:
+            lot_params = []
+
+        chat = _first(root, f'//div[{_has_class("chat-header")}]')
+        chat_link = _first(chat, f'.//div[{_has_class("media-user-name")}]').find(".//a")
+        interlocutor_name = chat_link.text_content()
+        interlocutor_id = int(chat_link.get("href").split("/")[-2])
+        nav_bar = _first(root, f'//ul[{_has_class("navbar-right")} and {_has_class("logged")}]')
+        active_item = _first(nav_bar, f'.//li[{_has_class("active")}]')
+        if any(i in active_item.find(".//a").text_content().strip() for i in ("Продажи", "Продажі", "Sales")):
+            buyer_id, buyer_username = interlocutor_id, interlocutor_name
+            seller_id, seller_username = self.id, self.username
+        else:
+            buyer_id, buyer_username = self.id, self.username
+            seller_id, seller_username = interlocutor_id, interlocutor_name
+        id1, id2 = sorted([buyer_id, seller_id])
+        chat_id = f"users-{id1}-{id2}"
+        review_obj = _first(root, f'//div[{_has_class("order-review")}]')
+        if (stars_obj := _first(review_obj, f'.//div[{_has_class("rating")}]')) is None:
+            stars, text = None, None
+        else:
+            stars = int(stars_obj.find(".//div").get("class").split()[0].split("rating")[1])
+            text = _first(review_obj, f'.//div[{_has_class("review-item-text")}]').text_content().strip()
+        hidden = _first(review_obj, f'.//span[{_has_class("text-warning")}]') is not None
+        if (reply_obj := _first(review_obj, f'.//div[{_has_class("review-item-answer")} and '
+                                            f'{_has_class("review-compiled-reply")}]')) is None:
+            reply = None
+        else:
+            reply = reply_obj.find(".//div").text_content().strip()
+
+        if all([not text, not reply]):
+            review = None
+        else:
+            review = types.Review(stars, text, reply, False,
+                                  lxml_html.tostring(review_obj, encoding="unicode", with_tail=False), hidden,
+                                  order_id, buyer_username, buyer_id,
+                                  bool(text and text.endswith(self.bot_character)),
+                                  bool(reply and reply.endswith(self.bot_character)))
+        return types.Order(order_id, status, subcategory, lot_params, buyer_params,
+                           short_description, full_description, amount,
+                           sum_, currency, buyer_id, buyer_username, seller_id, seller_username, chat_id,
+                           html_response, review, order_secrets)
+
+    def __parse_order_page_bs(self, order_id: str, html_response: str, response) -> types.Order:
+        """
+        Разбирает страницу заказа через BeautifulSoup (запасной вариант для :meth:`__parse_order_page`).
+        """
         parser = BeautifulSoup(html_response, "lxml")
         username = parser.find("div", {"class": "user-link-name"})
         if not username:
@@ -1203,11 +1494,10 @@ class Account:
             review = types.Review(stars, text, reply, False, str(review_obj), hidden, order_id, buyer_username,
                                   buyer_id, bool(text and text.endswith(self.bot_character)),
                                   bool(reply and reply.endswith(self.bot_character)))
-        order = types.Order(order_id, status, subcategory, lot_params, buyer_params,
-                            short_description, full_description, amount,
-                            sum_, currency, buyer_id, buyer_username, seller_id, seller_username, chat_id,
-                            html_response, review, order_secrets)
-        return order
+        return types.Order(order_id, status, subcategory, lot_params, buyer_params,
+                           short_description, full_description, amount,
+                           sum_, currency, buyer_id, buyer_username, seller_id, seller_username, chat_id,
+                           html_response, review, order_secrets)
 
     def get_sales(self, start_from: str | None = None, include_paid: bool = True, include_closed: bool = True,
                   include_refunded: bool = True, exclude_ids: list[str] | None = None,
@@ -1240,7 +1530,125 @@ class Account:
         if not start_from:
             self.locale = self.__default_locale
         html_response = response.content.decode()
+        args = (html_response, response, link, start_from, include_paid, include_closed, include_refunded,
+                exclude_ids, locale, sudcategories)
+        try:
+            return self.__parse_sales_page(*args)
+        except exceptions.UnauthorizedError:
+            raise
+        except Exception:
+            logger.debug("Не удалось разобрать страницу продаж через lxml, использую BeautifulSoup.", exc_info=True)
+            return self.__parse_sales_page_bs(*args)
+
+    def __parse_sales_page(self, html_response: str, response, link: str, start_from: str | None,
+                            include_paid: bool, include_closed: bool, include_refunded: bool,
+                            exclude_ids: list[str], locale: Literal["ru", "en", "uk"] | None,
+                            sudcategories: dict[str, types.SubCategory] | None) -> \
+            tuple[str | None, list[types.OrderShortcut], Literal["ru", "en", "uk"],
+            dict[str, types.SubCategory]]:
+        """
+        Разбирает страницу продаж через lxml: дерево строится в C, строки заказов выбираются одним
+        предкомпилированным XPath, а поля каждой строки собираются за один проход по ее элементам.
+        Даты "сегодня" / "вчера" и текущий год вычисляются один раз на страницу.
+        """
+        root = lxml_html.fromstring(html_response)
+        if not start_from:
+            if _first(root, f'//div[{_has_class("user-link-name")}]') is None:
+                r = requests.Response()
+                r.status_code = 403
+                r._content = response.content
+                r.url = link
+                raise exceptions.UnauthorizedError(r)
 
+        next_order_id = _first(root, '//input[@type="hidden" and @name="continue"]/@value')
+        next_order_id = str(next_order_id) if next_order_id else None
+
+        if not start_from:
+            sudcategories = dict()
+            app_data = json.loads(root.find("body").get("data-app-data"))
+            locale = app_data.get("locale")
+            self.csrf_token = app_data.get("csrf-token") or self.csrf_token
+            games_select = _first(root, '//select[@name="game"]')
+            if games_select is not None:
+                for game_option in games_select.xpath('.//option[@value != ""]'):
+                    game_name = game_option.text_content()
+                    for key, section_name in json.loads(game_option.get("data-data")):
+                        section_type, section_id = key.split("-")
+                        section_type = types.SubCategoryTypes.COMMON if section_type == "lot" \
+                            else types.SubCategoryTypes.CURRENCY
+                        sudcategories[f"{game_name}, {section_name}"] = self.get_subcategory(section_type,
+                                                                                            int(section_id))
+            else:
+                sudcategories = None
+
+        rows = SALES_ROWS_XPATH(root)
+        if not rows:
+            return None, [], locale, sudcategories
+
+        today = datetime.now()
+        yesterday = today - timedelta(days=1)
+        sales = []
+        for row in rows:
+            classname = row.get("class", "").split()
+            if "warning" in classname:
+                if not include_refunded:
+                    continue
+                order_status = types.OrderStatuses.REFUNDED
+            elif "info" in classname:
+                if not include_paid:
+                    continue
+                order_status = types.OrderStatuses.PAID
+            else:
+                if not include_closed:
+                    continue
+                order_status = types.OrderStatuses.CLOSED
+
+            fields = {}
+            for div in row.iter("div"):
+                for class_name in (div.get("class") or "").split():
+                    if class_name in SALES_ROW_FIELDS and class_name not in fields:
+                        fields[class_name] = div
+
+            order_id = fields["tc-order"].text_content()[1:]
+            if order_id in exclude_ids:
+                continue
+
+            description = fields["order-desc"].find(".//div").text_content()
+            price, currency = fields["tc-price"].text_content().rsplit(maxsplit=1)
+            price = float(price.replace(" ", ""))
+            currency = parse_currency(currency)
+
+            buyer_span = fields["media-user-name"].find(".//span")
+            buyer_username = buyer_span.text_content()
+            buyer_id = int(buyer_span.get("data-href")[:-1].split("/users/")[1])
+            subcategory_name = fields["text-muted"].text_content()
+            subcategory = sudcategories.get(subcategory_name) if sudcategories else None
+
+            day_word, day, month, year, h, m = SALES_DATE_RE.match(fields["tc-date-time"].text_content()).groups()
+            if day_word is None:
+                order_date = datetime(int(year) if year else today.year, utils.MONTHS[month], int(day), int(h), int(m))
+            else:
+                base = yesterday if day_word in SALES_YESTERDAY_WORDS else today
+                order_date = datetime(base.year, base.month, base.day, int(h), int(m))
+
+            id1, id2 = sorted([buyer_id, self.id])
+            order_obj = types.OrderShortcut(order_id, description, price, currency, buyer_username, buyer_id,
+                                            f"users-{id1}-{id2}", order_status, order_date, subcategory_name,
+                                            subcategory, lxml_html.tostring(row, encoding="unicode", with_tail=False)
+                                            if self.keep_html else None)
+            sales.append(order_obj)
+
+        return next_order_id, sales, locale, sudcategories
+
+    def __parse_sales_page_bs(self, html_response: str, response, link: str, start_from: str | None,
+                            include_paid: bool, include_closed: bool, include_refunded: bool,
+                            exclude_ids: list[str], locale: Literal["ru", "en", "uk"] | None,
+                            sudcategories: dict[str, types.SubCategory] | None) -> \
+            tuple[str | None, list[types.OrderShortcut], Literal["ru", "en", "uk"],
+            dict[str, types.SubCategory]]:
+        """
+        Разбирает страницу продаж через BeautifulSoup (запасной вариант, если не сработал :meth:`__parse_sales_page`).
+        """
         parser = BeautifulSoup(html_response, "lxml")
 
         if not start_from:
@@ -1335,7 +1743,8 @@ class Account:
             id1, id2 = sorted([buyer_id, self.id])
             chat_id = f"users-{id1}-{id2}"
             order_obj = types.OrderShortcut(order_id, description, price, currency, buyer_username, buyer_id, chat_id,
-                                            order_status, order_date, subcategory_name, subcategory, str(div))
+                                            order_status, order_date, subcategory_name, subcategory,
+                                            str(div) if self.keep_html else None)
             sales.append(order_obj)
 
         return next_order_id, sales, locale, sudcategories
@@ -1403,7 +1812,8 @@ class Account:
             elif last_msg_text.startswith(self.old_bot_character):
                 last_msg_text = last_msg_text[1:]
                 by_vertex = True
-            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text, node_msg_id, user_msg_id, unread, str(msg))
+            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text, node_msg_id, user_msg_id, unread,
+                                          str(msg) if self.keep_html else None)
             if not is_image:
                 chat_obj.last_by_bot = by_bot
                 chat_obj.last_by_vertex = by_vertex
@@ -1650,6 +2060,10 @@ class Account:
                          interlocutor_id: Optional[int] = None, interlocutor_username: Optional[str] = None,
                          from_id: int = 0) -> list[types.Message]:
         messages = []
+        # Данные, которые нужны второму проходу (после того, как собраны никнеймы и бейджи всех авторов):
+        # (текст метки "label-default" или None, ссылки на пользователей [(текст, href)]).
+        # Достаются из того же дерева, что и остальное, чтобы HTML каждого сообщения разбирался один раз.
+        extra_data = []
         ids = {self.id: self.username, 0: "FunPay"}
         badges = {}
         if interlocutor_id is not None:
@@ -1660,9 +2074,9 @@ class Account:
                 continue
             author_id = i["author"]
             parser = BeautifulSoup(i["html"].replace("<br>", "\n"), "lxml")
+            author_div = parser.find("div", {"class": "media-user-name"})
 
-            if None in [ids.get(author_id), badges.get(author_id)] and (
-                    author_div := parser.find("div", {"class": "media-user-name"})):
+            if None in [ids.get(author_id), badges.get(author_id)] and author_div:
                 if badges.get(author_id) is None:
                     badge = author_div.find("span", {"class": "chat-msg-author-label label label-success"})
                     badges[author_id] = badge.text if badge else 0
@@ -1698,18 +2112,23 @@ class Account:
                     by_bot = True
 
             message_obj = types.Message(i["id"], message_text, chat_id, interlocutor_username, interlocutor_id,
-                                        None, author_id, i["html"], image_link, image_name, determine_msg_type=False)
+                                        None, author_id, i["html"] if self.keep_html else None, image_link,
+                                        image_name, determine_msg_type=False)
             message_obj.by_bot = by_bot
             message_obj.by_vertex = by_vertex
             message_obj.type = types.MessageTypes.NON_SYSTEM if author_id != 0 else message_obj.get_message_type()
 
+            default_label = author_div.find("span", {
+                "class": "chat-msg-author-label label label-default"}) if author_div else None
+            users = [(a.text, a["href"]) for a in parser.find_all('a', href=lambda href: href and '/users/' in href)] \
+                if message_obj.type != types.MessageTypes.NON_SYSTEM else []
+            extra_data.append((default_label.text if default_label else None, users))
             messages.append(message_obj)
 
-        for i in messages:
+        for i, (default_label, users) in zip(messages, extra_data):
             i.author = ids.get(i.author_id)
             i.chat_name = interlocutor_username
             i.badge = badges.get(i.author_id) if badges.get(i.author_id) != 0 else None
-            parser = BeautifulSoup(i.html, "lxml")
             if i.badge:
                 i.is_employee = True
                 if i.badge in ("поддержка", "підтримка", "support"):
@@ -1718,18 +2137,14 @@ class Account:
                     i.is_moderation = True
                 elif i.badge in ("арбитраж", "арбітраж", "arbitration"):
                     i.is_arbitration = True
-            default_label = parser.find("div", {"class": "media-user-name"})
-            default_label = default_label.find("span", {
-                "class": "chat-msg-author-label label label-default"}) if default_label else None
             if default_label:
-                if default_label.text in ("автовідповідь", "автоответ", "auto-reply"):
+                if default_label in ("автовідповідь", "автоответ", "auto-reply"):
                     i.is_autoreply = True
-            i.badge = default_label.text if (i.badge is None and default_label is not None) else i.badge
+            i.badge = default_label if (i.badge is None and default_label is not None) else i.badge
             if i.type != types.MessageTypes.NON_SYSTEM:
-                users = parser.find_all('a', href=lambda href: href and '/users/' in href)
                 if users:
-                    i.initiator_username = users[0].text
-                    i.initiator_id = int(users[0]["href"].split("/")[-2])
+                    i.initiator_username = users[0][0]
+                    i.initiator_id = int(users[0][1].split("/")[-2])
                     if i.type in (types.MessageTypes.ORDER_PURCHASED, types.MessageTypes.ORDER_CONFIRMED,
                                   types.MessageTypes.NEW_FEEDBACK,
                                   types.MessageTypes.FEEDBACK_CHANGED,
@@ -1749,7 +2164,7 @@ class Account:
                             i.i_am_seller = False
                             i.i_am_buyer = True
                     elif len(users) > 1:
-                        last_user_id = int(users[-1]["href"].split("/")[-2])
+                        last_user_id = int(users[-1][1].split("/")[-2])
                         if i.type == types.MessageTypes.ORDER_CONFIRMED_BY_ADMIN:
                             if last_user_id == self.id:
                                 i.i_am_seller = True
@@ -0,0 +1,205 @@
+# START OF FILE FunPayCortex/FunPayAPI/async_account.py
+
+"""
+В данном модуле описан асинхронный (asyncio) клиент FunPay.
+
+Клиент не дублирует код :class:`FunPayAPI.account.Account`: операции Account описаны генераторами запросов
+(подготовка запроса и разбор ответа, см. :meth:`FunPayAPI.account.Account._run_steps`), а асинхронный клиент
+только отправляет эти запросы через ``tls_client.AsyncSession``. Состояние (csrf-токен, PHPSESSID, сохраненные
+чаты, Runner) у обоих клиентов общее.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Literal, Any, Optional, AsyncGenerator
+
+if TYPE_CHECKING:
+    from .account import Steps, _T
+    from .updater.runner import Runner
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import tls_client
+
+from .account import Account
+from .common import exceptions
+from . import types
+
+logger = logging.getLogger("FunPayAPI.async_account")
+
+
+class AsyncAccount:
+    """
+    Асинхронный (asyncio) клиент FunPay.
+
+    Запросы отправляются через ``tls_client.AsyncSession`` с тем же TLS-отпечатком браузера, что и у
+    :class:`FunPayAPI.account.Account`. Сам запрос tls_client выполняет в нативном коде (без GIL) в своем пуле,
+    поэтому ожидающие ответа корутины не занимают потоки программы, а одновременно выполняется до
+    max_concurrency запросов.
+
+    :param account: синхронный аккаунт, уже инициализированный через :meth:`FunPayAPI.account.Account.get`.
+    :type account: :class:`FunPayAPI.account.Account`
+
+    :param max_concurrency: максимальное кол-во одновременных запросов.
+    :type max_concurrency: :obj:`int`, опционально
+    """
+    def __init__(self, account: Account, max_concurrency: int = 64):
+        self.account: Account = account
+        """Синхронный аккаунт (общее состояние и разбор ответов)."""
+        self.max_concurrency: int = max_concurrency
+        """Максимальное кол-во одновременных запросов."""
+        self.__executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="AsyncAccount")
+        self.__semaphore = asyncio.Semaphore(max_concurrency)
+        self.session: tls_client.AsyncSession = tls_client.AsyncSession(client_identifier="chrome_120",
+                                                                        random_tls_extension_order=True,
+                                                                        executor=self.__executor)
+        """Асинхронная сессия tls_client."""
+
+    async def method(self, request_method: Literal["post", "get"], api_method: str, headers: dict, payload: Any,
+                     exclude_phpsessid: bool = False, raise_not_200: bool = False,
+                     locale: Literal["ru", "en", "uk"] | None = None) -> requests.Response:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account.method` (с теми же повторами при 429, 5xx
+        и ошибках соединения).
+        """
+        account = self.account
+        link, req_headers, data_arg = account._prepare_request(request_method, api_method, headers, payload,
+                                                               exclude_phpsessid, locale)
+        self.session.proxies = account.proxy or {}
+
+        response = None
+        attempts = 5
+        for i in range(attempts):
+            start = time.perf_counter()
+            try:
+                async with self.__semaphore:
+                    response = await self.session.execute_request(method=request_method.upper(), url=link,
+                                                                  headers=req_headers, data=data_arg,
+                                                                  timeout_seconds=account.requests_timeout,
+                                                                  allow_redirects=True)
+            except Exception as e:
+                logger.error(f"Ошибка tls_client: {e}")
+                if account.request_hook:
+                    account.request_hook(api_method, 0, time.perf_counter() - start)
+                if i == attempts - 1:
+                    fake_resp = requests.Response()
+                    fake_resp.status_code = 0
+                    fake_resp.url = link
+                    raise exceptions.RequestFailedError(fake_resp)
+                await asyncio.sleep(1)
+                continue
+
+            if account.request_hook:
+                account.request_hook(api_method, response.status_code, time.perf_counter() - start)
+            if response.status_code == 429:
+                account.last_429_err_time = time.time()
+                await asyncio.sleep(min(2 ** (i + 1), 15))
+                continue
+            if 500 <= response.status_code < 600:
+                await asyncio.sleep(1)
+                continue
+            break
+
+        return account._check_response(response, link, raise_not_200, self.session)
+
+    async def _run_steps(self, steps: Steps[_T]) -> _T:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account._run_steps`: запросы генератора отправляются через
+        :meth:`method`.
+        """
+        try:
+            args, kwargs = next(steps)
+            while True:
+                args, kwargs = steps.send(await self.method(*args, **kwargs))
+        except StopIteration as e:
+            return e.value
+
+    async def get_chats_histories(self, chats_data: dict[int | str, str | None],
+                                  interlocutor_ids: list[int] | None = None) -> dict[int, list[types.Message]]:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account.get_chats_histories`.
+        """
+        return await self._run_steps(self.account._get_chats_histories_steps(chats_data, interlocutor_ids))
+
+    async def send_message(self, chat_id: int | str, text: Optional[str] = None, chat_name: Optional[str] = None,
+                           interlocutor_id: Optional[int] = None,
+                           image_id: Optional[int] = None, add_to_ignore_list: bool = True,
+                           update_last_saved_message: bool = False, leave_as_unread: bool = False) -> types.Message:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account.send_message`.
+        """
+        return await self._run_steps(self.account._send_message_steps(chat_id, text, chat_name, interlocutor_id,
+                                                                      image_id, add_to_ignore_list,
+                                                                      update_last_saved_message, leave_as_unread))
+
+    async def get_order(self, order_id: str, locale: Literal["ru", "en", "uk"] | None = None,
+                        keep_html: bool | None = None) -> types.Order:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account.get_order`.
+        """
+        return await self._run_steps(self.account._get_order_steps(order_id, locale, keep_html))
+
+    async def get_user(self, user_id: int, locale: Literal["ru", "en", "uk"] | None = None) -> types.UserProfile:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account.get_user`.
+        """
+        return await self._run_steps(self.account._get_user_steps(user_id, locale))
+
+    async def raise_lots(self, category_id: int, subcategories: Optional[list[int | types.SubCategory]] = None,
+                         exclude: list[int] | None = None) -> bool:
+        """
+        Асинхронная версия :meth:`FunPayAPI.account.Account.raise_lots`.
+        """
+        return await self._run_steps(self.account._raise_lots_steps(category_id, subcategories, exclude))
+
+    def __runner(self) -> Runner:
+        if not self.account.runner:
+            raise Exception("К аккаунту не привязан Runner!")
+        return self.account.runner
+
+    async def get_updates(self) -> dict:
+        """
+        Асинхронная версия :meth:`FunPayAPI.updater.runner.Runner.get_updates` (к аккаунту должен быть привязан
+        Runner).
+        """
+        return await self._run_steps(self.__runner()._get_updates_steps())
+
+    async def listen(self, requests_delay: int | float = 6.0,
+                     ignore_exceptions: bool = True) -> AsyncGenerator:
+        """
+        Асинхронный цикл получения событий (аналог :meth:`FunPayAPI.updater.runner.Runner.listen`).
+
+        Запрос к runner'у выполняется асинхронно. Разбор ответа выполняется в отдельном потоке, т.к. Runner
+        догружает истории чатов синхронно.
+
+        :param requests_delay: задержка между запросами (в секундах).
+        :param ignore_exceptions: игнорировать ли ошибки запросов.
+        """
+        runner = self.__runner()
+        events_to_process = []
+        while True:
+            runner.last_activity = time.time()
+            try:
+                updates = await self.get_updates()
+                runner.update_tags(updates)
+                events_to_process.extend(await asyncio.to_thread(runner.parse_updates, updates))
+                ready_events, events_to_process = runner.split_ready_events(events_to_process)
+                for event in ready_events:
+                    yield event
+            except Exception:
+                if not ignore_exceptions:
+                    raise
+                logger.error("Произошла ошибка при получении событий.", exc_info=True)
+            await asyncio.sleep(runner.get_sleep_time(requests_delay))
+
+    async def close(self):
+        """
+        Закрывает сессию tls_client и останавливает пул запросов (дожидаясь уже начатых запросов).
+        """
+        await self.session.close()
+        await asyncio.to_thread(self.__executor.shutdown, wait=True)
+
+# END OF FILE FunPayCortex/FunPayAPI/async_account.py
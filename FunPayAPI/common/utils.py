@@ -97,6 +97,9 @@ class RegularExpressions(object):
         return getattr(cls, "instance")
 
     def __init__(self):
+        # Singleton: выражения компилируются один раз, повторные "создания" объекта ничего не делают.
+        if hasattr(self, "ORDER_PURCHASED"):
+            return
         self.ORDER_PURCHASED = \
             re.compile(r"(Покупатель|The buyer) [a-zA-Z0-9]+ (оплатил заказ|has paid for order) #[A-Z0-9]{8}\.")
         """
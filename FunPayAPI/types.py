@@ -11,11 +11,33 @@ from .common.utils import RegularExpressions
 from .common.enums import MessageTypes, OrderStatuses, SubCategoryTypes, Currency
 import datetime
 
+_RES = RegularExpressions()
+_BUYER = ("Покупатель", "The buyer")
+_SELLER = ("Продавец", "The seller")
+_ADMIN = ("Администратор", "The administrator")
+_SYSTEM_MESSAGE_TYPES = (
+    # (тип, регулярное выражение, ключевые слова - хотя бы одно из них обязано быть в тексте, чтобы выражение совпало)
+    # Порядок - от самых часто-используемых к самым редко-используемым.
+    (MessageTypes.ORDER_CONFIRMED, _RES.ORDER_CONFIRMED, _BUYER),
+    (MessageTypes.NEW_FEEDBACK, _RES.NEW_FEEDBACK, _BUYER),
+    (MessageTypes.NEW_FEEDBACK_ANSWER, _RES.NEW_FEEDBACK_ANSWER, _SELLER),
+    (MessageTypes.FEEDBACK_CHANGED, _RES.FEEDBACK_CHANGED, _BUYER),
+    (MessageTypes.FEEDBACK_DELETED, _RES.FEEDBACK_DELETED, _BUYER),
+    (MessageTypes.REFUND, _RES.REFUND, _SELLER),
+    (MessageTypes.FEEDBACK_ANSWER_CHANGED, _RES.FEEDBACK_ANSWER_CHANGED, _SELLER),
+    (MessageTypes.FEEDBACK_ANSWER_DELETED, _RES.FEEDBACK_ANSWER_DELETED, _SELLER),
+    (MessageTypes.ORDER_CONFIRMED_BY_ADMIN, _RES.ORDER_CONFIRMED_BY_ADMIN, _ADMIN),
+    (MessageTypes.PARTIAL_REFUND, _RES.PARTIAL_REFUND, ("Часть средств по заказу", "A part of the funds")),
+    (MessageTypes.ORDER_REOPENED, _RES.ORDER_REOPENED, ("Заказ", "Order")),
+    (MessageTypes.REFUND_BY_ADMIN, _RES.REFUND_BY_ADMIN, _ADMIN)
+)
+
 
 class BaseOrderInfo:
     """
     Класс, представляющий информацию о заказе.
     """
+    __slots__ = ("_order", "_order_attempt_made", "_order_attempt_error")
 
     def __init__(self):
         self._order: Order | None = None
@@ -42,15 +64,18 @@ class ChatShortcut(BaseOrderInfo):
     :param unread: флаг "непрочитанности" (`True`, если чат не прочитан (оранжевый). `False`, если чат прочитан).
     :type unread: :obj:`bool`
 
-    :param html: HTML код виджета чата.
-    :type html: :obj:`str`
+    :param html: HTML код виджета чата (:obj:`None`, если не сохраняется, см.
+        :attr:`FunPayAPI.account.Account.keep_html`).
+    :type html: :obj:`str` or :obj:`None`
 
     :param determine_msg_type: определять ли тип последнего сообщения?
     :type determine_msg_type: :obj:`bool`, опционально
     """
+    __slots__ = ("id", "name", "last_message_text", "last_by_bot", "last_by_vertex", "unread", "node_msg_id",
+                 "user_msg_id", "last_message_type", "html")
 
     def __init__(self, id_: int, name: str, last_message_text: str, node_msg_id: int, user_msg_id: int,
-                 unread: bool, html: str, determine_msg_type: bool = True):
+                 unread: bool, html: str | None, determine_msg_type: bool = True):
         self.id: int = id_
         """ID чата."""
         self.name: str | None = name if name else None
@@ -69,7 +94,7 @@ class ChatShortcut(BaseOrderInfo):
         """ID последнего прочитанного сообщения."""
         self.last_message_type: MessageTypes | None = None if not determine_msg_type else self.get_last_message_type()
         """Тип последнего сообщения."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код виджета чата."""
         BaseOrderInfo.__init__(self)
 
@@ -205,8 +230,9 @@ class Message(BaseOrderInfo):
     :param author_id: ID автора сообщения.
     :type author_id: :obj:`int`
 
-    :param html: HTML код сообщения.
-    :type html: :obj:`str`
+    :param html: HTML код сообщения (:obj:`None`, если не сохраняется, см.
+        :attr:`FunPayAPI.account.Account.keep_html`).
+    :type html: :obj:`str` or :obj:`None`
 
     :param image_link: ссылка на изображение из сообщения (если есть).
     :type image_link: :obj:`str` or :obj:`None`, опционально
@@ -214,10 +240,14 @@ class Message(BaseOrderInfo):
     :param determine_msg_type: определять ли тип сообщения.
     :type determine_msg_type: :obj:`bool`, опционально
     """
+    __slots__ = ("id", "text", "chat_id", "chat_name", "interlocutor_id", "buyer_viewing", "type", "author",
+                 "author_id", "html", "image_link", "image_name", "by_bot", "by_vertex", "badge", "is_employee",
+                 "is_support", "is_moderation", "is_arbitration", "is_autoreply", "initiator_username",
+                 "initiator_id", "i_am_seller", "i_am_buyer")
 
     def __init__(self, id_: int, text: str | None, chat_id: int | str, chat_name: str | None,
                  interlocutor_id: int | None,
-                 author: str | None, author_id: int, html: str,
+                 author: str | None, author_id: int, html: str | None,
                  image_link: str | None = None, image_name: str | None = None,
                  determine_msg_type: bool = True, badge_text: Optional[str] = None):
         self.id: int = id_
@@ -238,7 +268,7 @@ class Message(BaseOrderInfo):
         """Автор сообщения."""
         self.author_id: int = author_id
         """ID автора сообщения."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML-код сообщения."""
         self.image_link: str | None = image_link
         """Ссылка на изображение в сообщении (если оно есть)."""
@@ -283,43 +313,32 @@ class Message(BaseOrderInfo):
         :return: тип последнего сообщения в чате.
         :rtype: :class:`FunPayAPI.common.enums.MessageTypes`
         """
-        if not self.text:
+        text = self.text
+        if not text:
             return MessageTypes.NON_SYSTEM
 
-        res = RegularExpressions()
-        if res.DISCORD.search(self.text):
+        # Перед каждым регулярным выражением проверяется дешевое условие: ключевое слово, без которого
+        # выражение заведомо не совпадет. Порядок проверок (а значит и результат) тот же, что и раньше.
+        if "Discord" in text and _RES.DISCORD.search(text):
             return MessageTypes.DISCORD
-        if res.DEAR_VENDORS.search(self.text):
+        if ("Уважаемые продавцы" in text or "Dear vendors" in text) and _RES.DEAR_VENDORS.search(text):
             return MessageTypes.DEAR_VENDORS
 
-        if res.ORDER_PURCHASED.findall(self.text) and res.ORDER_PURCHASED2.findall(self.text):
-            return MessageTypes.ORDER_PURCHASED
-
-        if res.ORDER_ID.search(self.text) is None:
+        if "#" not in text:
             return MessageTypes.NON_SYSTEM
 
-        # Регулярные выражения выставлены в порядке от самых часто-используемых к самым редко-используемым
-        sys_msg_types = {
-            MessageTypes.ORDER_CONFIRMED: res.ORDER_CONFIRMED,
-            MessageTypes.NEW_FEEDBACK: res.NEW_FEEDBACK,
-            MessageTypes.NEW_FEEDBACK_ANSWER: res.NEW_FEEDBACK_ANSWER,
-            MessageTypes.FEEDBACK_CHANGED: res.FEEDBACK_CHANGED,
-            MessageTypes.FEEDBACK_DELETED: res.FEEDBACK_DELETED,
-            MessageTypes.REFUND: res.REFUND,
-            MessageTypes.FEEDBACK_ANSWER_CHANGED: res.FEEDBACK_ANSWER_CHANGED,
-            MessageTypes.FEEDBACK_ANSWER_DELETED: res.FEEDBACK_ANSWER_DELETED,
-            MessageTypes.ORDER_CONFIRMED_BY_ADMIN: res.ORDER_CONFIRMED_BY_ADMIN,
-            MessageTypes.PARTIAL_REFUND: res.PARTIAL_REFUND,
-            MessageTypes.ORDER_REOPENED: res.ORDER_REOPENED,
-            MessageTypes.REFUND_BY_ADMIN: res.REFUND_BY_ADMIN
-        }
+        if any(i in text for i in _BUYER) and _RES.ORDER_PURCHASED.search(text) \
+                and _RES.ORDER_PURCHASED2.search(text):
+            return MessageTypes.ORDER_PURCHASED
 
-        for i in sys_msg_types:
-            if sys_msg_types[i].search(self.text):
-                return i
-        else:
+        if _RES.ORDER_ID.search(text) is None:
             return MessageTypes.NON_SYSTEM
 
+        for message_type, regex, keywords in _SYSTEM_MESSAGE_TYPES:
+            if any(i in text for i in keywords) and regex.search(text):
+                return message_type
+        return MessageTypes.NON_SYSTEM
+
     def __str__(self):
         return self.text if self.text is not None else self.image_link if self.image_link is not None else ""
 
@@ -361,17 +380,20 @@ class OrderShortcut(BaseOrderInfo):
     :param subcategory: подкатегория, к которой относится заказ.
     :type subcategory: :class:`FunPayAPI.types.SubCategory` or :obj:`None`
 
-    :param html: HTML код виджета заказа.
-    :type html: :obj:`str`
+    :param html: HTML код виджета заказа (:obj:`None`, если не сохраняется, см.
+        :attr:`FunPayAPI.account.Account.keep_html`).
+    :type html: :obj:`str` or :obj:`None`
 
     :param dont_search_amount: не искать кол-во товара.
     :type dont_search_amount: :obj:`bool`, опционально
     """
+    __slots__ = ("id", "description", "price", "currency", "amount", "buyer_username", "buyer_id", "chat_id",
+                 "status", "date", "subcategory_name", "subcategory", "html")
 
     def __init__(self, id_: str, description: str, price: float, currency: Currency,
                  buyer_username: str, buyer_id: int, chat_id: int | str, status: OrderStatuses,
                  date: datetime.datetime, subcategory_name: str, subcategory: SubCategory | None,
-                 html: str, dont_search_amount: bool = False):
+                 html: str | None, dont_search_amount: bool = False):
         self.id: str = id_ if not id_.startswith("#") else id_[1:]
         """ID заказа."""
         self.description: str = description
@@ -396,7 +418,7 @@ class OrderShortcut(BaseOrderInfo):
         """Название подкатегории, к которой относится заказ."""
         self.subcategory: SubCategory | None = subcategory
         """Подкатегория, к которой относится заказ."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код виджета заказа."""
         BaseOrderInfo.__init__(self)
 
@@ -460,8 +482,8 @@ class Order:
     :param chat_id: ID чата (или его текстовое обозначение).
     :type chat_id: :obj:`int` or :obj:`str`
 
-    :param html: HTML код заказа.
-    :type html: :obj:`str`
+    :param html: HTML код заказа (:obj:`None`, если не сохраняется, см. :attr:`FunPayAPI.account.Account.keep_order_html`).
+    :type html: :obj:`str` or :obj:`None`
 
     :param review: объект отзыва на заказ.
     :type review: :class:`FunPayAPI.types.Review` or :obj:`None`
@@ -506,7 +528,7 @@ class Order:
         """Никнейм продавца."""
         self.chat_id: str | int = chat_id
         """ID чата."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код заказа."""
         self.review: Review | None = review
         """Объект отзыва заказа."""
@@ -881,15 +903,18 @@ class LotShortcut:
     :param subcategory: подкатегория лота.
     :type subcategory: :class:`FunPayAPI.types.SubCategory`
 
-    :param html: HTML код виджета лота.
-    :type html: :obj:`str`
+    :param html: HTML код виджета лота (:obj:`None`, если не сохраняется, см.
+        :attr:`FunPayAPI.account.Account.keep_html`).
+    :type html: :obj:`str` or :obj:`None`
     """
+    __slots__ = ("id", "server", "description", "title", "amount", "price", "currency", "seller", "auto", "promo",
+                 "attributes", "subcategory", "html", "public_link")
 
     def __init__(self, id_: int | str, server: str | None,
                  description: str | None, amount: int | None, price: float, currency: Currency,
                  subcategory: SubCategory | None,
                  seller: SellerShortcut | None, auto: bool, promo: bool | None, attributes: dict[str, int | str] | None,
-                 html: str):
+                 html: str | None):
         self.id: int | str = id_
         if isinstance(self.id, str) and self.id.isnumeric():
             self.id = int(self.id)
@@ -916,7 +941,7 @@ class LotShortcut:
         """Атрибуты лота (только для лотов из таблицы)"""
         self.subcategory: SubCategory = subcategory
         """Подкатегория лота."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML-код виджета лота."""
         self.public_link: str = f"https://funpay.com/chips/offer?id={self.id}" \
             if self.subcategory.type is SubCategoryTypes.CURRENCY else f"https://funpay.com/lots/offer?id={self.id}"
@@ -945,14 +970,17 @@ class MyLotShortcut:
     :param subcategory: подкатегория лота.
     :type subcategory: :class:`FunPayAPI.types.SubCategory`
 
-    :param html: HTML код виджета лота.
-    :type html: :obj:`str`
+    :param html: HTML код виджета лота (:obj:`None`, если не сохраняется, см.
+        :attr:`FunPayAPI.account.Account.keep_html`).
+    :type html: :obj:`str` or :obj:`None`
     """
+    __slots__ = ("id", "server", "description", "title", "amount", "price", "currency", "auto", "subcategory",
+                 "active", "html", "public_link")
 
     def __init__(self, id_: int | str, server: str | None,
                  description: str | None, amount: int | None, price: float, currency: Currency,
                  subcategory: SubCategory | None, auto: bool, active: bool,
-                 html: str):
+                 html: str | None):
         self.id: int | str = id_
         if isinstance(self.id, str) and self.id.isnumeric():
             self.id = int(self.id)
@@ -975,7 +1003,7 @@ class MyLotShortcut:
         """Подкатегория лота."""
         self.active: bool = active
         """Активен ли лот?"""
-        self.html: str = html
+        self.html: str | None = html
         """HTML-код виджета лота."""
         self.public_link: str = f"https://funpay.com/chips/offer?id={self.id}" \
             if self.subcategory.type is SubCategoryTypes.CURRENCY else f"https://funpay.com/lots/offer?id={self.id}"
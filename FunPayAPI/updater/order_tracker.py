@@ -0,0 +1,143 @@
+# START OF FILE FunPayCortex/FunPayAPI/updater/order_tracker.py
+
+"""
+В данном модуле описан трекер заказов Runner'а: ограниченная по размеру карта последних продаж
+{ID заказа: (статус, время заказа)}, которая переживает перезапуск (JSON-файл).
+
+Трекер помнит и заказы, которые уже ушли с первой страницы продаж, поэтому Runner может сверить кол-во
+известных ему оплаченных заказов со счетчиком незавершенных продаж из orders_counters и догрузить следующие
+страницы только тогда, когда первая страница не объясняет изменение счетчика.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+
+from ..common.enums import OrderStatuses
+from .. import types
+
+logger = logging.getLogger("FunPayAPI.order_tracker")
+
+
+class OrderTracker:
+    """
+    Трекер заказов.
+
+    :param max_orders: сколько последних заказов помнить (по времени заказа).
+    """
+    def __init__(self, max_orders: int = 1000):
+        self.max_orders: int = max_orders
+        """Сколько последних заказов помнить."""
+        self.path: str | None = None
+        """Путь до файла трекера (:obj:`None` - трекер не сохраняется)."""
+        self.__orders: dict[str, tuple[OrderStatuses, float]] = {}
+        self.__changed: bool = False
+
+    def __len__(self) -> int:
+        return len(self.__orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.__orders
+
+    def get(self, order_id: str) -> OrderStatuses | None:
+        """
+        Возвращает последний известный статус заказа.
+
+        :param order_id: ID заказа.
+
+        :return: статус или :obj:`None`, если заказ неизвестен.
+        """
+        return self.__orders[order_id][0] if order_id in self.__orders else None
+
+    def paid(self) -> int:
+        """
+        Возвращает кол-во известных оплаченных (незавершенных) заказов.
+        """
+        return sum(status is OrderStatuses.PAID for status, _ in self.__orders.values())
+
+    def forget_paid(self, before: float) -> int:
+        """
+        Забывает оплаченные заказы, сделанные раньше указанного момента (их текущий статус неизвестен).
+
+        :param before: timestamp.
+
+        :return: кол-во забытых заказов.
+        """
+        stale = [order_id for order_id, (status, timestamp) in self.__orders.items()
+                 if status is OrderStatuses.PAID and timestamp < before]
+        for order_id in stale:
+            del self.__orders[order_id]
+        if stale:
+            self.__changed = True
+        return len(stale)
+
+    def update(self, orders: list[types.OrderShortcut]) -> list[tuple[types.OrderShortcut, OrderStatuses | None]]:
+        """
+        Запоминает статусы заказов. Если заказов стало больше :attr:`max_orders`, самые старые забываются.
+
+        :param orders: заказы (например, страница продаж).
+
+        :return: новые заказы и заказы, у которых изменился статус: [(заказ, предыдущий статус), ...]
+            (у новых заказов предыдущий статус - :obj:`None`). Порядок - как в orders.
+        """
+        changes = []
+        for order in orders:
+            previous = self.get(order.id)
+            if previous is order.status:
+                continue
+            changes.append((order, previous))
+            self.__orders[order.id] = (order.status, order.date.timestamp())
+        if changes:
+            self.__changed = True
+            self.__trim()
+        return changes
+
+    def __trim(self):
+        if len(self.__orders) > self.max_orders:
+            newest = sorted(self.__orders.items(), key=lambda x: x[1][1], reverse=True)[:self.max_orders]
+            self.__orders = dict(newest)
+
+    def load(self, path: str):
+        """
+        Загружает трекер из файла и запоминает путь для :meth:`save`. Если файла нет, трекер остается пустым.
+
+        :param path: путь до файла трекера.
+        """
+        self.path = path
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            orders = {order_id: (OrderStatuses(status), float(timestamp))
+                      for order_id, (status, timestamp) in data.items()}
+        except (OSError, ValueError, TypeError):
+            logger.warning(f"Не удалось загрузить трекер заказов из {path}.")
+            logger.debug("TRACEBACK", exc_info=True)
+            return
+        self.__orders.update(orders)
+        self.__trim()
+        logger.debug(f"Загружено заказов в трекер: {len(self.__orders)}.")
+
+    def save(self):
+        """
+        Сохраняет трекер в файл (если он изменился с последнего сохранения и задан :attr:`path`).
+        """
+        if not self.path or not self.__changed:
+            return
+        data = {order_id: [status.value, timestamp] for order_id, (status, timestamp) in self.__orders.items()}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            logger.warning(f"Не удалось сохранить трекер заказов в {self.path}.")
+            logger.debug("TRACEBACK", exc_info=True)
+            return
+        self.__changed = False
+
+# END OF FILE FunPayCortex/FunPayAPI/updater/order_tracker.py
@@ -3,23 +3,37 @@
 from __future__ import annotations
 
 import re
-from typing import TYPE_CHECKING, Generator
+from typing import TYPE_CHECKING, Generator, Callable
 
 if TYPE_CHECKING:
-    from ..account import Account
+    from ..account import Account, Steps
 
 import json
+import hashlib
+import math
 import logging
 from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 import time
+import queue
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
+from ..account import _request
 from ..common import exceptions, utils
 from .events import *
+from .order_tracker import OrderTracker
 
 logger = logging.getLogger("FunPayAPI.runner")
 
+OPEN_A_TAG_RE = re.compile(r"<a\s([^>]*)>", re.IGNORECASE)
+A_TAG_RE = re.compile(r"<(/?)a[\s>]", re.IGNORECASE)
+ATTRIBUTE_RE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+CONTACT_ITEM_MESSAGE_XPATH = './/div[contains(concat(" ", normalize-space(@class), " "), " contact-item-message ")]'
+MEDIA_USER_NAME_XPATH = './/div[contains(concat(" ", normalize-space(@class), " "), " media-user-name ")]'
+
 
 class Runner:
     def __init__(self, account: Account, disable_message_requests: bool = False,
@@ -39,22 +53,72 @@ class Runner:
         self.__last_order_event_tag = utils.random_tag()
 
         self.saved_orders: dict[str, types.OrderShortcut] = {}
+        self.order_tracker: OrderTracker = OrderTracker()
+        """Трекер статусов последних продаж (см. :class:`OrderTracker`)."""
+        self.orders_max_pages: int = 5
+        """Максимальное кол-во страниц продаж, загружаемых за одно обновление orders_counters."""
+        self.__untracked_paid: int = 0
         self.runner_last_messages: dict[int, list[int, int, str | None]] = {}
         self.by_bot_ids: dict[int, list[int]] = {}
         self.last_messages_ids: dict[int, int] = {}
         self.buyers_viewing: dict[int, types.BuyerViewing] = {}
         self.runner_len: int = 10
+        """Кол-во чатов в одном запросе историй чатов."""
+        self.history_workers: int = 3
+        """Максимальное кол-во одновременных запросов историй чатов."""
+        self.__history_executor: ThreadPoolExecutor | None = None
+        self.__history_executor_size = 0
         self.__interlocutor_ids: set = set()
 
         self.account: Account = account
         self.account.runner = self
 
         self.__msg_time_re = re.compile(r"\d{2}:\d{2}")
+        self.__last_bookmarks_digest: bytes | None = None
+        self.bookmarks_stats: dict[str, int] = {"parsed": 0, "skipped": 0}
+        """Счетчики ответов chat_bookmarks: разобрано / пропущено (HTML не изменился)."""
         
         # --- WATCHDOG UPDATE ---
         self.last_activity = time.time()
 
+        self.adaptive_delay: bool = False
+        """Адаптивный интервал опроса (см. :meth:`get_sleep_time`)."""
+        self.min_delay: float = 1.0
+        """Минимальный интервал опроса в адаптивном режиме (в секундах)."""
+        self.max_delay: float = 60.0
+        """Максимальный интервал опроса в адаптивном режиме (в секундах)."""
+        self.burst_window: float = 60.0
+        """Сколько секунд после нового сообщения / заказа опрос идет с уменьшенным интервалом."""
+        self.idle_polls_step: int = 10
+        """Через сколько опросов без изменений интервал удваивается."""
+        self.rate_limit_cooldown: float = 120.0
+        """Сколько секунд после ответа 429 интервал не уменьшается ниже удвоенного requests_delay."""
+        self.__idle_polls = 0
+        self.__last_burst_time: float = 0
+
+        self.pipeline_queue_size: int = 16
+        """Максимальный размер очередей конвейерного режима (ответы runner'а / события)."""
+        self.__raw_queue: queue.Queue | None = None
+        self.__events_queue: queue.Queue | None = None
+        self.pipeline_stats: dict[str, int] = {"fetched": 0, "parsed": 0, "events": 0,
+                                               "raw_queue_peak": 0, "events_queue_peak": 0}
+        """Счетчики конвейерного режима."""
+        self.metrics_hook: Callable[[str, float, int], None] | None = None
+        """Вызывается после каждого запроса к runner'у ("fetch", время, 0) и разбора ответа ("parse", время,
+        кол-во событий). Время - в секундах. Используется для сбора метрик."""
+
+    def __observe(self, stage: str, start: float, events: int = 0):
+        if self.metrics_hook:
+            self.metrics_hook(stage, time.perf_counter() - start, events)
+
     def get_updates(self) -> dict:
+        return self.account._run_steps(self._get_updates_steps())
+
+    def _get_updates_steps(self) -> Steps[dict]:
+        """
+        Генератор запроса к runner'у для :meth:`get_updates` (см. :meth:`FunPayAPI.account.Account._run_steps`).
+        Используется и :meth:`FunPayAPI.async_account.AsyncAccount.get_updates`.
+        """
         orders = {
             "type": "orders_counters",
             "id": self.account.id,
@@ -85,7 +149,7 @@ class Runner:
         # ЛОГ: Начало запроса
         logger.debug(f"Runner: отправка запроса (msg_tag={self.__last_msg_event_tag})")
         
-        response = self.account.method("post", "runner/", headers, payload, raise_not_200=True)
+        response = yield _request("post", "runner/", headers, payload, raise_not_200=True)
         
         # ЛОГ: Конец запроса
         logger.debug("Runner: ответ получен")
@@ -109,18 +173,68 @@ class Runner:
             elif obj.get("type") == "c-p-u":
                 bv = self.account.parse_buyer_viewing(obj)
                 self.buyers_viewing[bv.buyer_id] = bv
+        if not self.__first_request and any(event.type in (EventTypes.NEW_MESSAGE, EventTypes.NEW_ORDER)
+                                            for event in events):
+            self.__last_burst_time = time.time()
         if self.__first_request:
             self.__first_request = False
         return events
 
-    def parse_chat_updates(self, obj) -> list:
-        events, lcmc_events = [], []
-        self.__last_msg_event_tag = obj.get("tag")
-        parser = BeautifulSoup(obj["data"]["html"], "lxml")
-        chats = parser.find_all("a", {"class": "contact-item"})
+    def parse_chat_bookmarks_fast(self, html: str) -> list[tuple[int, int, int, str, str | None, bool, str]] | None:
+        """
+        Быстрый парсер HTML chat_bookmarks: атрибуты виджетов чатов достаются регулярным выражением,
+        чаты с неизменившимся data-node-msg пропускаются сразу, и только измененные виджеты разбираются lxml.
+        Если внутри виджета есть вложенная ссылка или у него нет закрывающего тега, границы виджета регулярным
+        выражением не определить, и возвращается :obj:`None`.
 
-        chats_to_fetch_history = {}
-        for chat in chats:
+        :param html: HTML списка чатов.
+
+        :return: список (ID чата, ID последнего сообщения, ID последнего прочитанного сообщения,
+            текст последнего сообщения, название чата, флаг непрочитанности, HTML виджета) или :obj:`None`,
+            если разобрать HTML не удалось (нужно использовать :meth:`parse_chat_bookmarks`).
+        """
+        result = []
+        found = False
+        for match in OPEN_A_TAG_RE.finditer(html):
+            attrs = {i.group(1).lower(): i.group(2) if i.group(2) is not None else i.group(3)
+                     for i in ATTRIBUTE_RE.finditer(match.group(1))}
+            classes = attrs.get("class", "").split()
+            if "contact-item" not in classes:
+                continue
+            found = True
+            closing = A_TAG_RE.search(html, match.end())
+            if closing is None or not closing.group(1):
+                return None
+            end = html.find(">", closing.end() - 1) + 1
+
+            chat_id = int(attrs.get("data-id") or 0)
+            if not chat_id:
+                continue
+            node_msg_id = int(attrs.get("data-node-msg") or 0)
+            if node_msg_id == self.runner_last_messages.get(chat_id, [-1])[0]:
+                continue
+
+            chat_html = html[match.start():end]
+            chat = lxml_html.fragment_fromstring(chat_html)
+            if not (last_msg_text_div := chat.xpath(CONTACT_ITEM_MESSAGE_XPATH)):
+                continue
+            chat_with_div = chat.xpath(MEDIA_USER_NAME_XPATH)
+            result.append((chat_id, node_msg_id, int(attrs.get("data-user-msg") or 0),
+                           last_msg_text_div[0].text_content(),
+                           chat_with_div[0].text_content() if chat_with_div else None,
+                           "unread" in classes, chat_html))
+        if not found and "contact-item" in html:
+            return None
+        return result
+
+    def parse_chat_bookmarks(self, html: str) -> list[tuple[int, int, int, str, str | None, bool, str]]:
+        """
+        Парсер HTML chat_bookmarks через BeautifulSoup (запасной вариант для :meth:`parse_chat_bookmarks_fast`).
+        Возвращает то же, что и :meth:`parse_chat_bookmarks_fast`.
+        """
+        result = []
+        parser = BeautifulSoup(html, "lxml")
+        for chat in parser.find_all("a", {"class": "contact-item"}):
             chat_id = int(chat.get("data-id", 0))
             if not chat_id:
                 continue
@@ -128,24 +242,47 @@ class Runner:
             if not (last_msg_text_div := chat.find("div", {"class": "contact-item-message"})):
                 continue
 
-            last_msg_text = last_msg_text_div.text
             node_msg_id = int(chat.get('data-node-msg', 0))
-            user_msg_id = int(chat.get('data-user-msg', 0))
-
-            prev_node_msg_id, _, _ = self.runner_last_messages.get(chat_id, [-1, -1, None])
-            if node_msg_id == prev_node_msg_id:
+            if node_msg_id == self.runner_last_messages.get(chat_id, [-1])[0]:
                 continue
 
+            chat_with_div = chat.find("div", {"class": "media-user-name"})
+            result.append((chat_id, node_msg_id, int(chat.get('data-user-msg', 0)), last_msg_text_div.text,
+                           chat_with_div.text if chat_with_div else None, "unread" in chat.get("class", []),
+                           str(chat) if self.account.keep_html else None))
+        return result
+
+    def parse_chat_updates(self, obj) -> list:
+        events, lcmc_events = [], []
+        # Теги запоминает только стадия запроса (update_tags): при конвейерной обработке здесь может
+        # разбираться более старый ответ, чем последний полученный.
+        tag = obj.get("tag")
+        html = obj["data"]["html"]
+        digest = hashlib.blake2b(html.encode("utf-8"), digest_size=16).digest()
+        if digest == self.__last_bookmarks_digest and not self.__first_request:
+            self.bookmarks_stats["skipped"] += 1
+            return events
+
+        try:
+            chats = self.parse_chat_bookmarks_fast(html)
+        except Exception:
+            logger.debug("Runner: быстрый парсер chat_bookmarks не справился.", exc_info=True)
+            chats = None
+        if chats is None:
+            logger.debug("Runner: разбираю chat_bookmarks через BeautifulSoup.")
+            chats = self.parse_chat_bookmarks(html)
+
+        chats_to_fetch_history = {}
+        for chat_id, node_msg_id, user_msg_id, last_msg_text, chat_with, unread, chat_html in chats:
             by_bot = last_msg_text.startswith(self.account.bot_character)
             by_vertex = last_msg_text.startswith(self.account.old_bot_character)
             last_msg_text_cleaned = last_msg_text[1:] if by_bot or by_vertex else last_msg_text
             is_image = last_msg_text_cleaned in ("Изображение", "Зображення", "Image")
             last_msg_text_for_storage = None if is_image else last_msg_text_cleaned
 
-            chat_with_div = chat.find("div", {"class": "media-user-name"})
-            chat_with = chat_with_div.text if chat_with_div else f"ID: {chat_id}"
-            unread = "unread" in chat.get("class", [])
-            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text_cleaned, node_msg_id, user_msg_id, unread, str(chat))
+            chat_with = chat_with if chat_with is not None else f"ID: {chat_id}"
+            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text_cleaned, node_msg_id, user_msg_id, unread,
+                                          chat_html if self.account.keep_html else None)
             if not is_image:
                 chat_obj.last_by_bot = by_bot
                 chat_obj.last_by_vertex = by_vertex
@@ -154,12 +291,12 @@ class Runner:
             self.runner_last_messages[chat_id] = [node_msg_id, user_msg_id, last_msg_text_for_storage]
             
             if self.__first_request:
-                events.append(InitialChatEvent(self.__last_msg_event_tag, chat_obj))
+                events.append(InitialChatEvent(tag, chat_obj))
                 if self.make_msg_requests:
                     self.last_messages_ids[chat_id] = node_msg_id
                 continue
             
-            lcmc_event = LastChatMessageChangedEvent(self.__last_msg_event_tag, chat_obj)
+            lcmc_event = LastChatMessageChangedEvent(tag, chat_obj)
             lcmc_events.append(lcmc_event)
             
             if self.make_msg_requests and node_msg_id > self.last_messages_ids.get(chat_id, -1):
@@ -171,7 +308,7 @@ class Runner:
                 self.last_messages_ids[chat_id] = node_msg_id
 
         if lcmc_events:
-            events.append(ChatsListChangedEvent(self.__last_msg_event_tag))
+            events.append(ChatsListChangedEvent(tag))
         
         if chats_to_fetch_history:
             # ЛОГ: Запрос истории чатов
@@ -181,6 +318,7 @@ class Runner:
                 self.__interlocutor_ids.update({self.account.interlocutor_ids.get(cid) for cid in chats_to_fetch_history if cid in self.account.interlocutor_ids})
 
             chat_ids_to_fetch = list(chats_to_fetch_history.keys())
+            packs = []
             while chat_ids_to_fetch:
                 chat_pack_ids = chat_ids_to_fetch[:self.runner_len]
                 del chat_ids_to_fetch[:self.runner_len]
@@ -192,8 +330,9 @@ class Runner:
                         bv_pack.append(interlocutor_id)
 
                 chats_data_for_request = {cid: (chats_to_fetch_history[cid]["name"], chats_to_fetch_history[cid]["from_id"]) for cid in chat_pack_ids}
-                new_msg_events_map = self.generate_new_message_events(chats_data_for_request, bv_pack)
-                
+                packs.append((chat_pack_ids, chats_data_for_request, bv_pack))
+
+            for (chat_pack_ids, _, _), new_msg_events_map in zip(packs, self.fetch_chat_packs(packs, tag)):
                 if self.make_buyer_viewing_requests:
                     for cid, msgs in new_msg_events_map.items():
                         if cid not in self.account.interlocutor_ids and msgs and msgs[0].message.interlocutor_id:
@@ -207,9 +346,36 @@ class Runner:
         else:
             events.extend(lcmc_events)
 
+        self.__last_bookmarks_digest = digest
+        self.bookmarks_stats["parsed"] += 1
         return events
 
-    def generate_new_message_events(self, chats_data: dict, interlocutor_ids: list[int] | None = None) -> dict:
+    def fetch_chat_packs(self, packs: list[tuple[list[int], dict, list[int]]],
+                         runner_tag: str | None = None) -> list[dict]:
+        """
+        Получает истории чатов для нескольких пачек чатов, выполняя до :attr:`history_workers` запросов одновременно
+        (у каждого потока своя сессия :class:`FunPayAPI.account.Account`).
+
+        :param packs: список пачек (ID чатов, данные чатов для :meth:`generate_new_message_events`, ID собеседников).
+        :param runner_tag: тег Runner'а для событий (:obj:`None` - последний полученный тег).
+
+        :return: список результатов :meth:`generate_new_message_events` в порядке пачек.
+        """
+        if len(packs) == 1 or self.history_workers <= 1:
+            return [self.generate_new_message_events(chats_data, bv_pack, runner_tag)
+                    for _, chats_data, bv_pack in packs]
+        if self.__history_executor is None or self.__history_executor_size != self.history_workers:
+            if self.__history_executor is not None:
+                self.__history_executor.shutdown(wait=False)
+            self.__history_executor = ThreadPoolExecutor(max_workers=self.history_workers,
+                                                         thread_name_prefix="RunnerHistory")
+            self.__history_executor_size = self.history_workers
+        futures = [self.__history_executor.submit(self.generate_new_message_events, chats_data, bv_pack, runner_tag)
+                   for _, chats_data, bv_pack in packs]
+        return [future.result() for future in futures]
+
+    def generate_new_message_events(self, chats_data: dict, interlocutor_ids: list[int] | None = None,
+                                    runner_tag: str | None = None) -> dict:
         attempts = 3
         chats_to_request = {cid: name for cid, (name, _) in chats_data.items()}
         
@@ -243,7 +409,8 @@ class Runner:
                     i.by_bot = True
 
             stack = MessageEventsStack()
-            events_for_stack = [NewMessageEvent(self.__last_msg_event_tag, msg, stack) for msg in new_messages]
+            events_for_stack = [NewMessageEvent(runner_tag or self.__last_msg_event_tag, msg, stack)
+                                for msg in new_messages]
             stack.add_events(events_for_stack)
             result[cid] = events_for_stack
             self.by_bot_ids[cid] = [i for i in self.by_bot_ids[cid] if i > new_messages[-1].id]
@@ -253,43 +420,96 @@ class Runner:
 
     def parse_order_updates(self, obj) -> list:
         events = []
-        self.__last_order_event_tag = obj.get("tag")
+        tag = obj.get("tag")
         if not self.__first_request:
-            events.append(OrdersListChangedEvent(self.__last_order_event_tag,
-                                                 obj["data"]["buyer"], obj["data"]["seller"]))
+            events.append(OrdersListChangedEvent(tag, obj["data"]["buyer"], obj["data"]["seller"]))
         if not self.make_order_requests:
             return events
 
+        counters = (obj["data"]["buyer"], obj["data"]["seller"])
+        # Первая страница продаж загружается при любом изменении тега: неизменный счетчик незавершенных продаж
+        # не значит, что продажи не менялись (например, один заказ закрылся, а другой оплатили). Счетчик решает
+        # только, нужно ли догружать следующие страницы.
         # ЛОГ: Обновление заказов
         logger.debug("Runner: обновление списка заказов...")
 
+        start_from, pages, oldest, complete = None, 0, None, False
+        while True:
+            orders_list = self.__get_sales_page(start_from)
+            if orders_list is None:
+                if not pages:
+                    return events
+                break
+            pages += 1
+            start_from = orders_list[0]
+            events.extend(self.__diff_orders(orders_list[1], tag, pages == 1))
+            if orders_list[1]:
+                oldest = min(oldest or float("inf"), *(order.date.timestamp() for order in orders_list[1]))
+            # Счетчик незавершенных продаж объясняется известными трекеру заказами - дальше загружать не нужно.
+            # Иначе на следующих страницах есть новые оплаченные заказы (счетчик больше) или изменился статус
+            # заказов, ушедших с первой страницы (счетчик меньше).
+            if self.order_tracker.paid() + self.__untracked_paid == counters[1]:
+                break
+            if not start_from or pages >= self.orders_max_pages:
+                complete = True
+                break
+            logger.debug(f"Runner: незавершенных продаж {counters[1]}, известно {self.order_tracker.paid()}, "
+                         f"загружаю страницу продаж {pages + 1}...")
+
+        if complete:
+            # Все доступные страницы просмотрены, а счетчик так и не сошелся. Оплаченные заказы старше
+            # просмотренных страниц могли закрыться, пока бот был выключен / пока были слишком глубоко, - их статус
+            # неизвестен, поэтому они забываются. Оставшаяся разница - оплаченные заказы, до которых не дотянуться:
+            # она запоминается, чтобы не загружать все страницы при каждом изменении счетчика.
+            forgotten = self.order_tracker.forget_paid(oldest) if oldest is not None else 0
+            self.__untracked_paid = max(0, counters[1] - self.order_tracker.paid())
+            logger.debug(f"Runner: счетчик незавершенных продаж не сошелся ({counters[1]}), забыто оплаченных "
+                         f"заказов: {forgotten}, недоступных оплаченных заказов: {self.__untracked_paid}.")
+        self.order_tracker.save()
+        return events
+
+    def __get_sales_page(self, start_from: str | None) -> tuple[str | None, list[types.OrderShortcut]] | None:
+        """
+        Загружает страницу продаж (3 попытки). Возвращает :obj:`None`, если загрузить не удалось.
+        """
         attempts = 3
         while attempts:
             try:
-                orders_list = self.account.get_sales()
-                break
+                return self.account.get_sales(start_from=start_from)[:2]
             except exceptions.RequestFailedError as e:
                 logger.error(e)
             except Exception:
                 logger.error("Не удалось обновить список заказов.", exc_info=True)
             time.sleep(1)
             attempts -= 1
-        else:
-            logger.error("Не удалось обновить список продаж: превышено кол-во попыток.")
-            return events
+        logger.error("Не удалось обновить список продаж: превышено кол-во попыток.")
+        return None
+
+    def __diff_orders(self, orders: list[types.OrderShortcut], tag: str, first_page: bool) -> list:
+        """
+        Сверяет страницу продаж с трекером заказов и возвращает события новых заказов / изменения статуса.
 
-        saved_orders = {}
-        for order in orders_list[1]:
-            saved_orders[order.id] = order
-            if order.id not in self.saved_orders:
-                event_to_add = InitialOrderEvent if self.__first_request else NewOrderEvent
-                events.append(event_to_add(self.__last_order_event_tag, order))
-                if not self.__first_request and order.status == types.OrderStatuses.CLOSED:
-                    events.append(OrderStatusChangedEvent(self.__last_order_event_tag, order))
-
-            elif order.status != self.saved_orders[order.id].status:
-                events.append(OrderStatusChangedEvent(self.__last_order_event_tag, order))
-        self.saved_orders = saved_orders
+        При первом запросе все заказы страницы - :class:`InitialOrderEvent`, а трекер обновляется молча
+        (события об изменениях статуса, произошедших до запуска, не генерируются). Неизвестные трекеру заказы
+        не с первой страницы - не новые (просто старые заказы, о которых трекер не знал): они запоминаются молча.
+        """
+        events = []
+        if self.__first_request:
+            events.extend(InitialOrderEvent(tag, order) for order in orders)
+            self.order_tracker.update(orders)
+        else:
+            for order, previous_status in self.order_tracker.update(orders):
+                if previous_status is None:
+                    if not first_page:
+                        continue
+                    events.append(NewOrderEvent(tag, order))
+                    if order.status == types.OrderStatuses.CLOSED:
+                        events.append(OrderStatusChangedEvent(tag, order))
+                else:
+                    events.append(OrderStatusChangedEvent(tag, order))
+        self.saved_orders.update((order.id, order) for order in orders)
+        if len(self.saved_orders) > len(self.order_tracker):
+            self.saved_orders = {k: v for k, v in self.saved_orders.items() if k in self.order_tracker}
         return events
 
     def update_last_message(self, chat_id: int, message_id: int, message_text: str | None):
@@ -299,11 +519,47 @@ class Runner:
     def mark_as_by_bot(self, chat_id: int, message_id: int):
         self.by_bot_ids.setdefault(chat_id, []).append(message_id)
 
+    def get_sleep_time(self, requests_delay: int | float) -> float:
+        """
+        Возвращает задержку перед следующим запросом (интервал ± 20%).
+
+        В адаптивном режиме (:attr:`adaptive_delay`) интервал:
+        - уменьшается вдвое (но не ниже :attr:`min_delay`) в течение :attr:`burst_window` секунд
+          после нового сообщения / заказа;
+        - удваивается каждые :attr:`idle_polls_step` опросов, в которых теги runner'а не изменились
+          (но не выше :attr:`max_delay`);
+        - не опускается ниже удвоенного requests_delay в течение :attr:`rate_limit_cooldown` секунд после ответа 429.
+        """
+        delay = requests_delay
+        if self.adaptive_delay:
+            now = time.time()
+            if now - self.account.last_429_err_time < self.rate_limit_cooldown:
+                delay = requests_delay * 2
+            elif now - self.__last_burst_time < self.burst_window:
+                delay = max(self.min_delay, requests_delay / 2)
+            else:
+                limit = max(self.max_delay, requests_delay)
+                # Степень ограничена: после ~10 000 опросов без изменений 2 ** n уже не помещается во float.
+                steps = min(self.__idle_polls // self.idle_polls_step,
+                            math.ceil(math.log2(limit / requests_delay)) if requests_delay > 0 else 0)
+                delay = min(requests_delay * 2 ** steps, limit)
+        jitter = delay * 0.2
+        return random.uniform(max(0.5, delay - jitter), delay + jitter)
+
     def listen(self, requests_delay: int | float = 6.0,
-               ignore_exceptions: bool = True) -> Generator:
+               ignore_exceptions: bool = True, pipelined: bool = False) -> Generator:
         """
         Основной цикл получения обновлений.
+
+        :param requests_delay: задержка между запросами (в секундах).
+        :param ignore_exceptions: игнорировать ли ошибки запросов.
+        :param pipelined: конвейерный режим: запросы, парсинг и обработка событий выполняются параллельно
+            (см. :meth:`listen_pipelined`).
         """
+        if pipelined:
+            yield from self.listen_pipelined(requests_delay, ignore_exceptions)
+            return
+
         consecutive_errors = 0
         max_retries = 5
         events_to_process = []
@@ -315,29 +571,20 @@ class Runner:
 
             # ИЗМЕНЕНИЕ: БЛОКИРОВКА ИЗ-ЗА ОТСУТСТВИЯ ПРОКСИ УБРАНА
 
-            jitter = requests_delay * 0.2
-            sleep_time = random.uniform(max(0.5, requests_delay - jitter), requests_delay + jitter)
+            sleep_time = self.get_sleep_time(requests_delay)
 
             try:
-                if self.make_buyer_viewing_requests:
-                    self.__interlocutor_ids = {event.message.interlocutor_id for event in events_to_process
-                                               if event.type == EventTypes.NEW_MESSAGE and event.message.interlocutor_id is not None}
-                
+                start = time.perf_counter()
                 updates = self.get_updates()
+                self.__observe("fetch", start)
+                self.update_tags(updates)
+                start = time.perf_counter()
                 new_events = self.parse_updates(updates)
+                self.__observe("parse", start, len(new_events))
                 events_to_process.extend(new_events)
 
-                remaining_events = []
-                for event in events_to_process:
-                    if self.make_buyer_viewing_requests and event.type == EventTypes.NEW_MESSAGE and event.message.interlocutor_id is not None:
-                        event.message.buyer_viewing = self.buyers_viewing.get(event.message.interlocutor_id)
-                        if event.message.buyer_viewing is None:
-                            remaining_events.append(event)
-                            continue
-                    yield event
-                
-                events_to_process = remaining_events
-                self.buyers_viewing.clear()
+                ready_events, events_to_process = self.split_ready_events(events_to_process)
+                yield from ready_events
                 
                 if consecutive_errors > 0:
                     logger.info("Соединение с FunPay восстановлено в раннере.")
@@ -373,7 +620,194 @@ class Runner:
                     raise e
             
             # ЛОГ: Сон
+            sleep_time = self.get_sleep_time(requests_delay)
             logger.debug(f"Runner: сон {sleep_time:.2f} сек.")
             time.sleep(sleep_time)
 
+    def split_ready_events(self, events: list) -> tuple[list, list]:
+        """
+        Отбирает события, готовые к обработке. Если запрашивается информация о просмотре покупателем
+        (:attr:`make_buyer_viewing_requests`), новые сообщения ждут, пока она придет: для них она будет
+        запрошена следующим запросом к runner'у.
+
+        :param events: события (новые и ожидающие с прошлых опросов).
+
+        :return: (готовые события, ожидающие события).
+        """
+        ready, remaining = [], []
+        for event in events:
+            if self.make_buyer_viewing_requests and event.type == EventTypes.NEW_MESSAGE \
+                    and event.message.interlocutor_id is not None:
+                event.message.buyer_viewing = self.buyers_viewing.get(event.message.interlocutor_id)
+                if event.message.buyer_viewing is None:
+                    remaining.append(event)
+                    continue
+            ready.append(event)
+        self.buyers_viewing.clear()
+        if self.make_buyer_viewing_requests:
+            self.__interlocutor_ids = {event.message.interlocutor_id for event in remaining}
+        return ready, remaining
+
+    def get_pipeline_metrics(self) -> dict[str, int]:
+        """
+        Возвращает метрики конвейерного режима: текущую глубину очередей и счетчики.
+        """
+        return {"raw_queue": self.__raw_queue.qsize() if self.__raw_queue else 0,
+                "events_queue": self.__events_queue.qsize() if self.__events_queue else 0,
+                **self.pipeline_stats}
+
+    def update_tags(self, updates: dict):
+        """
+        Запоминает теги из ответа runner'а и считает опросы подряд, в которых теги не изменились.
+
+        Теги меняет только этот метод, и вызывается он сразу после запроса (до :meth:`parse_updates`), поэтому
+        следующий запрос не ждет окончания парсинга, а в конвейерном режиме разбор более старого ответа
+        не откатывает теги назад.
+
+        :param updates: ответ runner'а (см. :meth:`get_updates`).
+        """
+        changed = False
+        for obj in updates.get("objects") or []:
+            if obj.get("type") == "chat_bookmarks":
+                changed |= obj.get("tag") != self.__last_msg_event_tag
+                self.__last_msg_event_tag = obj.get("tag")
+            elif obj.get("type") == "orders_counters":
+                changed |= obj.get("tag") != self.__last_order_event_tag
+                self.__last_order_event_tag = obj.get("tag")
+        self.__idle_polls = 0 if changed else self.__idle_polls + 1
+
+    def __put(self, q: queue.Queue, item, stop: threading.Event, peak_key: str) -> bool:
+        """
+        Кладет элемент в ограниченную очередь, ожидая освобождения места. Возвращает False, если конвейер остановлен.
+        """
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=1)
+            except queue.Full:
+                continue
+            self.pipeline_stats[peak_key] = max(self.pipeline_stats[peak_key], q.qsize())
+            return True
+        return False
+
+    def __fetch_loop(self, requests_delay: int | float, ignore_exceptions: bool, stop: threading.Event):
+        """
+        Стадия конвейера: опрашивает runner по расписанию и кладет сырые ответы в очередь.
+        """
+        consecutive_errors = 0
+        max_retries = 5
+        while not stop.is_set():
+            self.last_activity = time.time()
+            sleep_time = self.get_sleep_time(requests_delay)
+            try:
+                start = time.perf_counter()
+                updates = self.get_updates()
+                self.__observe("fetch", start)
+                self.update_tags(updates)
+                self.pipeline_stats["fetched"] += 1
+                if not self.__put(self.__raw_queue, updates, stop, "raw_queue_peak"):
+                    return
+                if consecutive_errors > 0:
+                    logger.info("Соединение с FunPay восстановлено в раннере.")
+                consecutive_errors = 0
+
+            except exceptions.RequestFailedError as e:
+                consecutive_errors += 1
+                logger.error(f"{e.short_str()} ({consecutive_errors}/{max_retries})")
+                if e.status_code == 0:
+                    if consecutive_errors >= max_retries:
+                        self.__put(self.__raw_queue, e, stop, "raw_queue_peak")
+                        return
+                    stop.wait(5)
+                    continue
+                if not ignore_exceptions:
+                    self.__put(self.__raw_queue, e, stop, "raw_queue_peak")
+                    return
+                stop.wait(sleep_time + random.uniform(2, 7))
+
+            except requests.exceptions.RequestException as e:
+                consecutive_errors += 1
+                logger.error(f"Сетевая ошибка runner ({consecutive_errors}/{max_retries}): {e}")
+                if consecutive_errors >= max_retries:
+                    self.__put(self.__raw_queue, e, stop, "raw_queue_peak")
+                    return
+                stop.wait(sleep_time + random.uniform(2, 7))
+
+            except Exception as e:
+                consecutive_errors += 1
+                logger.error("Произошла непредвиденная ошибка при получении событий.", exc_info=True)
+                if not ignore_exceptions or consecutive_errors >= max_retries:
+                    self.__put(self.__raw_queue, e, stop, "raw_queue_peak")
+                    return
+
+            sleep_time = self.get_sleep_time(requests_delay)
+            logger.debug(f"Runner: сон {sleep_time:.2f} сек.")
+            stop.wait(sleep_time)
+
+    def __parse_loop(self, ignore_exceptions: bool, stop: threading.Event):
+        """
+        Стадия конвейера: превращает сырые ответы runner'а в события и кладет их в очередь событий.
+        """
+        events_to_process = []
+        while not stop.is_set():
+            try:
+                updates = self.__raw_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            if isinstance(updates, Exception):
+                self.__put(self.__events_queue, updates, stop, "events_queue_peak")
+                return
+
+            try:
+                start = time.perf_counter()
+                new_events = self.parse_updates(updates)
+                self.__observe("parse", start, len(new_events))
+                events_to_process.extend(new_events)
+                self.pipeline_stats["parsed"] += 1
+            except Exception as e:
+                logger.error("Произошла непредвиденная ошибка при обработке ответа runner'а.", exc_info=True)
+                if not ignore_exceptions:
+                    self.__put(self.__events_queue, e, stop, "events_queue_peak")
+                    return
+                continue
+
+            ready_events, events_to_process = self.split_ready_events(events_to_process)
+            for event in ready_events:
+                if not self.__put(self.__events_queue, event, stop, "events_queue_peak"):
+                    return
+
+    def listen_pipelined(self, requests_delay: int | float = 6.0,
+                         ignore_exceptions: bool = True) -> Generator:
+        """
+        Конвейерный цикл получения обновлений.
+
+        Поток-опросчик запрашивает runner по расписанию и кладет ответы в ограниченную очередь,
+        поток-парсер превращает их в события, а сам генератор лишь отдает готовые события.
+        Таким образом, время работы хэндлеров не сдвигает следующий запрос к FunPay.
+        При переполнении очередей стадии ждут друг друга (ответы не теряются).
+
+        :param requests_delay: задержка между запросами (в секундах).
+        :param ignore_exceptions: игнорировать ли ошибки запросов.
+        """
+        stop = threading.Event()
+        self.__raw_queue = queue.Queue(maxsize=self.pipeline_queue_size)
+        self.__events_queue = queue.Queue(maxsize=self.pipeline_queue_size * self.runner_len)
+        threads = [threading.Thread(target=self.__fetch_loop, args=(requests_delay, ignore_exceptions, stop),
+                                    daemon=True, name="RunnerFetcher"),
+                   threading.Thread(target=self.__parse_loop, args=(ignore_exceptions, stop),
+                                    daemon=True, name="RunnerParser")]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                try:
+                    event = self.__events_queue.get(timeout=1)
+                except queue.Empty:
+                    continue
+                if isinstance(event, Exception):
+                    raise event
+                self.pipeline_stats["events"] += 1
+                yield event
+        finally:
+            stop.set()
+
 # END OF FILE FunPayCortex/FunPayAPI/updater/runner.py
\ No newline at end of file
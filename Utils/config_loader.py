@@ -40,6 +40,21 @@ def check_param(param_name: str, section: SectionProxy, valid_values: list[str |
     return value
 
 
+def check_float_param(param_name: str, section: SectionProxy, min_value: float, max_value: float) -> float:
+    """
+    Проверяет, существует ли в переданной секции указанный параметр и является ли его значение числом
+    (в т.ч. дробным, например "0.25") в диапазоне [min_value; max_value].
+    """
+    value = check_param(param_name, section)
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is None or not min_value <= number <= max_value:
+        raise ValueNotValidError(param_name, value, [f"{min_value:g} - {max_value:g}"])
+    return number
+
+
 def create_config_obj(config_path: str) -> ConfigParser:
     """
     Создает объект конфига с нужными настройками.
@@ -75,7 +90,8 @@ def load_main_config(config_path: str):
             "enabled": ["0", "1"],
             "token": "any+empty",
             "secretKeyHash": "any",
-            "blockLogin": ["0", "1"]
+            "blockLogin": ["0", "1"],
+            "coalesceWindows": "any+empty"
         },
 
         "CortexHosting": {
@@ -143,6 +159,16 @@ def load_main_config(config_path: str):
         "Other": {
             "watermark": "any+empty",
             "requestsDelay": [str(i) for i in range(1, 101)],
+            "runnerPipeline": ["0", "1"],
+            "adaptivePolling": ["0", "1"],
+            "historyPackSize": [str(i) for i in range(1, 11)],
+            "historyWorkers": [str(i) for i in range(1, 6)],
+            "keepHtml": ["0", "1"],
+            "eventWorkers": [str(i) for i in range(0, 17)],
+            "slowHandlerThreshold": (0, 60),
+            "metricsAddress": "any+empty",
+            "logQueue": ["0", "1"],
+            "logJson": ["0", "1"],
             # Оставляем только ru для языка интерфейса
             "language": ["ru"]
         },
@@ -223,10 +249,54 @@ def load_main_config(config_path: str):
                 config.set("Manager", "registration_key", "")
                 with open(config_path, "w", encoding="utf-8") as f:
                     config.write(f)
+            elif section_name == "Telegram" and param_name == "coalesceWindows" and param_name not in config[section_name]:
+                config.set("Telegram", "coalesceWindows", "new_message:1.5")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
             elif section_name == "Greetings" and param_name == "ignoreSystemMessages" and param_name not in config[section_name]:
                 config.set("Greetings", "ignoreSystemMessages", "0")
                 with open(config_path, "w", encoding="utf-8") as f:
                     config.write(f)
+            elif section_name == "Other" and param_name == "runnerPipeline" and param_name not in config[section_name]:
+                config.set("Other", "runnerPipeline", "0")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "adaptivePolling" and param_name not in config[section_name]:
+                config.set("Other", "adaptivePolling", "0")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "historyPackSize" and param_name not in config[section_name]:
+                config.set("Other", "historyPackSize", "10")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "historyWorkers" and param_name not in config[section_name]:
+                config.set("Other", "historyWorkers", "3")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "keepHtml" and param_name not in config[section_name]:
+                config.set("Other", "keepHtml", "1")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "eventWorkers" and param_name not in config[section_name]:
+                config.set("Other", "eventWorkers", "0")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "slowHandlerThreshold" and param_name not in config[section_name]:
+                config.set("Other", "slowHandlerThreshold", "5")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "metricsAddress" and param_name not in config[section_name]:
+                config.set("Other", "metricsAddress", "")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "logQueue" and param_name not in config[section_name]:
+                config.set("Other", "logQueue", "1")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "logJson" and param_name not in config[section_name]:
+                config.set("Other", "logJson", "0")
+                with open(config_path, "w", encoding="utf-8") as f:
+                    config.write(f)
             elif section_name == "Other" and param_name == "language" and param_name not in config[section_name]:
                 config.set("Other", "language", "ru")
                 with open(config_path, "w", encoding="utf-8") as f:
@@ -280,7 +350,9 @@ def load_main_config(config_path: str):
                     config.write(f)
 
             try:
-                if values[section_name][param_name] == "any":
+                if isinstance(values[section_name][param_name], tuple):
+                    check_float_param(param_name, config[section_name], *values[section_name][param_name])
+                elif values[section_name][param_name] == "any":
                     check_param(param_name, config[section_name])
                 elif values[section_name][param_name] == "any+empty":
                     check_param(param_name, config[section_name], valid_values=[None])
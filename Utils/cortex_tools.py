@@ -13,7 +13,8 @@ import FunPayAPI.types
 
 from datetime import datetime
 import Utils.exceptions
-import itertools
+from Utils import products_store
+from Utils.logger import stop_logging
 import psutil
 import json
 import sys
@@ -21,6 +22,7 @@ import os
 import re
 import time
 import logging
+import threading
 import zipfile
 # --- ИСПРАВЛЕНИЕ: Правильный импорт Currency ---
 from FunPayAPI.common.enums import Currency
@@ -101,6 +103,8 @@ class RegularExpressions(object):
         return getattr(cls, "instance")
 
     def __init__(self):
+        if hasattr(self, "ORDER_PURCHASED"):
+            return
         self.ORDER_PURCHASED = re.compile(r"(Покупатель|The buyer) [a-zA-Z0-9]+ (оплатил заказ|has paid for order) #[A-Z0-9]{8}\.")
         self.ORDER_PURCHASED2 = re.compile(r"[a-zA-Z0-9]+, (не забудьте потом нажать кнопку («Подтвердить выполнение заказа»|«Подтвердить получение валюты»)\.|do not forget to press the («Confirm order fulfilment»|«Confirm currency receipt») button once you finish\.)")
         self.ORDER_CONFIRMED = re.compile(r"(Покупатель|The buyer) [a-zA-Z0-9]+ (подтвердил успешное выполнение заказа|has confirmed that order) #[A-Z0-9]{8} (и отправил деньги продавцу|has been fulfilled successfully and that the seller) [a-zA-Z0-9]+( has been paid)?\.")
@@ -128,13 +132,7 @@ import random
 
 
 def count_products(path: str) -> int:
-    if not os.path.exists(path):
-        return 0
-    with open(path, "r", encoding="utf-8") as f:
-        products = f.read()
-    products = products.split("\n")
-    products = list(itertools.filterfalse(lambda el: not el, products))
-    return len(products)
+    return products_store.count(path)
 
 
 def cache_blacklist(blacklist: list[str], base_path: str) -> None:
@@ -225,12 +223,20 @@ def load_disabled_plugins(base_path: str) -> list[str]:
     return []
 
 
+_old_users_lock = threading.Lock()
+
+
 def cache_old_users(old_users: dict[int, float], base_path: str):
+    # Вызывается из обработчиков разных чатов параллельно: пишем копию словаря, по очереди и атомарно.
     cache_dir = os.path.join(base_path, "storage/cache")
     if not os.path.exists(cache_dir):
         os.makedirs(cache_dir, exist_ok=True)
-    with open(os.path.join(cache_dir, "old_users.json"), "w", encoding="utf-8") as f:
-        f.write(json.dumps(old_users, ensure_ascii=False))
+    path = os.path.join(cache_dir, "old_users.json")
+    with _old_users_lock:
+        data = json.dumps(old_users.copy(), ensure_ascii=False)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
 
 
 def load_old_users(greetings_cooldown: float, base_path: str) -> dict[int, float]:
@@ -342,36 +348,15 @@ def get_month_name(month_number: int) -> str:
 
 
 def get_products(path: str, amount: int = 1) -> list[list[str] | int] | None:
-    with open(path, "r", encoding="utf-8") as f:
-        products = f.read()
-
-    products = products.split("\n")
-    products = list(itertools.filterfalse(lambda el: not el, products))
+    return products_store.pop(path, amount)
 
-    if not products:
-        raise Utils.exceptions.NoProductsError(path)
-    elif len(products) < amount:
-        raise Utils.exceptions.NotEnoughProductsError(path, len(products), amount)
 
-    got_products = products[:amount]
-    save_products = products[amount:]
-    amount = len(save_products)
-
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(save_products))
-
-    return [got_products, amount]
+def reserve_products(path: str, amount: int = 1) -> products_store.Reservation:
+    return products_store.reserve(path, amount)
 
 
 def add_products(path: str, products: list[str], at_zero_position=False):
-    if not at_zero_position:
-        with open(path, "a", encoding="utf-8") as f:
-            f.write("\n" + "\n".join(products))
-    else:
-        with open(path, "r", encoding="utf-8") as f:
-            text = f.read()
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("\n".join(products) + "\n" + text)
+    products_store.add(path, products, at_zero_position)
 
 
 def safe_text(text: str):
@@ -457,6 +442,7 @@ def format_order_text(text: str, order: FunPayAPI.types.OrderShortcut | FunPayAP
 
 
 def restart_program():
+    stop_logging()
     python = sys.executable
     os.execl(python, python, *sys.argv)
     try:
@@ -470,6 +456,7 @@ def restart_program():
 
 
 def shut_down():
+    stop_logging()
     try:
         process = psutil.Process()
         process.terminate()
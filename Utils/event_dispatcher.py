@@ -0,0 +1,101 @@
+# START OF FILE FunPayCortex/Utils/event_dispatcher.py
+
+"""
+В данном модуле описан диспетчер событий Runner'а: события распределяются по потокам-"шардам" по ключу чата
+(собеседнику), поэтому события одного чата обрабатываются строго по очереди (FIFO), а события разных чатов -
+параллельно.
+"""
+
+from __future__ import annotations
+from typing import Callable, Hashable
+
+from FunPayAPI.updater.events import InitialChatEvent, LastChatMessageChangedEvent, NewMessageEvent, \
+    InitialOrderEvent, NewOrderEvent, OrderStatusChangedEvent
+import logging
+import queue
+import threading
+
+logger = logging.getLogger("FPC.event_dispatcher")
+
+
+def chat_key(event) -> Hashable | None:
+    """
+    Возвращает ключ чата события: ник собеседника (он же название чата / ник покупателя в заказе), чтобы
+    события сообщений и заказов одного покупателя попадали в один шард. Если ника нет - ID чата.
+
+    :param event: событие Runner'а.
+
+    :return: ключ или :obj:`None`, если событие не относится к конкретному чату (список чатов / заказов).
+    """
+    if isinstance(event, NewMessageEvent):
+        return event.message.chat_name or event.message.chat_id
+    if isinstance(event, (LastChatMessageChangedEvent, InitialChatEvent)):
+        return event.chat.name or event.chat.id
+    if isinstance(event, (NewOrderEvent, OrderStatusChangedEvent, InitialOrderEvent)):
+        return event.order.buyer_username
+    return None
+
+
+class EventDispatcher:
+    """
+    Диспетчер событий.
+
+    :param workers: кол-во потоков-шардов.
+    :param thread_name_prefix: префикс названий потоков.
+    """
+    def __init__(self, workers: int = 4, thread_name_prefix: str = "CortexEvents"):
+        self.workers: int = workers
+        """Кол-во потоков-шардов."""
+        self.max_queued: int = 0
+        """Максимальная длина очереди шарда."""
+        self.__local = threading.local()
+        self.__queues: list[queue.Queue] = [queue.Queue() for _ in range(workers)]
+        # Счетчик обработанных задач у каждого шарда свой: его увеличивает только поток этого шарда,
+        # поэтому блокировка не нужна, а общее кол-во считается при чтении (см. processed).
+        self.__processed: list[int] = [0] * workers
+        for i, q in enumerate(self.__queues):
+            threading.Thread(target=self.__worker, args=(i, q), name=f"{thread_name_prefix}_{i}", daemon=True).start()
+
+    @property
+    def processed(self) -> int:
+        """
+        Кол-во обработанных задач.
+        """
+        return sum(self.__processed)
+
+    def submit(self, key: Hashable | None, fn: Callable, *args):
+        """
+        Ставит задачу в очередь шарда, за которым закреплен ключ. Задачи без ключа (события списков чатов /
+        заказов) всегда попадают в первый шард, поэтому тоже обрабатываются строго по очереди.
+
+        :param key: ключ чата (см. :func:`chat_key`) или :obj:`None`.
+        :param fn: функция.
+        """
+        q = self.__queues[0 if key is None else hash(key) % self.workers]
+        q.put((fn, args))
+        self.max_queued = max(self.max_queued, q.qsize())
+
+    def in_worker(self) -> bool:
+        """
+        Выполняется ли текущий код в потоке-шарде.
+        """
+        return getattr(self.__local, "worker", False)
+
+    def queued(self) -> list[int]:
+        """
+        Возвращает длины очередей шардов.
+        """
+        return [q.qsize() for q in self.__queues]
+
+    def __worker(self, index: int, q: queue.Queue):
+        self.__local.worker = True
+        while True:
+            fn, args = q.get()
+            try:
+                fn(*args)
+            except Exception:
+                logger.error("Необработанная ошибка при обработке события.")
+                logger.debug("TRACEBACK", exc_info=True)
+            self.__processed[index] += 1
+
+# END OF FILE FunPayCortex/Utils/event_dispatcher.py
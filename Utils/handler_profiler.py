@@ -0,0 +1,113 @@
+# START OF FILE FunPayCortex/Utils/handler_profiler.py
+
+"""
+В данном модуле описан профилировщик обработчиков событий: кол-во вызовов, ошибки и задержки (p50 / p95 / p99)
+каждого обработчика в разрезе типа события и плагина, а также предупреждения о медленных обработчиках.
+"""
+
+from __future__ import annotations
+from typing import Callable
+
+from collections import deque
+import logging
+import threading
+
+logger = logging.getLogger("FPC.handler_profiler")
+
+
+def handler_name(func: Callable) -> str:
+    """
+    Возвращает имя обработчика (модуль.функция).
+    """
+    return f"{getattr(func, '__module__', None)}.{getattr(func, '__qualname__', repr(func))}"
+
+
+class _HandlerStats:
+    """
+    Статистика одного обработчика для одного типа события.
+    """
+    __slots__ = ("calls", "errors", "total", "max", "samples")
+
+    def __init__(self, samples: int):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=samples)
+
+
+def _percentile(sorted_samples: list[float], percent: int) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = max(0, -(-len(sorted_samples) * percent // 100) - 1)
+    return sorted_samples[index]
+
+
+class HandlerProfiler:
+    """
+    Профилировщик обработчиков.
+
+    :param samples: сколько последних замеров хранить для расчета перцентилей (на каждый обработчик).
+    :param slow_threshold: порог "медленного" обработчика (в секундах, 0 - не предупреждать).
+    """
+    def __init__(self, samples: int = 512, slow_threshold: int | float = 0):
+        self.samples: int = samples
+        """Сколько последних замеров хранить для расчета перцентилей."""
+        self.slow_threshold: int | float = slow_threshold
+        """Порог "медленного" обработчика (в секундах, 0 - не предупреждать)."""
+        self.__stats: dict[tuple[str, str, str | None], _HandlerStats] = {}
+        self.__lock = threading.Lock()
+
+    def record(self, name: str, event_type: str, plugin_uuid: str | None, duration: float, error: bool = False):
+        """
+        Учитывает вызов обработчика.
+
+        :param name: имя обработчика (см. :func:`handler_name`).
+        :param event_type: тип события (например, NEW_MESSAGE).
+        :param plugin_uuid: UUID плагина, которому принадлежит обработчик (:obj:`None` - встроенный).
+        :param duration: время выполнения (в секундах).
+        :param error: завершился ли обработчик ошибкой.
+        """
+        key = (event_type, name, plugin_uuid)
+        with self.__lock:
+            if (stats := self.__stats.get(key)) is None:
+                stats = self.__stats[key] = _HandlerStats(self.samples)
+            stats.calls += 1
+            stats.errors += error
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            stats.samples.append(duration)
+        if self.slow_threshold and duration >= self.slow_threshold:
+            plugin = f", плагин {plugin_uuid}" if plugin_uuid else ""
+            logger.warning(f"Медленный обработчик {name} ({event_type}{plugin}): {duration:.2f} сек.")
+
+    def stats(self) -> list[dict]:
+        """
+        Возвращает статистику обработчиков: список словарей с ключами event_type, handler, plugin_uuid, calls,
+        errors, error_rate, avg, p50, p95, p99, max (время - в секундах).
+        """
+        with self.__lock:
+            items = [(key, s.calls, s.errors, s.total, s.max, sorted(s.samples)) for key, s in self.__stats.items()]
+        return [{"event_type": event_type, "handler": name, "plugin_uuid": plugin_uuid,
+                 "calls": calls, "errors": errors, "error_rate": errors / calls, "avg": total / calls,
+                 "p50": _percentile(samples, 50), "p95": _percentile(samples, 95), "p99": _percentile(samples, 99),
+                 "max": max_}
+                for (event_type, name, plugin_uuid), calls, errors, total, max_, samples in items]
+
+    def top(self, amount: int = 10, sort_key: str = "p95") -> list[dict]:
+        """
+        Возвращает самые медленные обработчики.
+
+        :param amount: кол-во обработчиков.
+        :param sort_key: ключ сортировки (p50 / p95 / p99 / avg / max / error_rate / calls).
+        """
+        return sorted(self.stats(), key=lambda x: x[sort_key], reverse=True)[:amount]
+
+    def reset(self):
+        """
+        Сбрасывает статистику.
+        """
+        with self.__lock:
+            self.__stats.clear()
+
+# END OF FILE FunPayCortex/Utils/handler_profiler.py
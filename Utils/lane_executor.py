@@ -0,0 +1,210 @@
+# START OF FILE FunPayCortex/Utils/lane_executor.py
+
+"""
+В данном модуле описан пул потоков Кортекса с приоритетными "полосами" (lanes).
+Каждая задача попадает в одну из полос (выдача товара, ответы, панель управления, состояние лотов, статистика...).
+Свободный поток всегда берет задачу из самой приоритетной полосы, у которой есть задачи и не исчерпан лимит
+одновременно выполняющихся задач. Суммарный лимит всех полос, кроме выдачи, меньше кол-ва потоков, поэтому
+под выдачу товара всегда остаются свободные потоки, какой бы длинной ни была очередь уведомлений.
+"""
+
+from __future__ import annotations
+from typing import Callable
+
+from collections import deque
+from concurrent.futures import Future
+import logging
+import threading
+import time
+
+logger = logging.getLogger("FPC.lane_executor")
+
+
+class Lanes:
+    """
+    Полосы (приоритеты) задач.
+    """
+    delivery = "delivery"
+    """Выдача товара."""
+    replies = "replies"
+    """Ответы покупателям: приветствия, автоответы, ответы на отзывы, благодарности."""
+    panel = "panel"
+    """Действия из панели управления Telegram (отдельно от задач плагинов, чтобы те не занимали все потоки UI)."""
+    lots = "lots"
+    """Состояние лотов (восстановление / деактивация, обновление списка лотов)."""
+    default = "default"
+    """Все остальное (в т.ч. задачи плагинов)."""
+    notifications = "notifications"
+    """Задачи перед Telegram-уведомлениями, которым нужны запросы к FunPay."""
+    stats = "stats"
+    """Статистика."""
+
+
+DEFAULT_LANES: dict[str, tuple[int, int]] = {
+    # полоса: (приоритет (меньше - важнее), макс. кол-во одновременно выполняющихся задач)
+    Lanes.delivery: (0, 20),
+    Lanes.replies: (1, 5),
+    Lanes.panel: (2, 8),
+    Lanes.lots: (3, 2),
+    Lanes.default: (4, 4),
+    Lanes.notifications: (5, 3),
+    Lanes.stats: (6, 2)
+}
+"""Полосы по умолчанию."""
+
+
+class _Lane:
+    """
+    Полоса задач.
+    """
+    __slots__ = ("name", "priority", "max_workers", "queue", "running", "submitted", "completed", "failed",
+                 "max_queued", "wait_time")
+
+    def __init__(self, name: str, priority: int, max_workers: int):
+        self.name = name
+        self.priority = priority
+        self.max_workers = max_workers
+        self.queue: deque[tuple[Future, Callable, tuple, dict, float]] = deque()
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queued = 0
+        self.wait_time = 0.0
+
+
+class LaneExecutor:
+    """
+    Пул потоков с приоритетными полосами. Совместим с :class:`concurrent.futures.ThreadPoolExecutor`
+    (submit / shutdown): задачи, отправленные через :meth:`submit`, попадают в полосу :attr:`Lanes.default`.
+
+    :param max_workers: максимальное кол-во потоков.
+    :param lanes: полосы ({название: (приоритет, макс. кол-во одновременно выполняющихся задач)}).
+    :param thread_name_prefix: префикс названий потоков.
+    """
+    def __init__(self, max_workers: int = 28, lanes: dict[str, tuple[int, int]] | None = None,
+                 thread_name_prefix: str = "CortexWorker"):
+        self.max_workers: int = max_workers
+        """Максимальное кол-во потоков."""
+        self.thread_name_prefix: str = thread_name_prefix
+        """Префикс названий потоков."""
+        self.lanes: dict[str, _Lane] = {name: _Lane(name, priority, cap)
+                                        for name, (priority, cap) in (lanes or DEFAULT_LANES).items()}
+        """Полосы."""
+        self.__ordered_lanes: list[_Lane] = sorted(self.lanes.values(), key=lambda x: x.priority)
+        self.__threads: list[threading.Thread] = []
+        self.__idle: int = 0
+        self.__shutdown: bool = False
+        self.__cond = threading.Condition()
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """
+        Ставит задачу в полосу :attr:`Lanes.default`.
+
+        :param fn: функция.
+
+        :return: объект Future задачи.
+        """
+        return self.submit_to(Lanes.default, fn, *args, **kwargs)
+
+    def submit_to(self, lane: str, fn: Callable, /, *args, **kwargs) -> Future:
+        """
+        Ставит задачу в указанную полосу.
+
+        :param lane: название полосы (см. :class:`Lanes`). Неизвестная полоса заменяется на :attr:`Lanes.default`.
+        :param fn: функция.
+
+        :return: объект Future задачи.
+        """
+        future = Future()
+        with self.__cond:
+            if self.__shutdown:
+                raise RuntimeError("Нельзя добавлять задачи после остановки пула.")
+            lane_obj = self.lanes.get(lane) or self.lanes[Lanes.default]
+            lane_obj.queue.append((future, fn, args, kwargs, time.monotonic()))
+            lane_obj.submitted += 1
+            lane_obj.max_queued = max(lane_obj.max_queued, len(lane_obj.queue))
+            self.__wake()
+        return future
+
+    def __wake(self):
+        # Будит простаивающий поток (или создает новый). Счетчик простаивающих уменьшает тот, кто будит:
+        # иначе несколько submit подряд "разбудили" бы один и тот же поток.
+        if self.__idle:
+            self.__idle -= 1
+            self.__cond.notify()
+        elif len(self.__threads) < self.max_workers:
+            thread = threading.Thread(target=self.__worker, daemon=True,
+                                      name=f"{self.thread_name_prefix}_{len(self.__threads)}")
+            self.__threads.append(thread)
+            thread.start()
+
+    def __runnable(self) -> bool:
+        return any(lane.queue and lane.running < lane.max_workers for lane in self.__ordered_lanes)
+
+    def __next_task(self) -> tuple[_Lane, tuple] | None:
+        for lane in self.__ordered_lanes:
+            if lane.queue and lane.running < lane.max_workers:
+                lane.running += 1
+                task = lane.queue.popleft()
+                lane.wait_time += time.monotonic() - task[4]
+                # Поток мог взять задачу из более приоритетной полосы, чем та, в которой освободилось место.
+                if self.__runnable():
+                    self.__wake()
+                return lane, task
+        return None
+
+    def __worker(self):
+        while True:
+            with self.__cond:
+                while (task := self.__next_task()) is None:
+                    if self.__shutdown:
+                        return
+                    self.__idle += 1
+                    self.__cond.wait()
+            lane, (future, fn, args, kwargs, _) = task
+            failed = False
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    failed = True
+                    future.set_exception(e)
+                    logger.debug(f"Задача в полосе {lane.name} завершилась с ошибкой.", exc_info=True)
+            with self.__cond:
+                lane.running -= 1
+                lane.completed += 1
+                lane.failed += failed
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        """
+        Останавливает пул (аналог :meth:`concurrent.futures.ThreadPoolExecutor.shutdown`).
+
+        :param wait: ждать ли завершения потоков.
+        :param cancel_futures: отменить ли задачи, которые еще не начали выполняться.
+        """
+        with self.__cond:
+            self.__shutdown = True
+            if cancel_futures:
+                for lane in self.__ordered_lanes:
+                    while lane.queue:
+                        lane.queue.popleft()[0].cancel()
+            self.__cond.notify_all()
+            threads = list(self.__threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        """
+        Возвращает метрики полос: длина очереди (и ее максимум), кол-во выполняющихся / выполненных / упавших задач,
+        среднее время ожидания в очереди (в секундах).
+        """
+        with self.__cond:
+            return {lane.name: {"queued": len(lane.queue), "max_queued": lane.max_queued, "running": lane.running,
+                                "max_workers": lane.max_workers, "submitted": lane.submitted,
+                                "completed": lane.completed, "failed": lane.failed,
+                                "avg_wait": lane.wait_time / lane.completed if lane.completed else 0.0}
+                    for lane in self.__ordered_lanes}
+
+# END OF FILE FunPayCortex/Utils/lane_executor.py
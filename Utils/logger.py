@@ -1,11 +1,17 @@
 """
-В данном модуле написаны форматтеры для логгера.
+В данном модуле написаны форматтеры и обработчики для логгера.
 """
 from colorama import Fore, Back, Style
 import logging.handlers
 import logging
+import datetime
+import atexit
+import queue
+import copy
+import json
 import re
 import os
+import threading
 
 # ИЗМЕНЕНИЕ: Импорт redis для Pub/Sub
 try:
@@ -30,61 +36,244 @@ FILE_LOG_FORMAT = "[%(asctime)s][%(filename)s][%(lineno)d]> %(levelname).1s: %(m
 FILE_TIME_FORMAT = "%d.%m.%y %H:%M:%S"
 CLEAR_RE = re.compile(r"(\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~]))|(\n)|(\r)")
 
+COLORS = {
+    "$YELLOW": Fore.YELLOW,
+    "$CYAN": Fore.CYAN,
+    "$MAGENTA": Fore.MAGENTA,
+    "$BLUE": Fore.BLUE,
+    "$GREEN": Fore.GREEN,
+    "$BLACK": Fore.BLACK,
+    "$WHITE": Fore.WHITE,
+
+    "$B_YELLOW": Back.YELLOW,
+    "$B_CYAN": Back.CYAN,
+    "$B_MAGENTA": Back.MAGENTA,
+    "$B_BLUE": Back.BLUE,
+    "$B_GREEN": Back.GREEN,
+    "$B_BLACK": Back.BLACK,
+    "$B_WHITE": Back.WHITE,
+}
+"""Ключевые слова цветов в сообщениях логов."""
+COLORS_RE = re.compile("|".join(re.escape(i) for i in sorted([*COLORS, "$RESET"], key=len, reverse=True)))
+"""Все ключевые слова цветов (и $RESET) одним регулярным выражением (замена за один проход)."""
+
 
 def add_colors(text: str) -> str:
     """
     Заменяет ключевые слова на коды цветов.
     """
-    colors = {
-        "$YELLOW": Fore.YELLOW,
-        "$CYAN": Fore.CYAN,
-        "$MAGENTA": Fore.MAGENTA,
-        "$BLUE": Fore.BLUE,
-        "$GREEN": Fore.GREEN,
-        "$BLACK": Fore.BLACK,
-        "$WHITE": Fore.WHITE,
-
-        "$B_YELLOW": Back.YELLOW,
-        "$B_CYAN": Back.CYAN,
-        "$B_MAGENTA": Back.MAGENTA,
-        "$B_BLUE": Back.BLUE,
-        "$B_GREEN": Back.GREEN,
-        "$B_BLACK": Back.BLACK,
-        "$B_WHITE": Back.WHITE,
-    }
-    for c in colors:
-        if c in text:
-            text = text.replace(c, colors[c])
-    return text
+    if "$" not in text:
+        return text
+    return COLORS_RE.sub(lambda m: COLORS.get(m.group(), m.group()), text)
 
 
-class CLILoggerFormatter(logging.Formatter):
+class _PrebuiltFormatter(logging.Formatter):
+    """
+    Форматтер, который форматирует запись с уже подготовленным текстом сообщения, не копируя саму запись.
+    """
+    def _format(self, record: logging.LogRecord, message: str) -> str:
+        # То же, что logging.Formatter.format, но вместо record.getMessage() - переданный текст.
+        record.message = message
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        s = self.formatMessage(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            s = s + ("\n" if s[-1:] != "\n" else "") + record.exc_text
+        if record.stack_info:
+            s = s + ("\n" if s[-1:] != "\n" else "") + self.formatStack(record.stack_info)
+        return s
+
+
+class CLILoggerFormatter(_PrebuiltFormatter):
     """
     Форматтер для вывода логов в консоль.
     """
+    def __init__(self, *args, **kwargs):
+        super().__init__(CLI_LOG_FORMAT.replace("$RESET", Style.RESET_ALL), CLI_TIME_FORMAT)
+        self.__formatters = {level: _PrebuiltFormatter(CLI_LOG_FORMAT.replace("$RESET", Style.RESET_ALL + color),
+                                                       CLI_TIME_FORMAT)
+                             for level, color in LOG_COLORS.items()}
+
     def format(self, record: logging.LogRecord) -> str:
-        record_copy = logging.makeLogRecord(record.__dict__)
-        message = record_copy.getMessage()
-        message = add_colors(message)
-        message = message.replace("$RESET", LOG_COLORS.get(record_copy.levelno, ''))
-        record_copy.msg = message
-        record_copy.args = ()
-        log_format = CLI_LOG_FORMAT.replace("$RESET", Style.RESET_ALL + LOG_COLORS.get(record_copy.levelno, ''))
-        formatter = logging.Formatter(log_format, CLI_TIME_FORMAT)
-        return formatter.format(record_copy)
+        message = record.getMessage()
+        if "$" in message:
+            level_color = LOG_COLORS.get(record.levelno, "")
+            message = COLORS_RE.sub(lambda m: COLORS.get(m.group(), level_color), message)
+        return self.__formatters.get(record.levelno, self)._format(record, message)
 
 
-class FileLoggerFormatter(logging.Formatter):
+class FileLoggerFormatter(_PrebuiltFormatter):
     """
     Форматтер для сохранения логов в файл.
     """
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_LOG_FORMAT, FILE_TIME_FORMAT)
+
     def format(self, record: logging.LogRecord) -> str:
-        record_copy = logging.makeLogRecord(record.__dict__)
-        message = record_copy.getMessage()
-        record_copy.msg = CLEAR_RE.sub("", message)
-        record_copy.args = ()
-        formatter = logging.Formatter(FILE_LOG_FORMAT, FILE_TIME_FORMAT)
-        return formatter.format(record_copy)
+        return self._format(record, CLEAR_RE.sub("", record.getMessage()))
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Форматтер JSON-lines (одна запись - один JSON-объект в строке) для машинной обработки логов.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        data = {"time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+                "level": record.levelname, "logger": record.name, "file": record.filename, "line": record.lineno,
+                "thread": record.threadName, "message": CLEAR_RE.sub("", record.getMessage())}
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler, который в режиме :attr:`buffered` не сбрасывает буфер после каждой записи:
+    буфер сбрасывает :class:`BatchQueueListener` после каждой пачки записей (см. :meth:`flush_buffer`).
+    """
+    buffered: bool = False
+    """Откладывать ли сброс буфера."""
+
+    def flush(self):
+        if not self.buffered:
+            super().flush()
+
+    def flush_buffer(self):
+        """
+        Сбрасывает буфер файла.
+        """
+        super().flush()
+
+
+class _TargetQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, который кладет в очередь запись вместе со списком обработчиков, которым она предназначена.
+    """
+    def __init__(self, q: queue.SimpleQueue, targets: list[logging.Handler]):
+        super().__init__(q)
+        self.targets: list[logging.Handler] = targets
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Очередь внутри процесса: достаточно зафиксировать текст сообщения (аргументы могут измениться позже).
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        self.queue.put_nowait((record, self.targets))
+
+
+class BatchQueueListener:
+    """
+    Поток записи логов: забирает из очереди все накопившиеся записи (до :attr:`batch_size` за раз),
+    передает их обработчикам и сбрасывает буферы файлов один раз на пачку.
+
+    :param q: очередь.
+    :param batch_size: максимальный размер пачки.
+    """
+    _STOP = object()
+
+    def __init__(self, q: queue.SimpleQueue, batch_size: int = 256):
+        self.queue: queue.SimpleQueue = q
+        self.batch_size: int = batch_size
+        """Максимальный размер пачки."""
+        self.__thread: threading.Thread | None = None
+
+    def start(self):
+        """
+        Запускает поток записи логов.
+        """
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="LogWriter")
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Записывает оставшиеся в очереди записи и останавливает поток.
+        """
+        if self.__thread:
+            self.queue.put_nowait(self._STOP)
+            self.__thread.join()
+            self.__thread = None
+
+    def __run(self):
+        stop = False
+        while not stop:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            buffered = set()
+            for item in batch:
+                if item is self._STOP:
+                    stop = True
+                    continue
+                record, targets = item
+                for handler in targets:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+                        if isinstance(handler, BufferedRotatingFileHandler):
+                            buffered.add(handler)
+            for handler in buffered:
+                handler.flush_buffer()
+
+
+_listeners: list[BatchQueueListener] = []
+
+
+def enable_queue_logging(logger_names: list[str], json_path: str | None = None) -> BatchQueueListener:
+    """
+    Переводит логгеры в неблокирующий режим: логгеры лишь кладут записи в очередь, а форматирование и запись
+    в консоль / файлы выполняет отдельный поток (:class:`BatchQueueListener`).
+
+    :param logger_names: названия логгеров (их обработчики переносятся в поток записи логов).
+    :param json_path: путь до файла JSON-lines (None - не писать).
+
+    :return: запущенный поток записи логов (останавливается автоматически при обычном завершении программы,
+        перед os._exit / os.execl / terminate нужно вызвать :func:`stop_logging`).
+    """
+    q = queue.SimpleQueue()
+    json_handler = None
+    if json_path:
+        json_handler = BufferedRotatingFileHandler(json_path, maxBytes=20 * 1024 * 1024, backupCount=5,
+                                                   encoding="utf-8")
+        json_handler.setFormatter(JsonLinesFormatter())
+
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        targets = list(logger.handlers)
+        if not targets:
+            continue
+        if json_handler and any(isinstance(h, logging.FileHandler) for h in targets):
+            json_handler.setLevel(min(h.level for h in targets if isinstance(h, logging.FileHandler)))
+            targets.append(json_handler)
+        for handler in targets:
+            if isinstance(handler, BufferedRotatingFileHandler):
+                handler.buffered = True
+            logger.removeHandler(handler)
+        logger.addHandler(_TargetQueueHandler(q, targets))
+
+    listener = BatchQueueListener(q)
+    listener.start()
+    _listeners.append(listener)
+    atexit.register(listener.stop)
+    return listener
+
+
+def stop_logging():
+    """
+    Записывает оставшиеся в очереди записи и останавливает потоки записи логов. Нужно вызывать перед выходом
+    в обход atexit (os._exit, os.execl, terminate), иначе записи из очереди (в т.ч. причина выхода) теряются.
+    Если неблокирующий режим не включен, ничего не делает.
+    """
+    while _listeners:
+        _listeners.pop().stop()
 
 
 # ИЗМЕНЕНИЕ: Новый класс для отправки логов в Redis Pub/Sub
@@ -119,7 +308,7 @@ LOGGER_CONFIG = {
     "version": 1,
     "handlers": {
         "file_handler": {
-            "class": "logging.handlers.RotatingFileHandler",
+            "class": "Utils.logger.BufferedRotatingFileHandler",
             "level": "DEBUG",
             "formatter": "file_formatter",
             "filename": "logs/log.log",
@@ -0,0 +1,351 @@
+# START OF FILE FunPayCortex/Utils/metrics.py
+
+"""
+В данном модуле описан локальный HTTP-эндпоинт метрик в текстовом формате Prometheus (только stdlib).
+
+Счетчики и гистограммы обновляются через хуки FunPayAPI (:attr:`FunPayAPI.account.Account.request_hook`,
+:attr:`FunPayAPI.updater.runner.Runner.metrics_hook`) и диспетчера уведомлений
+(:attr:`tg_bot.notifier.NotificationDispatcher.send_hook`), а метрики-"снимки" (очереди пула потоков, задержки
+обработчиков, остатки товаров) собираются в момент запроса ``GET /metrics``.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Iterable
+
+if TYPE_CHECKING:
+    from cortex import Cortex
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import os
+import re
+import threading
+
+from Utils import products_store
+
+logger = logging.getLogger("FPC.metrics")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+"""Границы корзин гистограмм задержек по умолчанию (в секундах)."""
+EVENTS_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+"""Границы корзин гистограммы кол-ва событий за опрос."""
+
+Sample = tuple[dict[str, str], float]
+Collector = Callable[[], Iterable[tuple[str, str, str, list[Sample]]]]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Счетчик.
+
+    :param name: название метрики.
+    :param documentation: описание метрики.
+    :param labelnames: названия меток.
+    """
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: tuple[str, ...] = labelnames
+        self.__values: dict[tuple, float] = {}
+        self.__lock = threading.Lock()
+
+    def inc(self, *labels, amount: int | float = 1):
+        """
+        Увеличивает счетчик.
+
+        :param labels: значения меток (в порядке :attr:`labelnames`).
+        :param amount: на сколько увеличить.
+        """
+        with self.__lock:
+            self.__values[labels] = self.__values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self.__lock:
+            values = list(self.__values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(dict(zip(self.labelnames, k)))} {_value(v)}" for k, v in values)
+        return lines
+
+
+class Histogram:
+    """
+    Гистограмма.
+
+    :param name: название метрики.
+    :param documentation: описание метрики.
+    :param labelnames: названия меток.
+    :param buckets: верхние границы корзин (по возрастанию, без +Inf).
+    """
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[int | float, ...] = DEFAULT_BUCKETS):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: tuple[str, ...] = labelnames
+        self.buckets: tuple[int | float, ...] = tuple(buckets)
+        self.__values: dict[tuple, list] = {}
+        self.__lock = threading.Lock()
+
+    def observe(self, value: int | float, *labels):
+        """
+        Учитывает значение.
+
+        :param value: значение.
+        :param labels: значения меток (в порядке :attr:`labelnames`).
+        """
+        with self.__lock:
+            if (data := self.__values.get(labels)) is None:
+                # [счетчики корзин..., сумма, кол-во]
+                data = self.__values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+                    break
+            data[-2] += value
+            data[-1] += 1
+
+    def render(self) -> list[str]:
+        with self.__lock:
+            values = [(k, list(v)) for k, v in self.__values.items()]
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for k, data in values:
+            labels = dict(zip(self.labelnames, k))
+            cumulative = 0
+            for bound, amount in zip(self.buckets, data):
+                cumulative += amount
+                lines.append(f"{self.name}_bucket{_labels({**labels, 'le': _value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels({**labels, 'le': '+Inf'})} {data[-1]}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_value(data[-2])}")
+            lines.append(f"{self.name}_count{_labels(labels)} {data[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик.
+    """
+    def __init__(self):
+        self.__metrics: list[Counter | Histogram] = []
+        self.__collectors: list[Collector] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """
+        Создает и регистрирует счетчик.
+        """
+        metric = Counter(name, documentation, labelnames)
+        self.__metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                  buckets: tuple[int | float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """
+        Создает и регистрирует гистограмму.
+        """
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.__metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector):
+        """
+        Регистрирует сборщик метрик-"снимков". Сборщик вызывается при каждом запросе метрик и возвращает
+        кортежи (название, тип (gauge / counter / summary), описание, [(метки, значение), ...]).
+        Для summary название метки quantile и суффиксы _sum / _count указываются в самих значениях.
+        """
+        self.__collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Возвращает все метрики в текстовом формате Prometheus.
+        """
+        lines = []
+        for metric in self.__metrics:
+            lines.extend(metric.render())
+        for collector in self.__collectors:
+            try:
+                for name, metric_type, documentation, samples in collector():
+                    lines.append(f"# HELP {name} {documentation}")
+                    lines.append(f"# TYPE {name} {metric_type}")
+                    for labels, value in samples:
+                        suffix = labels.pop("__suffix__", "")
+                        lines.append(f"{name}{suffix}{_labels(labels)} {_value(value)}")
+            except Exception:
+                logger.error("Ошибка при сборе метрик.")
+                logger.debug("TRACEBACK", exc_info=True)
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """
+    HTTP-сервер метрик (``GET /metrics``).
+
+    :param registry: реестр метрик.
+    :param host: адрес.
+    :param port: порт.
+    """
+    daemon_threads = True
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int):
+        self.registry: MetricsRegistry = registry
+        super().__init__((host, port), _MetricsHandler)
+
+    def start(self):
+        """
+        Запускает сервер в отдельном потоке.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True, name="MetricsServer").start()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_ID_SEGMENT_RE = re.compile(r"[^/]*\d[^/]*")
+
+
+def normalize_api_method(api_method: str) -> str:
+    """
+    Приводит api_method к виду с небольшим числом значений для метки: без домена, локали и query-параметров,
+    сегменты пути с цифрами (ID пользователей, заказов, лотов) заменяются на ``:id``.
+
+    :param api_method: api_method из :meth:`FunPayAPI.account.Account.method`.
+    """
+    path = api_method.split("?", 1)[0].removeprefix("https://funpay.com").lstrip("/")
+    for locale in ("en/", "uk/"):
+        path = path.removeprefix(locale)
+    return _ID_SEGMENT_RE.sub(":id", path) or "/"
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """
+    Разбирает адрес сервера метрик: "порт" или "хост:порт" (по умолчанию хост - 127.0.0.1).
+
+    :param address: адрес из конфига ([Other] metricsAddress).
+    """
+    host, _, port = address.strip().rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def start_metrics(cortex: Cortex, address: str) -> MetricsServer:
+    """
+    Создает метрики Кортекса, подключает хуки и запускает HTTP-сервер.
+
+    :param cortex: экземпляр Кортекса.
+    :param address: адрес сервера ("порт" или "хост:порт").
+    """
+    registry = MetricsRegistry()
+
+    request_duration = registry.histogram("fpc_funpay_request_duration_seconds",
+                                          "Время запроса к FunPay (одна попытка).", ("api_method",))
+    request_errors = registry.counter("fpc_funpay_request_errors_total",
+                                      "Ответы FunPay 429 / 5xx и ошибки соединения.", ("api_method", "status"))
+
+    def request_hook(api_method: str, status_code: int, duration: float):
+        api_method = normalize_api_method(api_method)
+        request_duration.observe(duration, api_method)
+        if status_code == 429:
+            request_errors.inc(api_method, "429")
+        elif 500 <= status_code < 600:
+            request_errors.inc(api_method, "5xx")
+        elif not status_code:
+            request_errors.inc(api_method, "connection")
+
+    cortex.account.request_hook = request_hook
+
+    poll_duration = registry.histogram("fpc_runner_poll_duration_seconds", "Время запроса к runner'у FunPay.")
+    parse_duration = registry.histogram("fpc_runner_parse_duration_seconds", "Время разбора ответа runner'а.")
+    poll_events = registry.histogram("fpc_runner_events_per_poll", "Кол-во событий в одном ответе runner'а.",
+                                     buckets=EVENTS_BUCKETS)
+
+    def runner_hook(stage: str, duration: float, events: int):
+        if stage == "fetch":
+            poll_duration.observe(duration)
+        else:
+            parse_duration.observe(duration)
+            poll_events.observe(events)
+
+    cortex.runner.metrics_hook = runner_hook
+
+    send_duration = registry.histogram("fpc_telegram_send_duration_seconds",
+                                       "Время запроса к Telegram (без ожидания лимитов).", ("method",))
+    send_errors = registry.counter("fpc_telegram_send_errors_total", "Ошибки запросов к Telegram.", ("method",))
+
+    def send_hook(method: str, duration: float, ok: bool):
+        send_duration.observe(duration, method)
+        if not ok:
+            send_errors.inc(method)
+
+    if cortex.telegram:
+        cortex.telegram.notifier.send_hook = send_hook
+
+    def collect():
+        lanes = cortex.executor.stats()
+        yield "fpc_executor_queued", "gauge", "Задачи в очереди полосы пула потоков.", \
+            [({"lane": k}, v["queued"]) for k, v in lanes.items()]
+        yield "fpc_executor_running", "gauge", "Выполняющиеся задачи полосы пула потоков.", \
+            [({"lane": k}, v["running"]) for k, v in lanes.items()]
+        yield "fpc_executor_completed_total", "counter", "Выполненные задачи полосы пула потоков.", \
+            [({"lane": k}, v["completed"]) for k, v in lanes.items()]
+        yield "fpc_executor_failed_total", "counter", "Задачи полосы пула потоков, завершившиеся ошибкой.", \
+            [({"lane": k}, v["failed"]) for k, v in lanes.items()]
+        if cortex.event_dispatcher:
+            yield "fpc_event_dispatcher_queued", "gauge", "События в очереди шарда диспетчера.", \
+                [({"shard": str(i)}, v) for i, v in enumerate(cortex.event_dispatcher.queued())]
+        if cortex.runner:
+            yield "fpc_runner_pipeline", "gauge", "Очереди и счетчики конвейерного режима runner'а.", \
+                [({"key": k}, v) for k, v in cortex.runner.get_pipeline_metrics().items()]
+
+        handlers = cortex.handler_profiler.stats()
+        samples = []
+        for i in handlers:
+            labels = {"event_type": i["event_type"], "handler": i["handler"], "plugin_uuid": i["plugin_uuid"] or ""}
+            samples.extend(({**labels, "quantile": q}, i[key]) for q, key in (("0.5", "p50"), ("0.95", "p95"),
+                                                                                ("0.99", "p99")))
+            samples.append(({**labels, "__suffix__": "_sum"}, i["avg"] * i["calls"]))
+            samples.append(({**labels, "__suffix__": "_count"}, i["calls"]))
+        yield "fpc_handler_duration_seconds", "summary", "Время выполнения обработчиков событий.", samples
+        yield "fpc_handler_errors_total", "counter", "Ошибки обработчиков событий.", \
+            [({"event_type": i["event_type"], "handler": i["handler"], "plugin_uuid": i["plugin_uuid"] or ""},
+              i["errors"]) for i in handlers]
+
+        products_dir = "storage/products"
+        files = sorted(f for f in os.listdir(products_dir) if f.endswith(".txt")) \
+            if os.path.isdir(products_dir) else []
+        yield "fpc_products_remaining", "gauge", "Оставшиеся товары в товарном файле.", \
+            [({"file": f}, products_store.count(os.path.join(products_dir, f))) for f in files]
+
+    registry.add_collector(collect)
+
+    host, port = parse_address(address)
+    server = MetricsServer(registry, host, port)
+    server.start()
+    logger.info(f"Метрики доступны по адресу http://{host}:{port}/metrics")
+    return server
+
+# END OF FILE FunPayCortex/Utils/metrics.py
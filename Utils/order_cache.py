@@ -0,0 +1,164 @@
+# START OF FILE FunPayCortex/Utils/order_cache.py
+
+"""
+В данном модуле описан кэш заказов FunPay: ограниченный по размеру (LRU), с TTL и объединением одновременных
+запросов одного и того же заказа (single-flight): сколько бы потоков ни запросили заказ одновременно,
+к FunPay уйдет один запрос, а остальные потоки дождутся его результата.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from FunPayAPI.types import Order
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class _Flight:
+    """
+    Запрос заказа, выполняющийся в данный момент.
+    """
+    __slots__ = ("event", "result")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Order | None = None
+
+
+class OrderCache:
+    """
+    Кэш заказов.
+
+    :param max_size: максимальное кол-во заказов в кэше (при переполнении удаляются давно не использованные).
+    :param ttl: время жизни заказа в кэше (в секундах).
+    :param wait_timeout: сколько максимум ждать результата чужого запроса того же заказа (в секундах).
+    """
+    def __init__(self, max_size: int = 512, ttl: int | float = 3600, wait_timeout: int | float = 120):
+        self.max_size: int = max_size
+        """Максимальное кол-во заказов в кэше."""
+        self.ttl: int | float = ttl
+        """Время жизни заказа в кэше (в секундах)."""
+        self.wait_timeout: int | float = wait_timeout
+        """Сколько максимум ждать результата чужого запроса того же заказа (в секундах)."""
+
+        self.hits: int = 0
+        """Кол-во запросов, обслуженных из кэша."""
+        self.misses: int = 0
+        """Кол-во запросов, для которых заказ был получен с FunPay."""
+        self.coalesced: int = 0
+        """Кол-во запросов, дождавшихся уже выполняющегося запроса того же заказа."""
+        self.evictions: int = 0
+        """Кол-во заказов, удаленных из кэша (по TTL или из-за переполнения)."""
+
+        self.__orders: OrderedDict[str, tuple[Order, float]] = OrderedDict()
+        self.__in_flight: dict[str, _Flight] = {}
+        self.__lock = threading.Lock()
+
+    def __get(self, order_id: str, now: float) -> Order | None:
+        if (item := self.__orders.get(order_id)) is None:
+            return None
+        order, cache_time = item
+        if now >= cache_time + self.ttl:
+            del self.__orders[order_id]
+            self.evictions += 1
+            return None
+        self.__orders.move_to_end(order_id)
+        return order
+
+    def __put(self, order_id: str, order: Order, now: float):
+        self.__orders[order_id] = (order, now)
+        self.__orders.move_to_end(order_id)
+        if len(self.__orders) <= self.max_size:
+            return
+        for expired_id in [k for k, (_, cache_time) in self.__orders.items() if now >= cache_time + self.ttl]:
+            del self.__orders[expired_id]
+            self.evictions += 1
+        while len(self.__orders) > self.max_size:
+            self.__orders.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, order_id: str) -> Order | None:
+        """
+        Возвращает заказ из кэша.
+
+        :param order_id: ID заказа.
+
+        :return: заказ или :obj:`None`, если его нет в кэше (или истек TTL).
+        """
+        with self.__lock:
+            return self.__get(order_id, time.time())
+
+    def put(self, order_id: str, order: Order):
+        """
+        Кладет заказ в кэш.
+
+        :param order_id: ID заказа.
+        :param order: объект заказа.
+        """
+        with self.__lock:
+            self.__put(order_id, order, time.time())
+
+    def invalidate(self, order_id: str):
+        """
+        Удаляет заказ из кэша.
+
+        :param order_id: ID заказа.
+        """
+        with self.__lock:
+            self.__orders.pop(order_id, None)
+
+    def get_or_fetch(self, order_id: str, fetch: Callable[[], Order | None]) -> Order | None:
+        """
+        Возвращает заказ из кэша, а если его нет - получает через fetch. Одновременные вызовы с одним ID заказа
+        объединяются: fetch вызывается один раз, остальные вызовы ждут и получают тот же результат.
+        Неудачный результат (:obj:`None` или исключение) не кэшируется.
+
+        :param order_id: ID заказа.
+        :param fetch: функция получения заказа.
+
+        :return: заказ или :obj:`None`.
+        """
+        with self.__lock:
+            if (order := self.__get(order_id, time.time())) is not None:
+                self.hits += 1
+                return order
+            flight = self.__in_flight.get(order_id)
+            leader = flight is None
+            if leader:
+                flight = self.__in_flight[order_id] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait(self.wait_timeout)
+            return flight.result
+
+        try:
+            flight.result = fetch()
+            if flight.result is not None:
+                self.put(order_id, flight.result)
+            return flight.result
+        finally:
+            with self.__lock:
+                self.__in_flight.pop(order_id, None)
+            flight.event.set()
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Возвращает статистику кэша.
+        """
+        with self.__lock:
+            size, in_flight = len(self.__orders), len(self.__in_flight)
+        requests_total = self.hits + self.misses + self.coalesced
+        return {"size": size, "max_size": self.max_size, "in_flight": in_flight,
+                "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "evictions": self.evictions,
+                "hit_rate": (self.hits + self.coalesced) / requests_total if requests_total else 0.0}
+
+    def __len__(self) -> int:
+        return len(self.__orders)
+
+# END OF FILE FunPayCortex/Utils/order_cache.py
@@ -0,0 +1,438 @@
+# START OF FILE FunPayCortex/Utils/products_store.py
+
+"""
+В данном модуле описано хранилище товаров автовыдачи.
+
+Товарный файл (``storage/products/*.txt``) остается единственным источником истины: один товар - одна строка.
+Рядом с ним хранится небольшой индекс ``<файл>.idx`` с курсором (смещением в байтах до первого невыданного товара),
+CRC32 уже выданной части файла, длиной и CRC32 первого невыданного товара и кол-вом оставшихся товаров.
+Благодаря этому выдача N товаров стоит O(N), а подсчет оставшихся товаров - O(1), без чтения и перезаписи
+всего файла.
+
+Выданная часть файла удаляется (компактизация) через временный файл и :func:`os.replace` только тогда, когда она
+становится не меньше :data:`COMPACT_MIN_BYTES` и не меньше невыданной части (так перезапись в среднем стоит O(1)
+на товар), а также перед скачиванием файла.
+Если файл был изменен вне бота (размер или mtime не совпадают с индексом), индекс пересчитывается:
+курсор сохраняется, если выданная часть файла не изменилась (совпадает CRC32). Иначе курсор ставится на строку,
+совпадающую с первым невыданным товаром (например, если оператор удалил выданные строки), а если такой строки
+нет (файл заменен) - на начало файла.
+
+Все операции над одним файлом сериализуются собственной блокировкой файла. Для выдачи используется
+:func:`reserve`: товары сразу списываются из файла (повторно их никто не получит), а при неудачной отправке
+резерв откатывается и товары возвращаются в начало очереди.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+import zlib
+
+import Utils.exceptions
+
+logger = logging.getLogger("FPC.products_store")
+
+INDEX_SUFFIX = ".idx"
+"""Суффикс файла индекса товарного файла."""
+COMPACT_MIN_BYTES = 64 * 1024
+"""Минимальный размер выданной части файла (в байтах), после которого допускается компактизация."""
+READ_CHUNK = 64 * 1024
+"""Размер блока чтения (в байтах)."""
+
+_indexes: dict[str, dict] = {}
+_locks: dict[str, threading.RLock] = {}
+_locks_lock = threading.Lock()
+
+
+def _key(path: str) -> str:
+    return os.path.abspath(path)
+
+
+def lock(path: str) -> threading.RLock:
+    """
+    Возвращает блокировку товарного файла (одну и ту же для всех вариантов записи пути).
+
+    :param path: путь до товарного файла.
+    """
+    key = _key(path)
+    with _locks_lock:
+        if key not in _locks:
+            _locks[key] = threading.RLock()
+        return _locks[key]
+
+
+def _tmp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def _atomic_write(path: str, data: bytes):
+    """
+    Атомарно перезаписывает файл: данные пишутся во временный файл, который затем подменяет оригинал.
+    """
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _stat(path: str) -> os.stat_result | None:
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _decode(line: bytes) -> str:
+    return line.rstrip(b"\r\n").decode("utf-8")
+
+
+def _count_lines(path: str, offset: int) -> int:
+    """
+    Считает кол-во непустых строк в файле, начиная с указанного смещения.
+    """
+    amount = 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if line.rstrip(b"\r\n"):
+                amount += 1
+    return amount
+
+
+def _crc(path: str, length: int) -> int:
+    """
+    Считает CRC32 первых length байт файла.
+    """
+    crc = 0
+    with open(path, "rb") as f:
+        while length > 0:
+            chunk = f.read(min(READ_CHUNK, length))
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            length -= len(chunk)
+    return crc
+
+
+def _read_index(path: str) -> dict | None:
+    try:
+        with open(_index_path(path), "r", encoding="utf-8") as f:
+            index = json.loads(f.read())
+        if all(isinstance(index.get(i), int) for i in ("offset", "crc", "size", "mtime_ns", "remaining")):
+            index.setdefault("head", None)
+            return index
+    except (FileNotFoundError, json.decoder.JSONDecodeError, AttributeError, UnicodeDecodeError):
+        pass
+    return None
+
+
+def _save_index(path: str, index: dict):
+    _indexes[_key(path)] = index
+    _atomic_write(_index_path(path), json.dumps(index).encode("utf-8"))
+
+
+def _head(path: str, offset: int) -> list[int] | None:
+    """
+    Возвращает [длина, CRC32] первой непустой строки файла, начиная с указанного смещения.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if line.rstrip(b"\r\n"):
+                return [len(line), zlib.crc32(line)]
+    return None
+
+
+def _find_head(path: str, head: list[int] | None) -> int | None:
+    """
+    Ищет в файле строку с указанными длиной и CRC32.
+
+    :return: смещение строки или :obj:`None`, если строка не найдена.
+    """
+    if not head:
+        return None
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if len(line) == head[0] and zlib.crc32(line) == head[1]:
+                return offset
+            offset += len(line)
+    return None
+
+
+def _new_index(path: str, offset: int, crc: int, remaining: int) -> dict:
+    st = os.stat(path)
+    return {"offset": offset, "crc": crc, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "remaining": remaining,
+            "head": _head(path, offset) if offset else None}
+
+
+def _matches(index: dict | None, st: os.stat_result) -> bool:
+    return index is not None and index["size"] == st.st_size and index["mtime_ns"] == st.st_mtime_ns
+
+
+def _load_index(path: str, st: os.stat_result) -> dict:
+    """
+    Возвращает актуальный индекс товарного файла (из памяти, с диска или построенный заново).
+    """
+    index = _indexes.get(_key(path))
+    if _matches(index, st):
+        return index
+
+    index = _read_index(path)
+    if _matches(index, st):
+        _indexes[_key(path)] = index
+        return index
+
+    offset, crc = 0, 0
+    if index is not None and 0 < index["offset"] <= st.st_size and _crc(path, index["offset"]) == index["crc"]:
+        offset, crc = index["offset"], index["crc"]
+    elif index is not None and index["offset"]:
+        offset = _find_head(path, index["head"])
+        if offset is not None:
+            crc = _crc(path, offset)
+            logger.warning(f"Выданная часть товарного файла $YELLOW{path}$RESET была изменена вне бота. "
+                           f"Выдача продолжится с первого невыданного товара.")
+        else:
+            offset = 0
+            logger.warning(f"Товарный файл $YELLOW{path}$RESET был изменен вне бота, первый невыданный товар "
+                           f"в нем не найден. Выдача начнется с начала файла.")
+
+    index = _new_index(path, offset, crc, _count_lines(path, offset))
+    _save_index(path, index)
+    return index
+
+
+def _rewrite(path: str, index: dict, head: bytes = b""):
+    """
+    Атомарно перезаписывает товарный файл, удаляя выданную часть и (опционально) добавляя данные в начало.
+    """
+    tmp_path = _tmp_path(path)
+    with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+        dst.write(head)
+        src.seek(index["offset"])
+        shutil.copyfileobj(src, dst, READ_CHUNK)
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(tmp_path, path)
+
+
+def count(path: str) -> int:
+    """
+    Возвращает кол-во оставшихся товаров в товарном файле.
+
+    :param path: путь до товарного файла.
+
+    :return: кол-во товаров (0, если файла нет).
+    """
+    with lock(path):
+        st = _stat(path)
+        if st is None:
+            return 0
+        return _load_index(path, st)["remaining"]
+
+
+def _pop(path: str, amount: int) -> tuple[list[str], int, tuple[int, int, int, int] | None]:
+    """
+    Забирает товары из начала товарного файла. Вызывается под блокировкой файла.
+
+    :return: (товары, кол-во оставшихся товаров, (старое смещение, старый CRC, новое смещение, новый CRC) или
+        :obj:`None`, если курсор нельзя откатить, т.к. файл был перезаписан)
+    """
+    st = _stat(path)
+    if st is None:
+        raise Utils.exceptions.ProductsFileNotFoundError(path)
+    index = _load_index(path, st)
+    if not index["remaining"]:
+        raise Utils.exceptions.NoProductsError(path)
+    elif index["remaining"] < amount:
+        raise Utils.exceptions.NotEnoughProductsError(path, index["remaining"], amount)
+
+    offset, crc, products = index["offset"], index["crc"], []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while len(products) < amount:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
+            crc = zlib.crc32(line, crc)
+            if line.rstrip(b"\r\n"):
+                products.append(_decode(line))
+
+    if len(products) < amount:
+        # Индекс разошелся с файлом: до конца файла дочитали меньше, чем ожидалось.
+        forget(path)
+        raise Utils.exceptions.NotEnoughProductsError(path, len(products), amount) if products \
+            else Utils.exceptions.NoProductsError(path)
+
+    remaining = index["remaining"] - amount
+    cursor = None
+    if not remaining:
+        _atomic_write(path, b"")
+        new_index = _new_index(path, 0, 0, 0)
+    elif offset >= COMPACT_MIN_BYTES and offset * 2 >= index["size"]:
+        _rewrite(path, {"offset": offset})
+        new_index = _new_index(path, 0, 0, remaining)
+    else:
+        new_index = _new_index(path, offset, crc, remaining)
+        cursor = (index["offset"], index["crc"], offset, crc)
+    _save_index(path, new_index)
+    return products, remaining, cursor
+
+
+def pop(path: str, amount: int = 1) -> list[list[str] | int]:
+    """
+    Забирает товары из начала товарного файла.
+
+    :param path: путь до товарного файла.
+    :param amount: кол-во товаров.
+
+    :return: [[товары], кол-во оставшихся товаров]
+    """
+    with lock(path):
+        products, remaining, _ = _pop(path, amount)
+    return [products, remaining]
+
+
+class Reservation:
+    """
+    Резерв товаров под одну выдачу.
+
+    Товары уже списаны из файла, поэтому параллельные выдачи не получат их повторно.
+    Если выдача не удалась, резерв нужно откатить (:meth:`rollback`), иначе - подтвердить (:meth:`commit`).
+    Может использоваться как контекстный менеджер: при исключении внутри блока резерв откатывается.
+    """
+    def __init__(self, path: str, products: list[str], left: int, cursor: tuple[int, int, int, int] | None):
+        self.path: str = path
+        """Путь до товарного файла."""
+        self.products: list[str] = products
+        """Зарезервированные товары."""
+        self.left: int = left
+        """Кол-во товаров, оставшихся в файле после резервирования."""
+        self.__cursor = cursor
+        self.__closed = False
+
+    def commit(self):
+        """
+        Подтверждает выдачу зарезервированных товаров (товары уже списаны из файла при резервировании).
+        """
+        self.__closed = True
+
+    def rollback(self):
+        """
+        Возвращает зарезервированные товары в начало очереди.
+
+        Если после резервирования файл не менялся, курсор просто сдвигается назад (без перезаписи файла),
+        иначе товары дописываются в начало файла.
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        with lock(self.path):
+            st = _stat(self.path)
+            index = _load_index(self.path, st) if st is not None else None
+            if index is not None and self.__cursor is not None \
+                    and (index["offset"], index["crc"]) == self.__cursor[2:]:
+                _save_index(self.path, _new_index(self.path, self.__cursor[0], self.__cursor[1],
+                                                  index["remaining"] + len(self.products)))
+            else:
+                add(self.path, self.products, at_zero_position=True)
+        logger.info(f"Возвращено $CYAN{len(self.products)}$RESET товар(-а, -ов) в файл $YELLOW{self.path}$RESET.")
+
+    def __enter__(self) -> Reservation:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.rollback()
+        else:
+            self.commit()
+
+
+def reserve(path: str, amount: int = 1) -> Reservation:
+    """
+    Резервирует товары из начала товарного файла под выдачу.
+
+    :param path: путь до товарного файла.
+    :param amount: кол-во товаров.
+
+    :return: объект резерва.
+    """
+    with lock(path):
+        products, remaining, cursor = _pop(path, amount)
+    return Reservation(path, products, remaining, cursor)
+
+
+def add(path: str, products: list[str], at_zero_position: bool = False):
+    """
+    Добавляет товары в товарный файл.
+
+    :param path: путь до товарного файла.
+    :param products: список товаров.
+    :param at_zero_position: добавить товары в начало файла (перед невыданными товарами).
+    """
+    with lock(path):
+        data = "\n".join(products).encode("utf-8")
+        added = sum(1 for i in data.split(b"\n") if i.rstrip(b"\r"))
+        st = _stat(path)
+        if st is None or not st.st_size:
+            _atomic_write(path, data)
+            _save_index(path, _new_index(path, 0, 0, added))
+            return
+
+        index = _load_index(path, st)
+        if at_zero_position:
+            _rewrite(path, index, data + b"\n")
+            _save_index(path, _new_index(path, 0, 0, index["remaining"] + added))
+            return
+
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            ends_with_newline = f.read(1) == b"\n"
+        with open(path, "ab") as f:
+            f.write(data if ends_with_newline else b"\n" + data)
+            f.flush()
+            os.fsync(f.fileno())
+        _save_index(path, _new_index(path, index["offset"], index["crc"], index["remaining"] + added))
+
+
+def compact(path: str):
+    """
+    Удаляет из товарного файла уже выданные товары (например, перед отправкой файла пользователю).
+
+    :param path: путь до товарного файла.
+    """
+    with lock(path):
+        st = _stat(path)
+        if st is None:
+            return
+        index = _load_index(path, st)
+        if not index["offset"]:
+            return
+        _rewrite(path, index)
+        _save_index(path, _new_index(path, 0, 0, index["remaining"]))
+
+
+def forget(path: str):
+    """
+    Удаляет индекс товарного файла (например, при удалении или замене файла).
+
+    :param path: путь до товарного файла.
+    """
+    with lock(path):
+        _indexes.pop(_key(path), None)
+        try:
+            os.remove(_index_path(path))
+        except FileNotFoundError:
+            pass
+
+# END OF FILE FunPayCortex/Utils/products_store.py
@@ -0,0 +1,286 @@
+# START OF FILE FunPayCortex/Utils/sales_ledger.py
+
+"""
+В данном модуле описан журнал продаж для статистики: база SQLite (stdlib :mod:`sqlite3`) в режиме WAL
+с первичным ключом по ID заказа и индексом по времени заказа.
+
+Добавление / обновление заказа - один UPSERT (O(log n)), без чтения и перезаписи всего файла,
+а выборка за период - запрос по индексу времени.
+
+Для отчетов журнал поддерживает агрегаты: кол-во и сумму продаж по часам и по суткам (UTC) в разрезе статуса
+и валюты. Агрегаты обновляются триггерами SQLite в той же транзакции, что и сами продажи, поэтому отчет за любой
+период стоит O(кол-ва корзин), а не O(кол-ва продаж). Если продажи менялись в обход журнала, агрегаты
+пересчитываются :meth:`SalesLedger.rebuild_buckets`.
+"""
+
+from __future__ import annotations
+from typing import Iterable
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger("FPC.sales_ledger")
+
+SALE_FIELDS = ("order_id", "description", "price", "currency", "status", "buyer_username", "date", "timestamp")
+"""Поля записи о продаже."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales (
+    order_id TEXT PRIMARY KEY,
+    description TEXT,
+    price REAL NOT NULL,
+    currency TEXT NOT NULL,
+    status TEXT NOT NULL,
+    buyer_username TEXT,
+    date TEXT,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sales_timestamp ON sales (timestamp);
+
+CREATE TABLE IF NOT EXISTS buckets (
+    size INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (size, start, status, currency)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+HOUR = 3600
+"""Размер часовой корзины (в секундах)."""
+DAY = 86400
+"""Размер суточной корзины (в секундах)."""
+BUCKETS_VERSION = 1
+"""Версия агрегатов (PRAGMA user_version). Если у базы версия меньше, агрегаты пересчитываются при открытии."""
+
+
+def _bucket_sql(size: int, row: str, sign: str) -> str:
+    # Добавляет (sign="+") или вычитает (sign="-") продажу row (NEW / OLD) из ее корзины; пустая корзина удаляется.
+    start = f"CAST({row}.timestamp / {size} AS INTEGER) * {size}"
+    sql = f"""
+    INSERT INTO buckets VALUES ({size}, {start}, {row}.status, {row}.currency, {sign}1, {sign}{row}.price)
+    ON CONFLICT (size, start, status, currency) DO UPDATE SET count = count {sign} 1, total = total {sign} {row}.price;"""
+    if sign == "-":
+        sql += f"""
+    DELETE FROM buckets WHERE size = {size} AND start = {start} AND status = {row}.status
+                              AND currency = {row}.currency AND count = 0;"""
+    return sql
+
+
+_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS sales_insert AFTER INSERT ON sales BEGIN
+    {_bucket_sql(HOUR, "NEW", "+")}
+    {_bucket_sql(DAY, "NEW", "+")}
+END;
+CREATE TRIGGER IF NOT EXISTS sales_update AFTER UPDATE ON sales
+WHEN OLD.status IS NOT NEW.status OR OLD.currency IS NOT NEW.currency OR OLD.price IS NOT NEW.price
+     OR OLD.timestamp IS NOT NEW.timestamp BEGIN
+    {_bucket_sql(HOUR, "OLD", "-")}
+    {_bucket_sql(DAY, "OLD", "-")}
+    {_bucket_sql(HOUR, "NEW", "+")}
+    {_bucket_sql(DAY, "NEW", "+")}
+END;
+CREATE TRIGGER IF NOT EXISTS sales_delete AFTER DELETE ON sales BEGIN
+    {_bucket_sql(HOUR, "OLD", "-")}
+    {_bucket_sql(DAY, "OLD", "-")}
+END;
+"""
+
+_UPSERT = f"""
+INSERT INTO sales ({", ".join(SALE_FIELDS)}) VALUES ({", ".join("?" * len(SALE_FIELDS))})
+ON CONFLICT (order_id) DO UPDATE SET
+    {", ".join(f"{i} = excluded.{i}" for i in SALE_FIELDS[1:])}
+"""
+
+
+class SalesLedger:
+    """
+    Журнал продаж. Все методы потокобезопасны.
+
+    :param path: путь до файла базы.
+    """
+    def __init__(self, path: str):
+        self.path: str = path
+        """Путь до файла базы."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.__conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.__conn.row_factory = sqlite3.Row
+        self.__lock = threading.RLock()
+        with self.__lock:
+            self.__conn.execute("PRAGMA journal_mode=WAL")
+            self.__conn.execute("PRAGMA synchronous=NORMAL")
+            self.__conn.executescript(_SCHEMA)
+            self.__conn.executescript(_TRIGGERS)
+            if self.__conn.execute("PRAGMA user_version").fetchone()[0] < BUCKETS_VERSION:
+                self.rebuild_buckets()
+
+    def upsert(self, sales: Iterable[dict], meta: dict[str, str | None] | None = None) -> int:
+        """
+        Добавляет продажи или обновляет уже известные (по ID заказа).
+
+        :param sales: записи о продажах (словари с ключами :data:`SALE_FIELDS`).
+        :param meta: служебные значения, которые нужно сохранить в той же транзакции (см. :meth:`set_meta`).
+
+        :return: кол-во добавленных / обновленных записей.
+        """
+        rows = [tuple(sale[i] for i in SALE_FIELDS) for sale in sales]
+        if not rows and not meta:
+            return 0
+        with self.__lock:
+            self.__conn.execute("BEGIN")
+            try:
+                self.__conn.executemany(_UPSERT, rows)
+                self.__conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", (meta or {}).items())
+                self.__conn.execute("COMMIT")
+            except Exception:
+                self.__conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def get(self, order_id: str) -> dict | None:
+        """
+        Возвращает запись о продаже.
+
+        :param order_id: ID заказа.
+        """
+        with self.__lock:
+            row = self.__conn.execute("SELECT * FROM sales WHERE order_id = ?", (order_id,)).fetchone()
+        return dict(row) if row else None
+
+    def statuses(self, order_ids: list[str]) -> dict[str, str]:
+        """
+        Возвращает статусы уже известных заказов.
+
+        :param order_ids: ID заказов.
+
+        :return: {ID заказа: статус} (неизвестных заказов в словаре нет).
+        """
+        if not order_ids:
+            return {}
+        with self.__lock:
+            return dict(self.__conn.execute(f"SELECT order_id, status FROM sales WHERE order_id IN "
+                                            f"({', '.join('?' * len(order_ids))})", order_ids).fetchall())
+
+    def get_meta(self, key: str, default: str | None = None) -> str | None:
+        """
+        Возвращает служебное значение (например, курсор догрузки истории продаж).
+
+        :param key: ключ.
+        :param default: значение по умолчанию.
+        """
+        with self.__lock:
+            row = self.__conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row and row[0] is not None else default
+
+    def set_meta(self, key: str, value: str | None):
+        """
+        Сохраняет служебное значение.
+
+        :param key: ключ.
+        :param value: значение.
+        """
+        with self.__lock:
+            self.__conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def sales(self, since: float | None = None, until: float | None = None) -> list[dict]:
+        """
+        Возвращает продажи за период (по индексу времени).
+
+        :param since: начало периода (timestamp, включительно; :obj:`None` - с самого начала).
+        :param until: конец периода (timestamp, не включительно; :obj:`None` - до текущего момента).
+        """
+        with self.__lock:
+            rows = self.__conn.execute("SELECT * FROM sales WHERE timestamp >= ? AND timestamp < ? "
+                                       "ORDER BY timestamp", (since if since is not None else float("-inf"),
+                                                              until if until is not None else float("inf"))).fetchall()
+        return [dict(i) for i in rows]
+
+    def summary(self, since: float | None = None) -> list[tuple[str, str, int, float]]:
+        """
+        Возвращает сводку продаж с момента since: [(статус, валюта, кол-во, сумма), ...].
+
+        Период собирается из агрегатов: неполный час в начале периода - по самим продажам (индекс времени),
+        далее часовые корзины до начала следующих суток, далее суточные корзины.
+
+        :param since: начало периода (timestamp; :obj:`None` - за все время).
+        """
+        if since is None:
+            since = hour_start = day_start = float("-inf")
+        else:
+            hour_start = -(-since // HOUR) * HOUR
+            day_start = max(-(-since // DAY) * DAY, hour_start)
+        with self.__lock:
+            rows = self.__conn.execute(
+                "SELECT status, currency, SUM(count), SUM(total) FROM ("
+                "SELECT status, currency, 1 AS count, price AS total FROM sales WHERE timestamp >= ? AND timestamp < ? "
+                "UNION ALL SELECT status, currency, count, total FROM buckets "
+                "WHERE size = ? AND start >= ? AND start < ? "
+                "UNION ALL SELECT status, currency, count, total FROM buckets WHERE size = ? AND start >= ?"
+                ") GROUP BY status, currency", (since, hour_start, HOUR, hour_start, day_start, DAY, day_start)
+            ).fetchall()
+        return [tuple(i) for i in rows]
+
+    def rebuild_buckets(self):
+        """
+        Пересчитывает агрегаты по продажам.
+        """
+        with self.__lock:
+            self.__conn.execute("BEGIN")
+            try:
+                self.__conn.execute("DELETE FROM buckets")
+                for size in (HOUR, DAY):
+                    self.__conn.execute(f"INSERT INTO buckets SELECT {size}, "
+                                        f"CAST(timestamp / {size} AS INTEGER) * {size}, status, currency, "
+                                        "COUNT(*), SUM(price) FROM sales GROUP BY 1, 2, 3, 4")
+                self.__conn.execute(f"PRAGMA user_version = {BUCKETS_VERSION}")
+                self.__conn.execute("COMMIT")
+            except Exception:
+                self.__conn.execute("ROLLBACK")
+                raise
+
+    def count(self) -> int:
+        """
+        Возвращает кол-во записей в журнале.
+        """
+        with self.__lock:
+            return self.__conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0]
+
+    def import_json(self, json_path: str) -> int:
+        """
+        Переносит продажи из старого JSON-файла статистики (список записей) в журнал. После успешного переноса
+        файл переименовывается в ``<файл>.bak``.
+
+        :param json_path: путь до JSON-файла.
+
+        :return: кол-во перенесенных записей.
+        """
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"Не удалось прочитать старый файл статистики {json_path}.")
+            logger.debug("TRACEBACK", exc_info=True)
+            return 0
+        amount = self.upsert(i for i in data if isinstance(i, dict) and all(k in i for k in SALE_FIELDS))
+        os.replace(json_path, json_path + ".bak")
+        logger.info(f"Перенесено продаж из {json_path} в журнал продаж: {amount}.")
+        return amount
+
+    def close(self):
+        """
+        Закрывает базу.
+        """
+        with self.__lock:
+            self.__conn.close()
+
+# END OF FILE FunPayCortex/Utils/sales_ledger.py
@@ -7,12 +7,12 @@ if TYPE_CHECKING:
 from tg_bot.utils import NotificationTypes
 from telebot.types import InlineKeyboardMarkup as K, InlineKeyboardButton as B
 from locales.localizer import Localizer
-# ИЗМЕНЕНИЕ: Thread больше не нужен, так как мы используем executor из Cortex
 from logging import getLogger
 import requests
 import json
 import os
 import time
+from threading import Thread
 
 logger = getLogger("FPC.announcements")
 localizer = Localizer()
@@ -97,13 +97,12 @@ def announcements_loop_iteration(cortex_instance: Cortex, ignore_last_tag: bool
     should_pin = get_pin(announcement_data)
 
     if text_content or photo_content:
-        # ИЗМЕНЕНИЕ: Используем пул потоков из Cortex
-        cortex_instance.executor.submit(
-            cortex_instance.telegram.send_notification,
+        # Рассылка идет в потоках диспетчера уведомлений, здесь не ждем ответа Telegram.
+        cortex_instance.telegram.send_notification(
             text_content,
             photo=photo_content,
             notification_type=notification_type_enum,
-            keyboard=keyboard_markup,
+            reply_markup=keyboard_markup,
             pin=should_pin
         )
 
@@ -127,8 +126,8 @@ def announcements_loop(cortex_instance: Cortex):
 
 
 def main(cortex_instance: Cortex):
-    # ИЗМЕНЕНИЕ: Используем пул потоков из Cortex
-    cortex_instance.executor.submit(announcements_loop, cortex_instance)
+    # Бесконечный цикл - в отдельном потоке, чтобы не занимать поток пула Cortex.
+    Thread(target=announcements_loop, args=(cortex_instance,), daemon=True).start()
 
 
 BIND_TO_POST_INIT = [main]
\ No newline at end of file
@@ -23,7 +23,6 @@ import datetime
 import logging
 import random
 from threading import Lock, Thread
-from concurrent.futures import ThreadPoolExecutor
 import time
 import sys
 import os
@@ -35,6 +34,12 @@ import json
 from locales.localizer import Localizer
 from FunPayAPI import utils as fp_utils
 from Utils import cortex_tools
+from Utils.order_cache import OrderCache
+from Utils.lane_executor import LaneExecutor
+from Utils.event_dispatcher import EventDispatcher, chat_key
+from Utils.handler_profiler import HandlerProfiler, handler_name
+from Utils.metrics import MetricsServer, start_metrics
+from Utils.logger import stop_logging
 import tg_bot.bot
 import types as py_types
 import pkgutil
@@ -81,7 +86,10 @@ class Cortex(object):
         self.AR_CFG: ConfigParser | None = None
         self.RAW_AR_CFG = raw_auto_response_config
         
-        self.executor = ThreadPoolExecutor(max_workers=20, thread_name_prefix='CortexWorker')
+        # Пул потоков с приоритетами (выдача > ответы > панель управления > лоты > прочее > уведомления > статистика),
+        # см. Utils.lane_executor. Бесконечные циклы в пул не отправляются - у них свои потоки.
+        # Лимиты всех полос, кроме выдачи, в сумме - 24, поэтому минимум 4 потока всегда остаются под выдачу.
+        self.executor = LaneExecutor(max_workers=28, thread_name_prefix='CortexWorker')
 
         # [MODIFIED] Отключаем URL и токен хостинга
         self.hosting_url = None
@@ -157,8 +165,9 @@ class Cortex(object):
         self.profile_cache_time = 0
         self.PROFILE_CACHE_SECONDS = 120
         
-        self.order_cache = {}
         self.ORDER_CACHE_TTL = 3600
+        self.ORDER_CACHE_SIZE = 512
+        self.order_cache = OrderCache(max_size=self.ORDER_CACHE_SIZE, ttl=self.ORDER_CACHE_TTL)
         
         self.tg_profile: FunPayAPI.types.UserProfile | None = None
         self.last_tg_profile_update = datetime.datetime.now()
@@ -207,12 +216,20 @@ class Cortex(object):
             "BIND_TO_PRE_DELIVERY": self.pre_delivery_handlers, "BIND_TO_POST_DELIVERY": self.post_delivery_handlers,
             "BIND_TO_PRE_LOTS_RAISE": self.pre_lots_raise_handlers, "BIND_TO_POST_LOTS_RAISE": self.post_lots_raise_handlers,
         }
+        self.__handlers_event_types = {id(v): k.removeprefix("BIND_TO_") for k, v in self.handler_bind_var_names.items()}
         
         self.features: Dict[str, BaseFeature] = {}
         
         self.allowed_features: list[str] = []
 
         self.processed_message_ids = collections.deque(maxlen=2000)
+
+        self.event_dispatcher: EventDispatcher | None = None
+        """Диспетчер событий по чатам (None - все события обрабатываются в потоке Runner'а)."""
+        self.handler_profiler = HandlerProfiler()
+        """Профилировщик обработчиков событий (см. /perf в Telegram)."""
+        self.metrics_server: MetricsServer | None = None
+        """HTTP-сервер метрик Prometheus ([Other] metricsAddress, None - выключен)."""
         
         self.watchdog_enabled = True
 
@@ -273,8 +290,9 @@ class Cortex(object):
                             "Чтобы включить его снова, зайдите в панель управления: https://funpaybot.ru/dashboard", 
                             notification_type=tg_utils.NotificationTypes.critical
                         )
-                        time.sleep(3) 
+                        self.telegram.flush_notifications(10)
                     except Exception: pass
+                stop_logging()
                 os._exit(0)
 
             if not self.is_proxy_configured():
@@ -522,15 +540,10 @@ class Cortex(object):
                               order_id_str: str | None = None) -> None | types.Order:
         if obj._order_attempt_error:
             return None
-        if obj._order_attempt_made and obj._order is not None:
-            return obj._order
-        if obj._order_attempt_made and obj._order is None:
-            wait_count = 0
-            while obj._order is None and not obj._order_attempt_error and wait_count < 50:
-                time.sleep(0.1)
-                wait_count +=1
+        if obj._order is not None:
             return obj._order
 
+        # Одновременные запросы одного заказа объединяются в self.order_cache, поэтому ждать здесь не нужно.
         obj._order_attempt_made = True
         if not isinstance(obj, (types.Message, types.ChatShortcut, types.OrderShortcut)):
             obj._order_attempt_error = True
@@ -554,28 +567,23 @@ class Cortex(object):
             obj._order_attempt_error = True
             return None
             
-        now = time.time()
-        if final_order_id in self.order_cache:
-            order, cache_time = self.order_cache[final_order_id]
-            if now < cache_time + self.ORDER_CACHE_TTL:
-                logger.info(f"Using cached order #{final_order_id}")
-                obj._order = order
-                return order
-
-        for attempt_num in range(3, 0, -1):
-            try:
-                fetched_order = self.account.get_order(final_order_id)
-                obj._order = fetched_order
-                if fetched_order:
-                    self.order_cache[final_order_id] = (fetched_order, now)
-                logger.info(f"Fetched order #{final_order_id}")
-                return fetched_order
-            except Exception as e:
-                logger.warning(f"Error fetching order #{final_order_id} (attempt {4-attempt_num}): {e}")
-                logger.debug("TRACEBACK", exc_info=True)
-                if attempt_num > 1: time.sleep(random.uniform(0.5, 1.5))
-        obj._order_attempt_error = True
-        return None
+        def fetch_order() -> types.Order | None:
+            for attempt_num in range(3, 0, -1):
+                try:
+                    fetched_order = self.account.get_order(final_order_id)
+                    logger.info(f"Fetched order #{final_order_id}")
+                    return fetched_order
+                except Exception as e:
+                    logger.warning(f"Error fetching order #{final_order_id} (attempt {4-attempt_num}): {e}")
+                    logger.debug("TRACEBACK", exc_info=True)
+                    if attempt_num > 1: time.sleep(random.uniform(0.5, 1.5))
+            return None
+
+        order = self.order_cache.get_or_fetch(final_order_id, fetch_order)
+        obj._order = order
+        if order is None:
+            obj._order_attempt_error = True
+        return order
 
     @staticmethod
     def split_text(text: str) -> list[str]:
@@ -769,6 +777,7 @@ class Cortex(object):
                 if self.telegram:
                     try:
                         self.telegram.send_notification("⚠️ <b>Watchdog:</b> Зависание ядра. Перезагрузка...", notification_type=tg_utils.NotificationTypes.critical)
+                        self.telegram.flush_notifications(10)
                     except: pass
                 
                 cortex_tools.restart_program()
@@ -793,17 +802,40 @@ class Cortex(object):
             FunPayAPI.events.EventTypes.ORDER_STATUS_CHANGED: "on_order_status_changed",
         }
 
-        for event in self.runner.listen(requests_delay=int(self.MAIN_CFG["Other"]["requestsDelay"])):
+        for event in self.runner.listen(requests_delay=int(self.MAIN_CFG["Other"]["requestsDelay"]),
+                                        pipelined=self.MAIN_CFG["Other"].getboolean("runnerPipeline")):
             if instance_id != self.run_id:
                 break
             if not self.funpay_connection_ok:
                 time.sleep(10)
                 continue
             
-            self.run_handlers(events_handlers.get(event.type, []), (self, event))
-            
-            if event.type in feature_hooks:
-                self._dispatch_feature_event(feature_hooks[event.type], event)
+            # События одного чата - строго по очереди, разных чатов - параллельно (см. Utils.event_dispatcher).
+            # События без чата (списки чатов / заказов) - по очереди в первом шарде.
+            if self.event_dispatcher:
+                self.event_dispatcher.submit(chat_key(event), self._handle_event, event, events_handlers,
+                                             feature_hooks)
+            else:
+                self._handle_event(event, events_handlers, feature_hooks)
+
+    def _handle_event(self, event, events_handlers: dict, feature_hooks: dict):
+        self.run_handlers(events_handlers.get(event.type, []), (self, event))
+        if event.type in feature_hooks:
+            self._dispatch_feature_event(feature_hooks[event.type], event)
+
+    def submit_ordered(self, lane: str, fn: Callable, *args):
+        """
+        Выполняет задачу обработчика события с сохранением порядка внутри чата: если обработчик вызван
+        в потоке диспетчера событий, задача выполняется сразу (после предыдущих задач этого чата и до следующих),
+        иначе - ставится в пул потоков (в указанную полосу).
+
+        :param lane: полоса пула потоков (см. :class:`Utils.lane_executor.Lanes`).
+        :param fn: функция.
+        """
+        if self.event_dispatcher and self.event_dispatcher.in_worker():
+            fn(*args)
+        else:
+            self.executor.submit_to(lane, fn, *args)
 
     def lots_raise_loop(self):
         if not self.profile or not self.profile.get_lots():
@@ -889,14 +921,19 @@ class Cortex(object):
                 feature.toggle()
 
     def _dispatch_feature_event(self, method_name: str, *args, **kwargs):
-        for feature in self.features.values():
+        for uuid, feature in self.features.items():
             if feature.is_active:
+                start, error = time.perf_counter(), False
                 try:
                     method = getattr(feature, method_name, None)
                     if method and callable(method):
                         method(*args, **kwargs)
                 except Exception as e:
+                    error = True
                     logger.error(f"Error in feature {feature.name} (method {method_name}): {e}", exc_info=True)
+                finally:
+                    self.handler_profiler.record(f"{feature.name}.{method_name}", method_name, uuid,
+                                                 time.perf_counter() - start, error)
 
     def init(self):
         self.is_subscription_active = True
@@ -999,14 +1036,19 @@ class Cortex(object):
         pass
 
     def run_handlers(self, handlers_list: list[Callable], args) -> None:
+        event_type = self.__handlers_event_types.get(id(handlers_list), "OTHER")
         for func in handlers_list:
+            start, error = time.perf_counter(), False
             try:
                 func(*args)
             except Exception as ex:
+                error = True
                 error_message_short = str(ex)
                 logger.error(_("crd_handler_err") + f" ({error_message_short})")
                 logger.debug("TRACEBACK", exc_info=True)
-                continue
+            finally:
+                self.handler_profiler.record(handler_name(func), event_type, getattr(func, "plugin_uuid", None),
+                                             time.perf_counter() - start, error)
 
     def add_telegram_commands(self, uuid: str, commands: list[tuple[str, str, bool]]):
         if self.telegram:
@@ -1089,6 +1131,19 @@ class Cortex(object):
                                        disable_message_requests=self.old_mode_enabled,
                                        disabled_order_requests=False,
                                        disabled_buyer_viewing_requests=True)
+        self.runner.adaptive_delay = self.MAIN_CFG["Other"].getboolean("adaptivePolling")
+        self.runner.runner_len = self.MAIN_CFG["Other"].getint("historyPackSize")
+        self.runner.history_workers = self.MAIN_CFG["Other"].getint("historyWorkers")
+        self.runner.order_tracker.load(os.path.join(self.base_path, "storage/cache/runner_orders.json"))
+        self.account.keep_html = self.MAIN_CFG["Other"].getboolean("keepHtml")
+        self.handler_profiler.slow_threshold = self.MAIN_CFG["Other"].getfloat("slowHandlerThreshold")
+        if event_workers := self.MAIN_CFG["Other"].getint("eventWorkers"):
+            self.event_dispatcher = EventDispatcher(event_workers)
+        if metrics_address := self.MAIN_CFG["Other"]["metricsAddress"].strip():
+            try:
+                self.metrics_server = start_metrics(self, metrics_address)
+            except (ValueError, OSError) as e:
+                logger.error(f"Не удалось запустить сервер метрик на {metrics_address}: {e}")
         
         self.__update_profile(infinite_polling=False, attempts=5, update_main_profile=True)
         
@@ -1097,14 +1152,14 @@ class Cortex(object):
         self.run_handlers(self.pre_start_handlers, (self,))
         
         if self.MAIN_CFG["Statistics"].getboolean("enabled"):
-            self.executor.submit(statistics_cp.periodic_sales_update, self)
+            Thread(target=statistics_cp.periodic_sales_update, args=(self,), daemon=True).start()
             
         self.run_handlers(self.post_start_handlers, (self,))
         
         Thread(target=self.lots_raise_loop, daemon=True).start()
         Thread(target=self.update_session_loop, daemon=True).start()
         
-        self.executor.submit(self.watchdog_loop)
+        Thread(target=self.watchdog_loop, daemon=True).start()
         
         while self.running:
             try:
@@ -20,7 +20,8 @@ default_config = {
         "keepSentMessagesUnread": "0", "locale": "ru"
     },
     "Telegram": {
-        "enabled": "0", "token": "", "secretKeyHash": "УстановитеСвойПароль", "blockLogin": "0"
+        "enabled": "0", "token": "", "secretKeyHash": "УстановитеСвойПароль", "blockLogin": "0",
+        "coalesceWindows": "new_message:1.5"
     },
     "CortexHosting": { "url": "", "token": "" },
     "Manager": { "registration_key": "" },
@@ -53,7 +54,11 @@ default_config = {
     },
     "Statistics": { "enabled": "1", "analysis_period": "30", "report_interval": "0" },
     # ИЗМЕНЕНИЕ ЗДЕСЬ: watermark теперь по умолчанию пустая строка
-    "Other": { "watermark": "", "requestsDelay": "4", "language": "ru" }
+    "Other": { "watermark": "", "requestsDelay": "4", "runnerPipeline": "0", "adaptivePolling": "0",
+               "historyPackSize": "10", "historyWorkers": "3", "keepHtml": "1", "eventWorkers": "0",
+               "slowHandlerThreshold": "5", "metricsAddress": "",
+               "logQueue": "1", "logJson": "0",
+               "language": "ru" }
 }
 
 def create_configs():
@@ -14,6 +14,7 @@ from FunPayAPI.updater.events import *
 
 from tg_bot import utils, keyboards
 from Utils import cortex_tools, exceptions as UtilsExceptions
+from Utils.lane_executor import Lanes
 from locales.localizer import Localizer
 from threading import Lock
 import configparser
@@ -160,7 +161,7 @@ def greetings_handler(c: Cortex, e: NewMessageEvent | LastChatMessageChangedEven
         text = cortex_tools.format_msg_text(c.MAIN_CFG["Greetings"]["greetingsText"], obj)
         c.send_message(chat_id, text, chat_name)
 
-    c.executor.submit(threaded_send)
+    c.submit_ordered(Lanes.replies, threaded_send)
 
 
 def send_response_handler(c: Cortex, e: NewMessageEvent | LastChatMessageChangedEvent):
@@ -184,7 +185,7 @@ def send_response_handler(c: Cortex, e: NewMessageEvent | LastChatMessageChanged
         response_text = cortex_tools.format_msg_text(c.AR_CFG[command]["response"], obj)
         c.send_message(chat_id, response_text, chat_name)
 
-    c.executor.submit(threaded_send)
+    c.submit_ordered(Lanes.replies, threaded_send)
 
 
 def old_send_new_msg_notification_handler(c: Cortex, e: LastChatMessageChangedEvent):
@@ -202,7 +203,7 @@ def old_send_new_msg_notification_handler(c: Cortex, e: LastChatMessageChangedEv
         user = f"👤 {user}"
     text = f"<i><b>{user}: </b></i><code>{utils.escape(str(e.chat))}</code>"
     kb = keyboards.reply(e.chat.id, e.chat.name, extend=True)
-    c.executor.submit(c.telegram.send_notification, text, kb, utils.NotificationTypes.new_message)
+    c.telegram.send_notification(text, kb, utils.NotificationTypes.new_message, coalesce_key=e.chat.id)
 
 
 def send_new_msg_notification_handler(c: Cortex, e: NewMessageEvent) -> None:
@@ -307,18 +308,17 @@ def send_new_msg_notification_handler(c: Cortex, e: NewMessageEvent) -> None:
         last_by_vertex = i.message.by_vertex
         last_badge = i.message.badge
     kb = keyboards.reply(chat_id, chat_name, extend=True)
-    c.executor.submit(c.telegram.send_notification, text, kb, utils.NotificationTypes.new_message)
+    c.telegram.send_notification(text, kb, utils.NotificationTypes.new_message, coalesce_key=chat_id)
 
 
 def send_review_notification(c: Cortex, order: Order, chat_id: int, reply_text: str | None):
     if not c.telegram:
         return
     reply_text = _("ntfc_review_reply_text").format(utils.escape(reply_text)) if reply_text else ""
-    c.executor.submit(c.telegram.send_notification,
-                      _("ntfc_new_review").format('⭐' * order.review.stars, order.id, utils.escape(order.review.text),
-                                                 reply_text),
-                      keyboards.new_order(order.id, order.buyer_username, chat_id),
-                      utils.NotificationTypes.review)
+    c.telegram.send_notification(_("ntfc_new_review").format('⭐' * order.review.stars, order.id,
+                                                            utils.escape(order.review.text), reply_text),
+                                 keyboards.new_order(order.id, order.buyer_username, chat_id),
+                                 utils.NotificationTypes.review)
 
 
 def process_review_handler(c: Cortex, e: NewMessageEvent | LastChatMessageChangedEvent):
@@ -419,7 +419,7 @@ def process_review_handler(c: Cortex, e: NewMessageEvent | LastChatMessageChange
         # Уведомляем о самом факте нового отзыва
         send_review_notification(c, order, chat_id, reply_text)
 
-    c.executor.submit(threaded_task)
+    c.executor.submit_to(Lanes.replies, threaded_task)
 
 
 def send_command_notification_handler(c: Cortex, e: NewMessageEvent | LastChatMessageChangedEvent):
@@ -445,8 +445,7 @@ def send_command_notification_handler(c: Cortex, e: NewMessageEvent | LastChatMe
     else:
         text = cortex_tools.format_msg_text(c.AR_CFG[command]["notificationText"], obj)
 
-    c.executor.submit(c.telegram.send_notification, text, keyboards.reply(chat_id, chat_name),
-                      utils.NotificationTypes.command)
+    c.telegram.send_notification(text, keyboards.reply(chat_id, chat_name), utils.NotificationTypes.command)
 
 
 def test_auto_delivery_handler(c: Cortex, e: NewMessageEvent | LastChatMessageChangedEvent):
@@ -485,7 +484,7 @@ def test_auto_delivery_handler(c: Cortex, e: NewMessageEvent | LastChatMessageCh
         fake_event = NewOrderEvent(e.runner_tag, fake_order)
         c.run_handlers(c.new_order_handlers, (c, fake_event,))
 
-    c.executor.submit(threaded_task)
+    c.executor.submit_to(Lanes.delivery, threaded_task)
 
 
 def send_categories_raised_notification_handler(c: Cortex, cat: FunPayAPI.types.Category, error_text: str = "") -> None:
@@ -493,11 +492,7 @@ def send_categories_raised_notification_handler(c: Cortex, cat: FunPayAPI.types.
         return
 
     text = f"""⤴️<b><i>Поднял все лоты категории</i></b> <code>{cat.name}</code>\n<tg-spoiler>{error_text}</tg-spoiler>"""
-    try:
-        c.executor.submit(c.telegram.send_notification, text,
-                          notification_type=utils.NotificationTypes.lots_raise)
-    except RuntimeError:
-        pass
+    c.telegram.send_notification(text, notification_type=utils.NotificationTypes.lots_raise)
 
 def get_lot_config_by_name(c: Cortex, name: str) -> configparser.SectionProxy | None:
     for i in c.AD_CFG.sections():
@@ -540,7 +535,7 @@ def update_current_lots_handler(c: Cortex, e: OrdersListChangedEvent):
             logger.error("Не удалось получить информацию о лотах в фоне: превышено кол-во попыток.")
 
     # Отправляем задачу в пул потоков Cortex, чтобы не блокировать Runner
-    c.executor.submit(worker)
+    c.executor.submit_to(Lanes.lots, worker)
 
 
 def update_profile_lots_handler(c: Cortex, e: OrdersListChangedEvent):
@@ -649,7 +644,7 @@ def send_new_order_notification_handler(c: Cortex, e: NewOrderEvent, *args):
             logger.warning(f"Не удалось найти чат для пользователя {e.order.buyer_username} при отправке уведомления о заказе.")
             c.telegram.send_notification(text, notification_type=utils.NotificationTypes.new_order)
 
-    c.executor.submit(threaded_task)
+    c.executor.submit_to(Lanes.notifications, threaded_task)
 
 def deliver_goods(c: Cortex, e: NewOrderEvent, *args):
     chat = c.account.get_chat_by_name(e.order.buyer_username, True)
@@ -664,13 +659,15 @@ def deliver_goods(c: Cortex, e: NewOrderEvent, *args):
     delivery_text = cortex_tools.format_order_text(cfg_obj["response"], e.order)
 
     amount, goods_left, products = 1, -1, []
+    reservation = None
     file_name = cfg_obj.get("productsFileName")
 
     try:
         if file_name:
             if c.multidelivery_enabled and not cfg_obj.getboolean("disableMultiDelivery"):
                 amount = e.order.amount if e.order.amount else 1
-            products, goods_left = cortex_tools.get_products(f"storage/products/{file_name}", amount)
+            reservation = cortex_tools.reserve_products(f"storage/products/{file_name}", amount)
+            products, goods_left = reservation.products, reservation.left
             delivery_text = delivery_text.replace("$product", "\n".join(products).replace("\\n", "\n"))
     except UtilsExceptions.ProductsFileNotFoundError as exc:
         error_text = f"Ошибка автовыдачи для заказа #{e.order.id}: файл товаров '{file_name}' не найден."
@@ -688,14 +685,20 @@ def deliver_goods(c: Cortex, e: NewOrderEvent, *args):
         setattr(e, "error_text", f"Произошла ошибка при получении товаров для заказа {e.order.id}: {str(exc)}")
         return
 
-    result = c.send_message(chat_id, delivery_text, e.order.buyer_username)
+    try:
+        result = c.send_message(chat_id, delivery_text, e.order.buyer_username)
+    except Exception:
+        logger.debug("TRACEBACK", exc_info=True)
+        result = None
     if not result:
         logger.error(f"Не удалось отправить товар для ордера $YELLOW{e.order.id}$RESET.")
         setattr(e, "error", 1)
         setattr(e, "error_text", f"Не удалось отправить сообщение с товаром для заказа {e.order.id}.")
-        if file_name and products:
-            cortex_tools.add_products(f"storage/products/{file_name}", products, at_zero_position=True)
+        if reservation:
+            reservation.rollback()
     else:
+        if reservation:
+            reservation.commit()
         logger.info(f"Товар для заказа {e.order.id} выдан.")
         setattr(e, "delivered", True)
         setattr(e, "delivery_text", delivery_text)
@@ -721,7 +724,7 @@ def deliver_product_handler(c: Cortex, e: NewOrderEvent, *args) -> None:
         deliver_goods(c, e, *args)
         c.run_handlers(c.post_delivery_handlers, (c, e))
     
-    c.executor.submit(threaded_delivery)
+    c.executor.submit_to(Lanes.delivery, threaded_delivery)
 
 def send_delivery_notification_handler(c: Cortex, e: NewOrderEvent):
     if c.telegram is None:
@@ -736,8 +739,7 @@ def send_delivery_notification_handler(c: Cortex, e: NewOrderEvent):
 <code>{utils.escape(getattr(e, "delivery_text"))}</code>\n
 📋 <b><i>Осталось товаров: </i></b>{amount}"""
     
-    c.executor.submit(c.telegram.send_notification, text,
-                      notification_type=utils.NotificationTypes.delivery)
+    c.telegram.send_notification(text, notification_type=utils.NotificationTypes.delivery)
 
 
 def update_lot_state(cortex_instance: Cortex, lot: FunPayAPI.types.LotShortcut, task: int) -> bool:
@@ -826,17 +828,15 @@ def update_lots_states(cortex_instance: Cortex, event: NewOrderEvent):
 
     if deactivated:
         text = f"🔴 <b>Деактивировал лоты:</b>\n\n<code>{os.linesep.join(deactivated)}</code>"
-        cortex_instance.executor.submit(cortex_instance.telegram.send_notification, text,
-                                        notification_type=utils.NotificationTypes.lots_deactivate)
+        cortex_instance.telegram.send_notification(text, notification_type=utils.NotificationTypes.lots_deactivate)
     if restored:
         text = f"🟢 <b>Активировал лоты:</b>\n\n<code>{os.linesep.join(restored)}</code>"
-        cortex_instance.executor.submit(cortex_instance.telegram.send_notification, text,
-                                        notification_type=utils.NotificationTypes.lots_restore)
+        cortex_instance.telegram.send_notification(text, notification_type=utils.NotificationTypes.lots_restore)
     cortex_instance.last_state_change_tag = event.runner_tag
 
 
 def update_lots_state_handler(cortex_instance: Cortex, event: NewOrderEvent, *args):
-    cortex_instance.executor.submit(update_lots_states, cortex_instance, event)
+    cortex_instance.executor.submit_to(Lanes.lots, update_lots_states, cortex_instance, event)
 
 def send_thank_u_message_handler(c: Cortex, e: OrderStatusChangedEvent):
     if not c.MAIN_CFG["OrderConfirm"].getboolean("sendReply") or e.order.status is not FunPayAPI.types.OrderStatuses.CLOSED:
@@ -854,7 +854,7 @@ def send_thank_u_message_handler(c: Cortex, e: OrderStatusChangedEvent):
         c.send_message(chat.id, text, e.order.buyer_username,
                        watermark=c.MAIN_CFG["OrderConfirm"].getboolean("watermark"))
 
-    c.executor.submit(threaded_task)
+    c.submit_ordered(Lanes.replies, threaded_task)
 
 
 def send_order_confirmed_notification_handler(cortex_instance: Cortex, event: OrderStatusChangedEvent):
@@ -870,7 +870,7 @@ def send_order_confirmed_notification_handler(cortex_instance: Cortex, event: Or
         else:
             logger.warning(f"Не удалось найти чат для {event.order.buyer_username} при отправке уведомления о подтверждении заказа.")
 
-    cortex_instance.executor.submit(threaded_task)
+    cortex_instance.executor.submit_to(Lanes.notifications, threaded_task)
 
 
 def send_bot_started_notification_handler(c: Cortex, *args):
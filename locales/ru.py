@@ -354,6 +354,13 @@ sys_info = """
     • <i>Время работы:</i>  <code>{6}</code>
     • <i>ID этого чата:</i>  <code>{7}</code>
 """
+perf_no_data = "📊 Обработчики событий еще не вызывались."
+perf_report = "📊 <b>Самые медленные обработчики (по p95):</b>\n\n{0}"
+perf_handler = "• <code>{0}</code> ({1}{2})\n" \
+               "    p50 <code>{3:.0f}</code> / p95 <code>{4:.0f}</code> / p99 <code>{5:.0f}</code> мс, " \
+               "макс. <code>{6:.0f}</code> мс\n" \
+               "    вызовов: <code>{7}</code>, ошибок: <code>{8}</code> (<code>{9:.0%}</code>)"
+perf_plugin = ", плагин <code>{0}</code>"
 act_blacklist = "Введите никнейм пользователя, которого нужно добавить в черный список."
 already_blacklisted = "❌ Пользователь <code>{0}</code> уже находится в черном списке."
 user_blacklisted = "✅ Пользователь <code>{0}</code> добавлен в черный список."
@@ -543,6 +550,8 @@ cmd_logs = "скачать текущий лог-файл"
 cmd_del_logs = "удалить старые лог-файлы"
 cmd_about = "информация о боте"
 cmd_sys = "системная информация и нагрузка"
+cmd_perf = "самые медленные обработчики событий"
+cmd_rebuild_stats = "пересчитать агрегаты статистики"
 cmd_create_backup = "создать резервную копию"
 cmd_get_backup = "скачать резервную копию"
 cmd_restart = "перезапустить бота"
@@ -738,6 +747,9 @@ logout_success = "✅ Вы успешно вышли."
 
 # --- Тексты для меню ---
 mm_statistics = "📊 Статистика"
+stat_rebuild_started = "⏳ Пересчитываю агрегаты статистики..."
+stat_rebuild_done = "✅ Агрегаты статистики пересчитаны: <b>{0}</b> продаж за <b>{1:.2f}</b> сек."
+stat_rebuild_error = "❌ Не удалось пересчитать агрегаты статистики.\n\n<i>{0}</i>"
 
 proxy_selected_and_applied = "✅ Прокси выбран и применен к текущей сессии. Для применения при запуске бота перезапуск не требуется."
 
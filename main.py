@@ -4,13 +4,14 @@ import Utils.cortex_tools
 import Utils.config_loader as cfg_loader
 from first_setup import first_setup
 from colorama import Fore, Style
-from Utils.logger import LOGGER_CONFIG
+from Utils.logger import LOGGER_CONFIG, enable_queue_logging
 import logging.config
 import colorama
 import sys
 import os
 import io
 import signal
+import threading
 import fcntl
 from cortex import Cortex
 import Utils.exceptions as excs
@@ -123,15 +124,6 @@ colorama.init()
 LOGGER_CONFIG['handlers']['file_handler']['filename'] = os.path.join(BASE_PATH, 'logs/log.log')
 logging.config.dictConfig(LOGGER_CONFIG)
 
-root_logger = logging.getLogger()
-for handler in root_logger.handlers:
-    if isinstance(handler, logging.StreamHandler):
-        class FlushFilter(logging.Filter):
-            def filter(self, record):
-                handler.flush()
-                return True
-        handler.addFilter(FlushFilter())
-
 logger = logging.getLogger("main")
 logger.debug("------------------------------------------------------------------")
 
@@ -176,6 +168,11 @@ signal.signal(signal.SIGINT, sigterm_handler)
 
 try:
     pre_main_cfg = cfg_loader.load_main_config(main_cfg_path)
+
+    if pre_main_cfg["Other"].getboolean("logQueue"):
+        enable_queue_logging(list(LOGGER_CONFIG["loggers"]),
+                             os.path.join(BASE_PATH, "logs/log.jsonl") if pre_main_cfg["Other"].getboolean("logJson")
+                             else None)
     
     # Блок проверки переменных окружения для хостинга удален
     
@@ -199,7 +196,7 @@ try:
 
     cortex_instance.init()
     
-    cortex_instance.executor.submit(cortex_instance.run)
+    threading.Thread(target=cortex_instance.run, daemon=True, name="CortexMain").start()
 
     if cortex_instance.telegram:
         logger.info("Запуск Telegram Bot Polling (Main Thread)...")
@@ -0,0 +1,116 @@
+# START OF FILE FunPayCortex/tests/bench_memory.py
+
+"""
+Бенчмарк памяти объектов FunPayAPI: прирост RSS процесса на 10 000 объектов, полученных парсерами
+из ответов в tests/fixtures, с HTML (keep_html=True) и без него (keep_html=False).
+
+Каждый замер выполняется в отдельном процессе, чтобы освобожденная предыдущим замером память не искажала результат.
+
+Запуск из корня проекта: python tests/bench_memory.py [кол-во объектов]
+"""
+
+import gc
+import json
+import os
+import subprocess
+import sys
+
+import psutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from FunPayAPI import Account
+from FunPayAPI.updater.runner import Runner
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, data: dict | str):
+        self.data = data
+        self.content = data.encode("utf-8") if isinstance(data, str) else None
+        self.status_code = 200
+
+    def json(self):
+        return self.data
+
+
+def make_account(keep_html: bool) -> Account:
+    account = Account("golden_key")
+    account._Account__initiated = True
+    account.id, account.username = 1000, "Seller77"
+    account.keep_html = keep_html
+    account.get_subcategory = lambda type_, id_: None
+    return account
+
+
+def make_chats(account: Account):
+    runner = Runner(account, disable_message_requests=True, disabled_order_requests=True)
+    html = load_fixture("chat_bookmarks.html")
+    while True:
+        runner.runner_last_messages.clear()
+        yield from (e.chat for e in runner.parse_chat_updates({"type": "chat_bookmarks", "tag": "tag",
+                                                                "data": {"html": html}}))
+
+
+def make_messages(account: Account):
+    text = load_fixture("runner_chat_node.json")
+    chats = {165898393: "Buyer123", 165001122: None, "flood": None}
+    while True:
+        # Каждый раз новый ответ, как от настоящего runner'а: HTML сообщений - отдельные строки.
+        account.method = lambda *args, **kwargs: FakeResponse(json.loads(text))
+        for messages in account.get_chats_histories(chats).values():
+            yield from messages
+
+
+def make_orders(account: Account):
+    text = load_fixture("orders_trade_ru.html")
+    while True:
+        account.method = lambda *args, **kwargs: FakeResponse(text)
+        yield from account.get_sales()[1]
+
+
+OBJECTS = {"ChatShortcut": make_chats, "Message": make_messages, "OrderShortcut": make_orders}
+"""Генераторы объектов: название класса -> функция, бесконечно отдающая объекты этого класса."""
+
+
+def measure(name: str, keep_html: bool, number: int) -> float:
+    """
+    Создает number объектов и возвращает прирост RSS в МиБ (вызывается в дочернем процессе).
+    """
+    objects = OBJECTS[name](make_account(keep_html))
+    next(objects)
+    gc.collect()
+    process = psutil.Process()
+    before = process.memory_info().rss
+    result = [next(objects) for _ in range(number)]
+    gc.collect()
+    after = process.memory_info().rss
+    assert len(result) == number
+    return (after - before) / 1024 / 1024
+
+
+def main(number: int = 10000):
+    print(f"{'':<15} {'keep_html=1, МиБ':>18} {'keep_html=0, МиБ':>18}")
+    for name in OBJECTS:
+        results = []
+        for keep_html in (True, False):
+            output = subprocess.check_output([sys.executable, __file__, "--measure", name, str(int(keep_html)),
+                                              str(number)], text=True)
+            results.append(float(output))
+        print(f"{name:<15} {results[0]:>18.2f} {results[1]:>18.2f}")
+    print(f"(на {number} объектов)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        print(measure(sys.argv[2], bool(int(sys.argv[3])), int(sys.argv[4])))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
+
+# END OF FILE FunPayCortex/tests/bench_memory.py
@@ -0,0 +1,113 @@
+# START OF FILE FunPayCortex/tests/bench_parsers.py
+
+"""
+Бенчмарк парсеров FunPayAPI на страницах из tests/fixtures: текущий парсер против эталонного
+(парсера через BeautifulSoup или прежней реализации).
+
+Запуск из корня проекта: python tests/bench_parsers.py [кол-во повторов]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from FunPayAPI import Account
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.status_code = 200
+
+
+def make_account() -> Account:
+    account = Account("golden_key")
+    account._Account__initiated = True
+    account.id, account.username = 1000, "Seller77"
+    account.get_subcategory = lambda type_, id_: None
+    return account
+
+
+def order_page_benchmarks(account: Account):
+    for name in ("order_closed_sale.html", "order_paid_purchase_en.html", "order_refunded_hidden_review.html"):
+        html = load_fixture(name)
+        response = FakeResponse(html)
+        yield (f"get_order: {name}",
+               lambda: account._Account__parse_order_page("AB12CD34", html, response),
+               lambda: account._Account__parse_order_page_bs("AB12CD34", html, response))
+
+
+def sales_page_benchmarks(account: Account):
+    for name, start_from, locale in (("orders_trade_ru.html", None, None),
+                                     ("orders_trade_en_last.html", None, None),
+                                     ("orders_trade_uk_continue.html", "QW34ER56", "uk")):
+        html = load_fixture(name)
+        args = (html, FakeResponse(html), "https://funpay.com/orders/trade", start_from, True, True, True, [],
+                locale, None)
+        yield (f"get_sales: {name}",
+               lambda: account._Account__parse_sales_page(*args),
+               lambda: account._Account__parse_sales_page_bs(*args))
+
+
+def legacy_parse_messages(account: Account, json_messages: list, chat_id: int, interlocutor_id: int,
+                          interlocutor_username: str):
+    """
+    Прежний разбор сообщений: после первого прохода HTML каждого сообщения разбирался повторно, чтобы достать
+    метку "label-default" и ссылки на пользователей.
+    """
+    messages = account._Account__parse_messages(json_messages, chat_id, interlocutor_id, interlocutor_username)
+    for i, message in zip(json_messages, messages):
+        parser = BeautifulSoup(i["html"], "lxml")
+        author_div = parser.find("div", {"class": "media-user-name"})
+        if author_div:
+            author_div.find("span", {"class": "chat-msg-author-label label label-default"})
+        if message.author_id == 0:
+            parser.find_all("a", href=lambda href: href and "/users/" in href)
+    return messages
+
+
+def message_benchmarks(account: Account):
+    objects = json.loads(load_fixture("runner_chat_node.json"))["objects"]
+    for obj in objects:
+        if not obj["data"]:
+            continue
+        json_messages = obj["data"]["messages"] * 10
+        interlocutors = obj["data"]["node"]["name"].split("-")[1:]
+        interlocutors.remove(str(account.id))
+        args = (json_messages, obj["id"], int(interlocutors[0]), None)
+        yield (f"__parse_messages: {obj['id']} ({len(json_messages)} сообщ.)",
+               lambda args=args: account._Account__parse_messages(*args),
+               lambda args=args: legacy_parse_messages(account, *args))
+
+
+BENCHMARKS = [order_page_benchmarks, sales_page_benchmarks, message_benchmarks]
+"""Генераторы бенчмарков: (название, текущий парсер, эталонный парсер)."""
+
+
+def main(number: int = 200):
+    account = make_account()
+    print(f"{'':<60} {'новый, мс':>10} {'эталон, мс':>10} {'x':>6}")
+    for benchmarks in BENCHMARKS:
+        for title, fast, bs in benchmarks(account):
+            fast_time = min(timeit.repeat(fast, number=number, repeat=3)) / number * 1000
+            bs_time = min(timeit.repeat(bs, number=number, repeat=3)) / number * 1000
+            print(f"{title:<60} {fast_time:>10.3f} {bs_time:>10.3f} {bs_time / fast_time:>6.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
+
+# END OF FILE FunPayCortex/tests/bench_parsers.py
@@ -0,0 +1,195 @@
+# START OF FILE FunPayCortex/tests/test_async_account.py
+
+"""
+Асинхронный клиент (:class:`FunPayAPI.async_account.AsyncAccount`) выполняет те же операции, что и
+:class:`FunPayAPI.account.Account`, отправляя запросы через асинхронную сессию tls_client.
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from FunPayAPI import Account, AsyncAccount, Runner
+from FunPayAPI.common import exceptions
+from FunPayAPI.updater.events import InitialChatEvent
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+SENT_MESSAGE_HTML = """<div class="chat-msg-item chat-msg-with-head" id="message-2930521400">
+<div class="chat-message"><div class="media-body"><div class="chat-msg-body">
+<div class="chat-msg-text">⁡Спасибо за покупку!<br>Ваш товар: key-000</div></div></div></div></div>"""
+
+SEND_MESSAGE_RESPONSE = {
+    "objects": [{"type": "chat_node", "id": "users-1000-2000", "tag": "0f2a9c1e",
+                 "data": {"node": {"id": 165898393, "name": "users-1000-2000", "silent": False},
+                          "messages": [{"id": 2930521400, "author": 1000, "html": SENT_MESSAGE_HTML}]}}],
+    "response": {"error": None}
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeAsyncSession:
+    """
+    Асинхронная сессия, отдающая заранее заданные ответы и считающая одновременные запросы.
+    """
+    def __init__(self, responses: list[FakeResponse], delay: float = 0):
+        self.responses = responses
+        self.delay = delay
+        self.requests = []
+        self.proxies = {}
+        self.cookies = {}
+        self.in_flight = self.max_in_flight = 0
+
+    async def execute_request(self, **kwargs):
+        self.requests.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+    async def close(self):
+        pass
+
+
+def make_account() -> Account:
+    account = Account("golden_key")
+    account._Account__initiated = True
+    account.id, account.username, account.csrf_token = 1000, "Seller77", "csrf"
+    return account
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def message_fields(message):
+    return (message.id, message.text, message.chat_id, message.chat_name, message.author, message.author_id,
+            message.html, message.by_bot)
+
+
+def test_send_message_same_as_sync(monkeypatch):
+    response_text = json.dumps(SEND_MESSAGE_RESPONSE)
+    account = make_account()
+    sync_requests = []
+
+    def fake_method(*args, **kwargs):
+        sync_requests.append((args, kwargs))
+        return FakeResponse(200, response_text)
+
+    monkeypatch.setattr(account, "method", fake_method)
+    sync_message = account.send_message("users-1000-2000", "Спасибо за покупку!", "Buyer123")
+
+    async def send():
+        async_account = AsyncAccount(account)
+        async_account.session = session = FakeAsyncSession([FakeResponse(200, response_text)])
+        try:
+            return await async_account.send_message("users-1000-2000", "Спасибо за покупку!", "Buyer123"), session
+        finally:
+            await async_account.close()
+
+    async_message, session = run(send())
+    assert message_fields(async_message) == message_fields(sync_message)
+    assert async_message.text == "Спасибо за покупку!\nВаш товар: key-000"
+    assert session.requests[0]["url"] == "https://funpay.com/runner/"
+    assert session.requests[0]["data"] == sync_requests[0][0][3]
+    assert "golden_key=goldenkey" in session.requests[0]["headers"]["Cookie"]
+
+
+def test_send_message_error(monkeypatch):
+    response = {"objects": [], "response": {"error": "Нельзя отправлять сообщения слишком часто."}}
+
+    async def send():
+        async_account = AsyncAccount(make_account())
+        async_account.session = FakeAsyncSession([FakeResponse(200, json.dumps(response))])
+        try:
+            await async_account.send_message(1, "text")
+        finally:
+            await async_account.close()
+
+    with pytest.raises(exceptions.MessageNotDeliveredError):
+        run(send())
+
+
+def test_retries_and_errors(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    account = make_account()
+
+    async def request(responses, raise_not_200=True):
+        async_account = AsyncAccount(account)
+        async_account.session = FakeAsyncSession(responses)
+        try:
+            return await async_account.method("get", "orders/trade", {}, {}, raise_not_200=raise_not_200)
+        finally:
+            await async_account.close()
+
+    response = run(request([FakeResponse(429, ""), FakeResponse(502, ""), FakeResponse(200, "ok")]))
+    assert response.status_code == 200 and response.content == b"ok"
+    assert sleeps == [2, 1] and account.last_429_err_time
+
+    with pytest.raises(exceptions.UnauthorizedError):
+        run(request([FakeResponse(403, "")]))
+    with pytest.raises(exceptions.RequestFailedError):
+        run(request([FakeResponse(404, "")]))
+    assert run(request([FakeResponse(404, "")], raise_not_200=False)).status_code == 404
+
+
+def test_concurrency_is_bounded():
+    async def requests():
+        async_account = AsyncAccount(make_account(), max_concurrency=3)
+        async_account.session = session = FakeAsyncSession([FakeResponse(200, "{}")], delay=0.01)
+        try:
+            await asyncio.gather(*(async_account.method("get", "https://funpay.com/", {}, {}) for _ in range(10)))
+        finally:
+            await async_account.close()
+        return session
+
+    session = run(requests())
+    assert len(session.requests) == 10 and session.max_in_flight == 3
+
+
+def test_listen_uses_runner_parsers():
+    with open(os.path.join(FIXTURES, "chat_bookmarks.html"), "r", encoding="utf-8") as f:
+        html = f.read()
+    response = {"objects": [{"type": "chat_bookmarks", "id": 1000, "tag": "1a2b3c4d",
+                             "data": {"order": [], "html": html}}], "response": False}
+    account = make_account()
+    runner = Runner(account, disable_message_requests=True, disabled_order_requests=True)
+    expected = [chat[0] for chat in runner.parse_chat_bookmarks(html)]
+
+    async def listen():
+        async_account = AsyncAccount(account)
+        async_account.session = session = FakeAsyncSession([FakeResponse(200, json.dumps(response))])
+        events = []
+        try:
+            async for event in async_account.listen(requests_delay=0.01, ignore_exceptions=False):
+                events.append(event)
+                if len(events) == len(expected):
+                    break
+        finally:
+            await async_account.close()
+        return events, session
+
+    events, session = run(listen())
+    assert all(isinstance(e, InitialChatEvent) for e in events)
+    assert [e.chat.id for e in events] == expected
+    assert json.loads(session.requests[0]["data"]["objects"])[1]["type"] == "chat_bookmarks"
+
+# END OF FILE FunPayCortex/tests/test_async_account.py
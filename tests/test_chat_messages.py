@@ -0,0 +1,122 @@
+# START OF FILE FunPayCortex/tests/test_chat_messages.py
+
+"""
+Разбор сообщений из ответа runner'а (:meth:`FunPayAPI.account.Account.get_chats_histories`): автор, бейдж,
+картинки, инициатор системных сообщений и роль аккаунта в заказе.
+"""
+
+import json
+import os
+
+import pytest
+
+from FunPayAPI import Account
+from FunPayAPI.common.enums import MessageTypes
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+CHAT_ID = 165898393
+REFUND_CHAT_ID = 165001122
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+        self.status_code = 200
+
+    def json(self):
+        return self.data
+
+
+def make_account() -> Account:
+    account = Account("golden_key")
+    account._Account__initiated = True
+    account.id, account.username = 1000, "Seller77"
+    return account
+
+
+def load_runner_response() -> dict:
+    with open(os.path.join(FIXTURES, "runner_chat_node.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_histories(monkeypatch, keep_html: bool = True) -> dict:
+    account = make_account()
+    account.keep_html = keep_html
+    monkeypatch.setattr(account, "method", lambda *args, **kwargs: FakeResponse(load_runner_response()))
+    return account.get_chats_histories({CHAT_ID: "Buyer123", REFUND_CHAT_ID: None, "flood": None})
+
+
+@pytest.fixture
+def messages(monkeypatch):
+    return {i.id: i for i in get_histories(monkeypatch)[CHAT_ID]}
+
+
+def test_text_messages(messages):
+    message = messages[2930521290]
+    assert (message.type, message.text, message.author, message.author_id) == \
+           (MessageTypes.NON_SYSTEM, "Здравствуйте!\nЕсть в наличии?", "Buyer123", 2000)
+    assert (message.chat_id, message.chat_name, message.interlocutor_id) == (CHAT_ID, "Buyer123", 2000)
+    assert message.badge is None and not message.is_employee and not message.by_bot
+    # Автор без шапки сообщения берется из ранее встреченных сообщений.
+    assert (messages[2930521350].author, messages[2930521350].text) == ("Buyer123", "Спасибо!")
+
+
+def test_autoreply_label(messages):
+    message = messages[2930521300]
+    assert (message.author, message.badge) == ("Seller77", "автоответ")
+    assert message.is_autoreply and not message.is_employee
+    assert message.by_bot and message.text == "Да, есть. Оплачивайте, выдача автоматическая."
+
+
+def test_support_badge(messages):
+    message = messages[2930521320]
+    assert (message.author, message.author_id, message.badge) == ("Support", 5000, "поддержка")
+    assert message.is_employee and message.is_support
+    assert not message.is_moderation and not message.is_arbitration and not message.is_autoreply
+
+
+def test_images(messages):
+    image = messages[2930521305]
+    assert image.text is None and image.author == "Buyer123" and not image.by_bot
+    assert (image.image_link, image.image_name) == ("https://sfunpay.com/s/chat/ab/cd/abcd1234.jpg", "screenshot.png")
+
+    bot_image = messages[2930521315]
+    assert bot_image.by_bot and bot_image.author == "Seller77"
+    assert bot_image.image_name == "funpay_cortex_image.png"
+
+
+@pytest.mark.parametrize("message_id, type_, initiator, i_am_seller", [
+    (2930521310, MessageTypes.ORDER_PURCHASED, ("Buyer123", 2000), True),
+    (2930521330, MessageTypes.ORDER_CONFIRMED_BY_ADMIN, ("Support", 5000), True),
+    (2930521340, MessageTypes.NEW_FEEDBACK, ("Buyer123", 2000), True),
+])
+def test_system_messages(messages, message_id, type_, initiator, i_am_seller):
+    message = messages[message_id]
+    assert (message.type, message.author, message.author_id, message.badge) == (type_, "FunPay", 0, None)
+    assert (message.initiator_username, message.initiator_id) == initiator
+    assert (message.i_am_seller, message.i_am_buyer) == (i_am_seller, not i_am_seller)
+
+
+def test_refund_initiated_by_me(monkeypatch):
+    message, = get_histories(monkeypatch)[REFUND_CHAT_ID]
+    assert message.type is MessageTypes.REFUND
+    assert (message.initiator_username, message.initiator_id) == ("Seller77", 1000)
+    assert message.i_am_seller and not message.i_am_buyer
+
+
+def test_empty_chat_node(monkeypatch):
+    assert get_histories(monkeypatch)["flood"] == []
+
+
+def test_keep_html_off(monkeypatch):
+    with_html = get_histories(monkeypatch)
+    without_html = get_histories(monkeypatch, keep_html=False)
+    fields = ("id", "type", "text", "author", "badge", "image_link", "by_bot", "is_autoreply", "is_support",
+              "initiator_id", "i_am_seller", "i_am_buyer")
+    for chat_id, messages in with_html.items():
+        assert all(i.html for i in messages)
+        assert all(i.html is None for i in without_html[chat_id])
+        assert [[getattr(i, f) for f in fields] for i in messages] == \
+               [[getattr(i, f) for f in fields] for i in without_html[chat_id]]
+
+# END OF FILE FunPayCortex/tests/test_chat_messages.py
@@ -0,0 +1,39 @@
+# START OF FILE FunPayCortex/tests/test_config_loader.py
+
+"""
+Проверка числовых параметров конфига (:func:`Utils.config_loader.check_float_param`).
+"""
+
+import configparser
+
+import pytest
+
+from Utils.config_loader import check_float_param
+from Utils.exceptions import ValueNotValidError, ParamNotFoundError, EmptyValueError
+
+
+def make_section(value: str | None) -> configparser.SectionProxy:
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    config["Other"] = {} if value is None else {"slowHandlerThreshold": value}
+    return config["Other"]
+
+
+@pytest.mark.parametrize("value, expected", [("0", 0), ("0.25", 0.25), (" 5 ", 5), ("60", 60), ("1e-1", 0.1)])
+def test_valid(value, expected):
+    assert check_float_param("slowHandlerThreshold", make_section(value), 0, 60) == expected
+
+
+@pytest.mark.parametrize("value", ["-0.5", "60.01", "abc", "0,25", "nan", "inf"])
+def test_invalid(value):
+    with pytest.raises(ValueNotValidError):
+        check_float_param("slowHandlerThreshold", make_section(value), 0, 60)
+
+
+def test_missing_and_empty():
+    with pytest.raises(ParamNotFoundError):
+        check_float_param("slowHandlerThreshold", make_section(None), 0, 60)
+    with pytest.raises(EmptyValueError):
+        check_float_param("slowHandlerThreshold", make_section(""), 0, 60)
+
+# END OF FILE FunPayCortex/tests/test_config_loader.py
@@ -0,0 +1,49 @@
+# START OF FILE FunPayCortex/tests/test_event_dispatcher.py
+
+"""
+Диспетчер событий Runner'а (:class:`Utils.event_dispatcher.EventDispatcher`).
+"""
+
+import threading
+import time
+
+from Utils.event_dispatcher import EventDispatcher
+
+
+def wait_processed(dispatcher: EventDispatcher, number: int, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while dispatcher.processed < number and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return dispatcher.processed
+
+
+def test_processed_counter():
+    dispatcher = EventDispatcher(8)
+    submitters = [threading.Thread(target=lambda n=n: [dispatcher.submit(f"chat-{n}-{i % 50}", lambda: None)
+                                                       for i in range(5000)]) for n in range(4)]
+    for t in submitters:
+        t.start()
+    for t in submitters:
+        t.join()
+    assert wait_processed(dispatcher, 20000) == 20000
+
+
+def test_same_key_is_fifo():
+    dispatcher = EventDispatcher(4)
+    results = {key: [] for key in ("Buyer123", "Seller_Pro", None)}
+    for i in range(300):
+        for key, result in results.items():
+            dispatcher.submit(key, result.append, i)
+    wait_processed(dispatcher, 900)
+    assert all(result == list(range(300)) for result in results.values())
+
+
+def test_errors_are_counted():
+    dispatcher = EventDispatcher(2)
+    done = []
+    dispatcher.submit("Buyer123", lambda: 1 / 0)
+    dispatcher.submit("Buyer123", done.append, True)
+    assert wait_processed(dispatcher, 2) == 2
+    assert done == [True] and not dispatcher.in_worker()
+
+# END OF FILE FunPayCortex/tests/test_event_dispatcher.py
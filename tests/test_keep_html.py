@@ -0,0 +1,115 @@
+# START OF FILE FunPayCortex/tests/test_keep_html.py
+
+"""
+При выключенном :attr:`FunPayAPI.account.Account.keep_html` объекты хранят html=None: парсеры и обработчики
+бота должны работать с такими объектами так же, как и с объектами с HTML.
+"""
+
+import configparser
+import datetime
+import json
+import logging
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import handlers
+from FunPayAPI import Account
+from FunPayAPI.common.enums import OrderStatuses, Currency
+from FunPayAPI.types import OrderShortcut
+from FunPayAPI.updater.events import LastChatMessageChangedEvent, NewMessageEvent, MessageEventsStack, NewOrderEvent
+from FunPayAPI.updater.runner import Runner
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+CHAT_FIELDS = ("id", "name", "last_message_text", "node_msg_id", "user_msg_id", "unread", "last_by_bot",
+               "last_message_type")
+MESSAGE_FIELDS = ("id", "type", "text", "author", "author_id", "badge", "image_link", "image_name", "by_bot",
+                  "is_autoreply", "is_support", "initiator_id", "i_am_seller", "i_am_buyer")
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+        self.status_code = 200
+
+    def json(self):
+        return self.data
+
+
+def make_account(keep_html: bool) -> Account:
+    account = Account("golden_key")
+    account._Account__initiated = True
+    account.id, account.username = 1000, "Seller77"
+    account.keep_html = keep_html
+    return account
+
+
+def parse_chats(keep_html: bool) -> list:
+    runner = Runner(make_account(keep_html), disable_message_requests=True, disabled_order_requests=True)
+    html = load_fixture("chat_bookmarks.html")
+    return [e.chat for e in runner.parse_chat_updates({"type": "chat_bookmarks", "tag": "tag",
+                                                       "data": {"html": html}})]
+
+
+def parse_messages(monkeypatch, keep_html: bool) -> list:
+    account = make_account(keep_html)
+    response = FakeResponse(json.loads(load_fixture("runner_chat_node.json")))
+    monkeypatch.setattr(account, "method", lambda *args, **kwargs: response)
+    return account.get_chats_histories({165898393: "Buyer123", 165001122: None, "flood": None})[165898393]
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_runner_chats(monkeypatch, fast):
+    if not fast:
+        monkeypatch.setattr(Runner, "parse_chat_bookmarks_fast", lambda self, html: None)
+    with_html, without_html = parse_chats(True), parse_chats(False)
+
+    assert all(chat.html for chat in with_html)
+    assert all(chat.html is None for chat in without_html)
+    assert [[getattr(chat, i) for i in CHAT_FIELDS] for chat in with_html] == \
+           [[getattr(chat, i) for i in CHAT_FIELDS] for chat in without_html]
+
+
+def test_messages(monkeypatch):
+    with_html, without_html = parse_messages(monkeypatch, True), parse_messages(monkeypatch, False)
+
+    assert all(message.html for message in with_html)
+    assert all(message.html is None for message in without_html)
+    assert [[getattr(message, i) for i in MESSAGE_FIELDS] for message in with_html] == \
+           [[getattr(message, i) for i in MESSAGE_FIELDS] for message in without_html]
+
+
+def test_log_handlers(monkeypatch, caplog):
+    cortex = SimpleNamespace(old_mode_enabled=True, account=SimpleNamespace(username="Seller77"))
+    caplog.set_level(logging.INFO, logger="FPC.handlers")
+
+    for chat in parse_chats(False):
+        handlers.old_log_msg_handler(cortex, LastChatMessageChangedEvent("tag", chat))
+    assert "Здравствуйте, когда будет выполнен заказ?" in caplog.text
+
+    stack = MessageEventsStack()
+    stack.add_events([NewMessageEvent("tag", message, stack) for message in parse_messages(monkeypatch, False)])
+    handlers.log_msg_handler(cortex, stack.get_stack()[-1])
+    assert "Есть в наличии?" in caplog.text
+    assert "https://sfunpay.com/s/chat/ab/cd/abcd1234.jpg" in caplog.text
+
+
+def test_new_order_handler():
+    order = OrderShortcut("ABCDEF12", "Ключ Steam, 1 шт.", 10.0, Currency.RUB, "Buyer123", 2000, "users-1000-2000",
+                          OrderStatuses.PAID, datetime.datetime.now(), "Ключи, Steam", None, None)
+    assert order.html is None
+
+    config = configparser.ConfigParser()
+    config["Ключ Steam"] = {"response": "Ваш товар: $product"}
+    cortex = SimpleNamespace(AD_CFG=config, profile=SimpleNamespace(get_sorted_lots=lambda mode: {}))
+    e = NewOrderEvent("tag", order)
+    handlers.setup_event_attributes_handler(cortex, e)
+    assert e.config_section_name == "Ключ Steam"
+
+# END OF FILE FunPayCortex/tests/test_keep_html.py
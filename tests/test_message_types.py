@@ -0,0 +1,147 @@
+# START OF FILE FunPayCortex/tests/test_message_types.py
+
+"""
+Эквивалентность классификатора системных сообщений (:meth:`FunPayAPI.types.Message.get_message_type`)
+и прежней реализации (последовательный перебор регулярных выражений без предварительных проверок).
+"""
+
+import pytest
+
+from FunPayAPI.common.enums import MessageTypes
+from FunPayAPI.common.utils import RegularExpressions
+from FunPayAPI.types import Message
+
+
+def legacy_message_type(text: str | None) -> MessageTypes:
+    """
+    Прежняя реализация get_message_type (эталон).
+    """
+    if not text:
+        return MessageTypes.NON_SYSTEM
+
+    res = RegularExpressions()
+    if res.DISCORD.search(text):
+        return MessageTypes.DISCORD
+    if res.DEAR_VENDORS.search(text):
+        return MessageTypes.DEAR_VENDORS
+
+    if res.ORDER_PURCHASED.findall(text) and res.ORDER_PURCHASED2.findall(text):
+        return MessageTypes.ORDER_PURCHASED
+
+    if res.ORDER_ID.search(text) is None:
+        return MessageTypes.NON_SYSTEM
+
+    sys_msg_types = {
+        MessageTypes.ORDER_CONFIRMED: res.ORDER_CONFIRMED,
+        MessageTypes.NEW_FEEDBACK: res.NEW_FEEDBACK,
+        MessageTypes.NEW_FEEDBACK_ANSWER: res.NEW_FEEDBACK_ANSWER,
+        MessageTypes.FEEDBACK_CHANGED: res.FEEDBACK_CHANGED,
+        MessageTypes.FEEDBACK_DELETED: res.FEEDBACK_DELETED,
+        MessageTypes.REFUND: res.REFUND,
+        MessageTypes.FEEDBACK_ANSWER_CHANGED: res.FEEDBACK_ANSWER_CHANGED,
+        MessageTypes.FEEDBACK_ANSWER_DELETED: res.FEEDBACK_ANSWER_DELETED,
+        MessageTypes.ORDER_CONFIRMED_BY_ADMIN: res.ORDER_CONFIRMED_BY_ADMIN,
+        MessageTypes.PARTIAL_REFUND: res.PARTIAL_REFUND,
+        MessageTypes.ORDER_REOPENED: res.ORDER_REOPENED,
+        MessageTypes.REFUND_BY_ADMIN: res.REFUND_BY_ADMIN
+    }
+    for i in sys_msg_types:
+        if sys_msg_types[i].search(text):
+            return i
+    return MessageTypes.NON_SYSTEM
+
+
+CASES = [
+    # Системные сообщения FunPay (RU / EN).
+    (MessageTypes.ORDER_PURCHASED,
+     "Покупатель Buyer123 оплатил заказ #AB12CD34. Аккаунт Steam, 1 шт.\n"
+     "Buyer123, не забудьте потом нажать кнопку «Подтвердить выполнение заказа»."),
+    (MessageTypes.ORDER_PURCHASED,
+     "Покупатель Buyer123 оплатил заказ #AB12CD34. 1000 золота, 1000 шт.\n"
+     "Buyer123, не забудьте потом нажать кнопку «Подтвердить получение валюты»."),
+    (MessageTypes.ORDER_PURCHASED,
+     "The buyer Buyer123 has paid for order #AB12CD34. Steam account, 1 pcs.\n"
+     "Buyer123, do not forget to press the «Confirm order fulfilment» button once you finish."),
+    (MessageTypes.ORDER_PURCHASED,
+     "The buyer Buyer123 has paid for order #AB12CD34. Gold, 500 pcs.\n"
+     "Buyer123, do not forget to press the «Confirm currency receipt» button once you finish."),
+    (MessageTypes.ORDER_CONFIRMED,
+     "Покупатель Buyer123 подтвердил успешное выполнение заказа #AB12CD34 и отправил деньги продавцу Seller77."),
+    (MessageTypes.ORDER_CONFIRMED,
+     "The buyer Buyer123 has confirmed that order #AB12CD34 has been fulfilled successfully and that the seller "
+     "Seller77 has been paid."),
+    (MessageTypes.NEW_FEEDBACK, "Покупатель Buyer123 написал отзыв к заказу #AB12CD34."),
+    (MessageTypes.NEW_FEEDBACK, "The buyer Buyer123 has given feedback to the order #AB12CD34."),
+    (MessageTypes.FEEDBACK_CHANGED, "Покупатель Buyer123 изменил отзыв к заказу #AB12CD34."),
+    (MessageTypes.FEEDBACK_CHANGED, "The buyer Buyer123 has edited their feedback to the order #AB12CD34."),
+    (MessageTypes.FEEDBACK_DELETED, "Покупатель Buyer123 удалил отзыв к заказу #AB12CD34."),
+    (MessageTypes.FEEDBACK_DELETED, "The buyer Buyer123 has deleted their feedback to the order #AB12CD34."),
+    (MessageTypes.NEW_FEEDBACK_ANSWER, "Продавец Seller77 ответил на отзыв к заказу #AB12CD34."),
+    (MessageTypes.NEW_FEEDBACK_ANSWER, "The seller Seller77 has replied to their feedback to the order #AB12CD34."),
+    (MessageTypes.FEEDBACK_ANSWER_CHANGED, "Продавец Seller77 изменил ответ на отзыв к заказу #AB12CD34."),
+    (MessageTypes.FEEDBACK_ANSWER_CHANGED,
+     "The seller Seller77 has edited a reply to their feedback to the order #AB12CD34."),
+    (MessageTypes.FEEDBACK_ANSWER_DELETED, "Продавец Seller77 удалил ответ на отзыв к заказу #AB12CD34."),
+    (MessageTypes.FEEDBACK_ANSWER_DELETED,
+     "The seller Seller77 has deleted a reply to their feedback to the order #AB12CD34."),
+    (MessageTypes.ORDER_REOPENED, "Заказ #AB12CD34 открыт повторно."),
+    (MessageTypes.ORDER_REOPENED, "Order #AB12CD34 has been reopened."),
+    (MessageTypes.REFUND, "Продавец Seller77 вернул деньги покупателю Buyer123 по заказу #AB12CD34."),
+    (MessageTypes.REFUND, "The seller Seller77 has refunded the buyer Buyer123 on order #AB12CD34."),
+    (MessageTypes.PARTIAL_REFUND, "Часть средств по заказу #AB12CD34 возвращена покупателю."),
+    (MessageTypes.PARTIAL_REFUND, "A part of the funds pertaining to the order #AB12CD34 has been refunded."),
+    (MessageTypes.ORDER_CONFIRMED_BY_ADMIN,
+     "Администратор Support подтвердил успешное выполнение заказа #AB12CD34 и отправил деньги продавцу Seller77."),
+    (MessageTypes.ORDER_CONFIRMED_BY_ADMIN,
+     "The administrator Support has confirmed that order #AB12CD34 has been fulfilled successfully and that the "
+     "seller Seller77 has been paid."),
+    (MessageTypes.REFUND_BY_ADMIN, "Администратор Support вернул деньги покупателю Buyer123 по заказу #AB12CD34."),
+    (MessageTypes.REFUND_BY_ADMIN, "The administrator Support has refunded the buyer Buyer123 on order #AB12CD34."),
+    (MessageTypes.DISCORD,
+     "Вы можете перейти в Discord. Внимание: общение за пределами сервера FunPay считается нарушением правил."),
+    (MessageTypes.DISCORD,
+     "You can switch to Discord. However, note that friending someone is considered a violation rules."),
+    (MessageTypes.DEAR_VENDORS,
+     "Уважаемые продавцы, не доверяйте сообщениям в чате! Перед выполнением заказа всегда проверяйте наличие "
+     "оплаты в разделе «Мои продажи»."),
+    (MessageTypes.DEAR_VENDORS,
+     "Dear vendors, do not rely on chat messages! Before you process an order, you should always check whether "
+     "you've been paid in «My sales» section."),
+    # Обычные сообщения.
+    (MessageTypes.NON_SYSTEM, None),
+    (MessageTypes.NON_SYSTEM, ""),
+    (MessageTypes.NON_SYSTEM, "Здравствуйте! Когда будет выполнен заказ?"),
+    (MessageTypes.NON_SYSTEM, "Hi, order #AB12CD34 is still not delivered"),
+    (MessageTypes.NON_SYSTEM, "Покупатель сказал, что заказ #ab12cd34 не пришел."),
+    (MessageTypes.NON_SYSTEM, "Продавец Seller77 вернул деньги покупателю Buyer123 по заказу #AB12CD3."),
+    # Без "#" системным сообщение о заказе быть не может (ранний выход).
+    (MessageTypes.NON_SYSTEM,
+     "Покупатель Buyer123 оплатил заказ AB12CD34. Buyer123, не забудьте потом нажать кнопку "
+     "«Подтвердить выполнение заказа»."),
+    (MessageTypes.NON_SYSTEM, "Покупатель Buyer123 написал отзыв к заказу AB12CD34."),
+    (MessageTypes.NON_SYSTEM, "Order AB12CD34 has been reopened."),
+    # Только первая часть сообщения об оплате.
+    (MessageTypes.NON_SYSTEM, "Покупатель Buyer123 оплатил заказ #AB12CD34. Аккаунт Steam, 1 шт."),
+    # Пересылка системного сообщения пользователем - совпадает так же, как и раньше.
+    (MessageTypes.NEW_FEEDBACK, "смотри: Покупатель Buyer123 написал отзыв к заказу #AB12CD34. что делать?"),
+    # Несколько совпадений - приоритет прежний.
+    (MessageTypes.DISCORD,
+     "You can switch to Discord. However, note that friending someone is considered a violation rules. "
+     "Order #AB12CD34 has been reopened."),
+    (MessageTypes.ORDER_CONFIRMED,
+     "Заказ #AB12CD34 открыт повторно. Покупатель Buyer123 подтвердил успешное выполнение заказа #AB12CD34 "
+     "и отправил деньги продавцу Seller77."),
+]
+
+
+def test_cases_cover_all_message_types():
+    assert {expected for expected, _ in CASES} == set(MessageTypes)
+
+
+@pytest.mark.parametrize("expected, text", CASES)
+def test_message_type(expected: MessageTypes, text: str | None):
+    message = Message(1, text, 1, "Buyer123", None, "FunPay", 0, None)
+    assert message.type == expected
+    assert message.get_message_type() == legacy_message_type(text)
+
+# END OF FILE FunPayCortex/tests/test_message_types.py
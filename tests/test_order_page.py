@@ -0,0 +1,120 @@
+# START OF FILE FunPayCortex/tests/test_order_page.py
+
+"""
+Парсер страницы заказа через lxml (:meth:`FunPayAPI.account.Account.get_order`) должен давать тот же
+:class:`FunPayAPI.types.Order`, что и парсер через BeautifulSoup.
+"""
+
+import os
+
+import pytest
+
+from FunPayAPI import Account
+from FunPayAPI.common import exceptions
+from FunPayAPI.common.enums import OrderStatuses, Currency
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+ORDER_PAGES = {
+    "AB12CD34": "order_closed_sale.html",
+    "ZX98YW76": "order_paid_purchase_en.html",
+    "QW34ER56": "order_refunded_hidden_review.html",
+}
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, text: str, status_code: int = 200):
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.status_code = status_code
+
+
+def make_account() -> Account:
+    account = Account("golden_key")
+    account._Account__initiated = True
+    account.id, account.username = 1000, "Seller77"
+    return account
+
+
+def order_fields(order) -> dict:
+    fields = {i: getattr(order, i) for i in ("id", "status", "subcategory", "lot_params", "buyer_params",
+                                             "short_description", "full_description", "amount", "sum", "currency",
+                                             "buyer_id", "buyer_username", "seller_id", "seller_username",
+                                             "chat_id", "html", "order_secrets")}
+    review = order.review
+    fields["review"] = None if review is None else \
+        {i: getattr(review, i) for i in ("stars", "text", "reply", "anonymous", "hidden", "order_id", "author",
+                                         "author_id", "by_bot", "reply_by_bot")}
+    return fields
+
+
+def parse_both(order_id: str, html: str):
+    account = make_account()
+    response = FakeResponse(html)
+    fast = account._Account__parse_order_page(order_id, html, response)
+    bs = account._Account__parse_order_page_bs(order_id, html, response)
+    return fast, bs
+
+
+@pytest.mark.parametrize("order_id", ORDER_PAGES)
+def test_lxml_parser_matches_bs(order_id):
+    fast, bs = parse_both(order_id, load_fixture(ORDER_PAGES[order_id]))
+    assert order_fields(fast) == order_fields(bs)
+
+
+def test_closed_sale():
+    order, _ = parse_both("AB12CD34", load_fixture(ORDER_PAGES["AB12CD34"]))
+    assert order.status is OrderStatuses.CLOSED
+    assert order.lot_params == [("Тип", "С Prime статусом"), ("Ранг", "Global Elite")]
+    assert order.buyer_params == {"Ваш Steam ID": "76561198000000000", "Комментарий": "Пожалуйста, побыстрее"}
+    assert order.short_description == "Аккаунт CS2 Prime, 1000 часов, Global Elite"
+    assert (order.sum, order.currency, order.amount) == (1520.0, Currency.RUB, 1)
+    assert (order.buyer_id, order.buyer_username, order.seller_id, order.seller_username, order.chat_id) == \
+           (2000, "Buyer123", 1000, "Seller77", "users-1000-2000")
+    assert order.order_secrets == ["login: cs_prime_1000", "password: Qwerty-123"]
+    assert (order.review.stars, order.review.text, order.review.reply) == \
+           (5, "Все отлично, продавец быстро ответил!", "Спасибо за отзыв!⁡")
+    assert order.review.reply_by_bot and not order.review.hidden
+
+
+def test_paid_purchase_without_review():
+    order, _ = parse_both("ZX98YW76", load_fixture(ORDER_PAGES["ZX98YW76"]))
+    assert order.status is OrderStatuses.PAID
+    assert order.lot_params == [] and order.review is None
+    assert (order.sum, order.currency, order.amount) == (12.5, Currency.USD, 10000)
+    assert (order.buyer_id, order.seller_id, order.seller_username) == (1000, 3000, "GoldShop")
+
+
+def test_refunded_hidden_review():
+    order, _ = parse_both("QW34ER56", load_fixture(ORDER_PAGES["QW34ER56"]))
+    assert order.status is OrderStatuses.REFUNDED
+    assert order.lot_params == [] and order.buyer_params == {"UID": "712345678"}
+    assert (order.sum, order.currency, order.amount) == (3450.75, Currency.EUR, 3)
+    assert (order.review.stars, order.review.hidden, order.review.reply) == (1, True, None)
+
+
+def test_unauthorized_page():
+    html = load_fixture(ORDER_PAGES["AB12CD34"]).replace("user-link-name", "user-link-nickname")
+    account = make_account()
+    for parse in (account._Account__parse_order_page, account._Account__parse_order_page_bs):
+        with pytest.raises(exceptions.UnauthorizedError):
+            parse("AB12CD34", html, FakeResponse(html))
+
+
+@pytest.mark.parametrize("keep_html", [True, False])
+def test_get_order_keep_html(monkeypatch, keep_html):
+    html = load_fixture(ORDER_PAGES["AB12CD34"])
+    account = make_account()
+    account.keep_order_html = keep_html
+    monkeypatch.setattr(account, "method", lambda *args, **kwargs: FakeResponse(html))
+
+    order = account.get_order("AB12CD34")
+    assert order.html == (html if keep_html else None)
+    assert order.review.text == "Все отлично, продавец быстро ответил!"
+    assert account.csrf_token == "a1b2c3d4e5f6"
+
+# END OF FILE FunPayCortex/tests/test_order_page.py
@@ -0,0 +1,133 @@
+# START OF FILE FunPayCortex/tests/test_order_updates.py
+
+"""
+Обновление списка продаж по orders_counters (:meth:`FunPayAPI.updater.runner.Runner.parse_order_updates`):
+первая страница загружается при каждом изменении тега, следующие - только если счетчик незавершенных продаж
+не объясняется известными заказами.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from FunPayAPI.common.enums import OrderStatuses, Currency
+from FunPayAPI.types import OrderShortcut
+from FunPayAPI.updater.events import InitialOrderEvent, NewOrderEvent, OrderStatusChangedEvent, \
+    OrdersListChangedEvent
+from FunPayAPI.updater.runner import Runner
+
+NOW = datetime(2026, 10, 18, 16, 0)
+
+
+def order(order_id: str, status: OrderStatuses, hours_ago: int) -> OrderShortcut:
+    return OrderShortcut(order_id, "Ключ Steam, 1 шт.", 100.0, Currency.RUB, "Buyer123", 2000, "users-1000-2000",
+                         status, NOW - timedelta(hours=hours_ago), "Steam, Ключи", None, None)
+
+
+class FakeAccount:
+    is_initiated = True
+    runner = None
+    keep_html = False
+    bot_character = "⁡"
+    old_bot_character = "⁤"
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+
+    def get_sales(self, start_from=None):
+        self.requests.append(start_from)
+        return (*self.pages[start_from], "ru", None)
+
+
+@pytest.fixture
+def account():
+    return FakeAccount()
+
+
+@pytest.fixture
+def runner(account):
+    return Runner(account, disable_message_requests=True, disabled_order_requests=False)
+
+
+def counters(buyer: int, seller: int) -> dict:
+    return {"type": "orders_counters", "id": 1000, "tag": "tag", "data": {"buyer": buyer, "seller": seller}}
+
+
+def start(runner, account, pages: dict, seller: int):
+    account.pages = pages
+    events = runner.parse_order_updates(counters(0, seller))
+    runner._Runner__first_request = False
+    account.requests.clear()
+    return events
+
+
+def test_first_request(runner, account):
+    events = start(runner, account, {None: ("P2", [order("A", OrderStatuses.PAID, 1),
+                                                   order("B", OrderStatuses.CLOSED, 2)])}, 1)
+    assert [type(e) for e in events] == [InitialOrderEvent, InitialOrderEvent]
+    assert runner.order_tracker.paid() == 1
+
+
+def test_unchanged_seller_counter_still_loads_first_page(runner, account):
+    start(runner, account, {None: ("P2", [order("A", OrderStatuses.PAID, 1), order("B", OrderStatuses.CLOSED, 2)])},
+          1)
+    # Заказ A закрылся, заказ C оплачен: счетчик незавершенных продаж тот же (1), изменился счетчик покупок.
+    account.pages = {None: ("P2", [order("C", OrderStatuses.PAID, 0), order("A", OrderStatuses.CLOSED, 1),
+                                   order("B", OrderStatuses.CLOSED, 2)])}
+    events = runner.parse_order_updates(counters(3, 1))
+
+    assert account.requests == [None]
+    assert [type(e) for e in events] == [OrdersListChangedEvent, NewOrderEvent, OrderStatusChangedEvent]
+    assert (events[1].order.id, events[2].order.id, events[2].order.status) == ("C", "A", OrderStatuses.CLOSED)
+
+
+def test_only_buyer_counter_changed(runner, account):
+    first_page = ("P2", [order("A", OrderStatuses.PAID, 1)])
+    start(runner, account, {None: first_page}, 1)
+    events = runner.parse_order_updates(counters(5, 1))
+    assert account.requests == [None]
+    assert [type(e) for e in events] == [OrdersListChangedEvent]
+
+
+def test_deeper_pages_only_when_counter_differs(runner, account):
+    start(runner, account, {None: ("P2", [order("A", OrderStatuses.PAID, 1)]),
+                            "P2": ("P3", [order("B", OrderStatuses.PAID, 5)])}, 2)
+    # Заказ B (уже не на первой странице) закрылся, на первой странице новый закрытый заказ D.
+    # По первой странице известно 2 оплаченных заказа (A, B), а счетчик - 1: догружается вторая страница.
+    account.pages = {None: ("P2", [order("D", OrderStatuses.CLOSED, 0), order("A", OrderStatuses.PAID, 1)]),
+                     "P2": ("P3", [order("B", OrderStatuses.CLOSED, 5), order("E", OrderStatuses.CLOSED, 6)]),
+                     "P3": (None, [order("F", OrderStatuses.PAID, 10)])}
+    events = runner.parse_order_updates(counters(0, 1))
+
+    assert account.requests == [None, "P2"]
+    # Неизвестные трекеру заказы не с первой страницы (E) - не новые.
+    assert [(type(e), getattr(e, "order", None) and e.order.id) for e in events] == \
+           [(OrdersListChangedEvent, None), (NewOrderEvent, "D"), (OrderStatusChangedEvent, "D"),
+            (OrderStatusChangedEvent, "B")]
+
+    # Счетчик сходится по первой странице: дальше нее не идем.
+    account.requests.clear()
+    account.pages[None] = ("P2", [order("D", OrderStatuses.CLOSED, 0), order("A", OrderStatuses.CLOSED, 1)])
+    events = runner.parse_order_updates(counters(0, 0))
+    assert account.requests == [None]
+    assert [e.order.id for e in events if isinstance(e, OrderStatusChangedEvent)] == ["A"]
+
+
+def test_counter_never_reconciled(runner, account):
+    runner.orders_max_pages = 2
+    start(runner, account, {None: ("P2", [order("OLD", OrderStatuses.PAID, 48)])}, 1)
+    account.pages = {None: ("P2", [order("A", OrderStatuses.PAID, 1)]),
+                     "P2": ("P3", [order("B", OrderStatuses.CLOSED, 5)])}
+    runner.parse_order_updates(counters(0, 5))
+
+    assert account.requests == [None, "P2"]
+    # OLD старше просмотренных страниц - его статус неизвестен, он забывается; недостающие 4 заказа запоминаются.
+    assert "OLD" not in runner.order_tracker and runner.order_tracker.paid() == 1
+    assert runner._Runner__untracked_paid == 4
+
+    account.requests.clear()
+    runner.parse_order_updates(counters(0, 5))
+    assert account.requests == [None]
+
+# END OF FILE FunPayCortex/tests/test_order_updates.py
@@ -0,0 +1,174 @@
+# START OF FILE FunPayCortex/tests/test_products_store.py
+
+"""
+Резервирование, подтверждение и откат выдачи товаров (:mod:`Utils.products_store`, :func:`handlers.deliver_goods`).
+"""
+
+import configparser
+import datetime
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import handlers
+from FunPayAPI.common.enums import OrderStatuses, Currency
+from FunPayAPI.types import OrderShortcut
+from Utils import products_store
+import Utils.exceptions
+
+
+def write_products(path, products: list[str]):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(products))
+
+
+def read_products(path) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [i for i in f.read().split("\n") if i]
+
+
+@pytest.fixture
+def products_file(tmp_path):
+    path = str(tmp_path / "goods.txt")
+    write_products(path, [f"key-{i:03d}" for i in range(100)])
+    return path
+
+
+def test_concurrent_reserves_are_unique(products_file):
+    delivered, errors = [], []
+    barrier = threading.Barrier(16)
+
+    def worker():
+        barrier.wait()
+        while True:
+            try:
+                with products_store.reserve(products_file, 3) as reservation:
+                    delivered.extend(reservation.products)
+            except Utils.exceptions.NoProductsError:
+                return
+            except Utils.exceptions.NotEnoughProductsError as exc:
+                errors.append(exc)
+                return
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(delivered) == len(set(delivered)) == 99
+    assert set(delivered) | {"key-099"} == {f"key-{i:03d}" for i in range(100)}
+    assert errors and products_store.count(products_file) == 1
+
+
+def test_rollback_returns_products(products_file):
+    reservation = products_store.reserve(products_file, 2)
+    assert reservation.products == ["key-000", "key-001"]
+    assert products_store.count(products_file) == 98
+
+    reservation.rollback()
+    assert products_store.count(products_file) == 100
+    assert products_store.pop(products_file, 2)[0] == ["key-000", "key-001"]
+
+
+def test_rollback_after_file_changed(products_file):
+    reservation = products_store.reserve(products_file, 2)
+    products_store.add(products_file, ["new-key"])
+    reservation.rollback()
+
+    assert products_store.count(products_file) == 101
+    assert products_store.pop(products_file, 3)[0] == ["key-000", "key-001", "key-002"]
+    assert read_products(products_file)[-1] == "new-key"
+
+
+def test_context_manager_rolls_back_on_error(products_file):
+    with pytest.raises(RuntimeError):
+        with products_store.reserve(products_file, 5):
+            raise RuntimeError
+    assert products_store.count(products_file) == 100
+
+
+def test_commit_survives_index_reload(products_file, monkeypatch):
+    reservation = products_store.reserve(products_file, 10)
+    reservation.commit()
+    reservation.rollback()  # после подтверждения откат ничего не делает
+    assert os.path.exists(products_file + products_store.INDEX_SUFFIX)
+
+    # Перезапуск: индекс в памяти потерян, остается только .idx на диске.
+    monkeypatch.setattr(products_store, "_indexes", {})
+    assert products_store.count(products_file) == 90
+    assert products_store.pop(products_file)[0] == ["key-010"]
+
+    # Индекс на диске поврежден: файл пересчитывается с начала.
+    monkeypatch.setattr(products_store, "_indexes", {})
+    with open(products_file + products_store.INDEX_SUFFIX, "w") as f:
+        f.write("{")
+    assert products_store.count(products_file) == 100
+
+
+def test_external_append_keeps_cursor(products_file):
+    products_store.pop(products_file, 10)
+    with open(products_file, "a", encoding="utf-8") as f:
+        f.write("\nappended")
+    assert products_store.count(products_file) == 91
+    assert products_store.pop(products_file)[0] == ["key-010"]
+
+
+def test_crc_mismatch_delivered_lines_removed(products_file):
+    products_store.pop(products_file, 10)
+    write_products(products_file, [f"key-{i:03d}" for i in range(5, 100)])
+    assert products_store.count(products_file) == 90
+    assert products_store.pop(products_file)[0] == ["key-010"]
+
+
+def test_crc_mismatch_file_replaced(products_file):
+    products_store.pop(products_file, 10)
+    write_products(products_file, ["other-1", "other-2"])
+    assert products_store.count(products_file) == 2
+    assert products_store.pop(products_file)[0] == ["other-1"]
+
+
+def make_event(amount: int = 1):
+    order = OrderShortcut("#ABCDEF12", f"Ключ, {amount} шт.", 10.0, Currency.RUB, "buyer", 1, 1,
+                          OrderStatuses.PAID, datetime.datetime.now(), "Ключи, Steam", None, None)
+    config = configparser.ConfigParser()
+    config["lot"] = {"response": "Ваш товар: $product", "productsFileName": "goods.txt"}
+    return SimpleNamespace(order=order, config_section_obj=config["lot"])
+
+
+def make_cortex(send_message):
+    return SimpleNamespace(account=SimpleNamespace(get_chat_by_name=lambda *args: SimpleNamespace(id=1)),
+                           multidelivery_enabled=True, telegram=None, send_message=send_message)
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("storage/products")
+    path = "storage/products/goods.txt"
+    write_products(path, [f"key-{i:03d}" for i in range(10)])
+    return path
+
+
+def test_deliver_goods_commits(storage):
+    sent = []
+    e = make_event(2)
+    handlers.deliver_goods(make_cortex(lambda chat_id, text, name: sent.append(text) or True), e)
+
+    assert sent == ["Ваш товар: key-000\nkey-001"]
+    assert e.delivered and e.goods_delivered == 2 and e.goods_left == 8
+    assert products_store.count(storage) == 8
+
+
+@pytest.mark.parametrize("send_message", [lambda *args: None, lambda *args: 1 / 0])
+def test_deliver_goods_rolls_back_on_failed_send(storage, send_message):
+    e = make_event(3)
+    handlers.deliver_goods(make_cortex(send_message), e)
+
+    assert e.error == 1 and not hasattr(e, "delivered")
+    assert products_store.count(storage) == 10
+    assert products_store.pop(storage)[0] == ["key-000"]
+
+# END OF FILE FunPayCortex/tests/test_products_store.py
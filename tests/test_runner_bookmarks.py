@@ -0,0 +1,93 @@
+# START OF FILE FunPayCortex/tests/test_runner_bookmarks.py
+
+"""
+Быстрый парсер chat_bookmarks (:meth:`FunPayAPI.updater.runner.Runner.parse_chat_bookmarks_fast`)
+должен давать тот же результат, что и парсер через BeautifulSoup.
+"""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from FunPayAPI.updater.runner import Runner
+from FunPayAPI.updater.events import InitialChatEvent
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeAccount:
+    is_initiated = True
+    runner = None
+    keep_html = False
+    bot_character = "⁡"
+    old_bot_character = "⁤"
+
+    def __init__(self):
+        self.chats = []
+
+    def add_chats(self, chats):
+        self.chats.extend(chats)
+
+
+@pytest.fixture
+def runner():
+    return Runner(FakeAccount(), disable_message_requests=True, disabled_order_requests=True)
+
+
+def without_html(chats):
+    return [chat[:6] for chat in chats]
+
+
+def test_fast_parser_matches_bs(runner):
+    html = load_fixture("chat_bookmarks.html")
+    fast = runner.parse_chat_bookmarks_fast(html)
+
+    assert fast is not None
+    assert without_html(fast) == without_html(runner.parse_chat_bookmarks(html))
+    assert [chat[0] for chat in fast] == [165898393, 165001122, 164880011, 164000123, 163555000, 162000001]
+    assert fast[0] == (165898393, 2930521364, 2930521300, "Здравствуйте, когда будет выполнен заказ?",
+                       "Buyer123", True, fast[0][6])
+    assert fast[3][3:5] == ('<b>не HTML</b> "кавычки" и ссылка https://funpay.com/orders/AB12CD34/',
+                            "Старый & Добрый")
+    assert fast[5][4] is None
+
+
+def test_fast_parser_keeps_widget_html(runner):
+    html = load_fixture("chat_bookmarks.html")
+    for chat in runner.parse_chat_bookmarks_fast(html):
+        assert chat[6].startswith("<a ") and chat[6].endswith("</a>")
+        assert chat[6].count("<a ") == 1 and f'data-id="{chat[0]}"' in chat[6]
+
+
+def test_known_chats_are_skipped(runner):
+    html = load_fixture("chat_bookmarks.html")
+    runner.runner_last_messages[165898393] = [2930521364, 2930521300, None]
+    runner.runner_last_messages[164880011] = [2930000000, 2930000000, None]
+
+    fast = runner.parse_chat_bookmarks_fast(html)
+    assert without_html(fast) == without_html(runner.parse_chat_bookmarks(html))
+    assert 165898393 not in [chat[0] for chat in fast]
+    assert 164880011 in [chat[0] for chat in fast]
+
+
+@pytest.mark.parametrize("old, new", [
+    ("Здравствуйте, когда", 'Здравствуйте, <a href="https://funpay.com/">когда</a>'),
+    ("</div>\n<div class=\"contact-item-time\">14:25</div>\n</a>", "</div>\n<div class=\"contact-item-time\">14:25"),
+])
+def test_unexpected_structure_falls_back_to_bs(runner, old, new):
+    html = load_fixture("chat_bookmarks.html").replace(old, new, 1)
+    assert runner.parse_chat_bookmarks_fast(html) is None
+    expected = [(chat[0], chat[4] or f"ID: {chat[0]}") for chat in runner.parse_chat_bookmarks(html)]
+
+    events = runner.parse_chat_updates({"type": "chat_bookmarks", "tag": "tag", "data": {"html": html}})
+    assert all(isinstance(e, InitialChatEvent) for e in events)
+    assert [(e.chat.id, e.chat.name) for e in events] == expected
+    assert events[0].chat.last_message_text.startswith("Здравствуйте, когда")
+
+# END OF FILE FunPayCortex/tests/test_runner_bookmarks.py
@@ -0,0 +1,175 @@
+# START OF FILE FunPayCortex/tests/test_sales_page.py
+
+"""
+Парсер страницы продаж через lxml (:meth:`FunPayAPI.account.Account.get_sales`) должен давать те же заказы,
+next_order_id, локаль и подкатегории, что и парсер через BeautifulSoup.
+"""
+
+import os
+from datetime import datetime
+
+import pytest
+
+from FunPayAPI import account as account_module
+from FunPayAPI import Account
+from FunPayAPI.common import exceptions
+from FunPayAPI.common.enums import OrderStatuses, Currency, SubCategoryTypes
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+SALES_PAGES = {
+    # файл: (start_from, locale)
+    "orders_trade_ru.html": (None, None),
+    "orders_trade_en_last.html": (None, None),
+    "orders_trade_uk_continue.html": ("QW34ER56", "uk"),
+}
+NOW = datetime(2026, 10, 18, 16, 0)
+ORDER_FIELDS = ("id", "description", "price", "currency", "buyer_username", "buyer_id", "chat_id", "status", "date",
+                "subcategory_name", "subcategory")
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, text: str, status_code: int = 200):
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.status_code = status_code
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(account_module, "datetime", FrozenDatetime)
+
+
+def make_account() -> Account:
+    account = Account("golden_key")
+    account._Account__initiated = True
+    account.id, account.username = 1000, "Seller77"
+    account.get_subcategory = lambda type_, id_: (type_, id_)
+    return account
+
+
+def parse(parser: str, name: str, include_paid: bool = True, include_closed: bool = True,
+          include_refunded: bool = True, exclude_ids: list[str] | None = None):
+    account = make_account()
+    html = load_fixture(name)
+    start_from, locale = SALES_PAGES[name]
+    return getattr(account, f"_Account__{parser}")(html, FakeResponse(html), "https://funpay.com/orders/trade",
+                                                   start_from, include_paid, include_closed, include_refunded,
+                                                   exclude_ids or [], locale, None)
+
+
+def page_fields(result) -> tuple:
+    next_order_id, sales, locale, subcategories = result
+    return next_order_id, locale, subcategories, [[getattr(i, f) for f in ORDER_FIELDS] for i in sales]
+
+
+@pytest.mark.parametrize("name", SALES_PAGES)
+def test_lxml_parser_matches_bs(name):
+    assert page_fields(parse("parse_sales_page", name)) == page_fields(parse("parse_sales_page_bs", name))
+
+
+@pytest.mark.parametrize("name", SALES_PAGES)
+@pytest.mark.parametrize("flags", [(False, True, True), (True, False, True), (True, True, False)])
+def test_status_filters_match_bs(name, flags):
+    fast = parse("parse_sales_page", name, *flags, exclude_ids=["AB12CD34", "ST78UV90"])
+    bs = parse("parse_sales_page_bs", name, *flags, exclude_ids=["AB12CD34", "ST78UV90"])
+    assert page_fields(fast) == page_fields(bs)
+    excluded = {status for flag, status in zip(flags, (OrderStatuses.PAID, OrderStatuses.CLOSED,
+                                                       OrderStatuses.REFUNDED)) if not flag}
+    assert all(i.status not in excluded and i.id not in ("AB12CD34", "ST78UV90") for i in fast[1])
+
+
+def test_ru_first_page():
+    next_order_id, sales, locale, subcategories = parse("parse_sales_page", "orders_trade_ru.html")
+    assert (next_order_id, locale) == ("KL12MN34", "ru")
+    assert subcategories == {"Counter-Strike 2, Аккаунты": (SubCategoryTypes.COMMON, 1000),
+                             "Counter-Strike 2, Предметы": (SubCategoryTypes.COMMON, 1001),
+                             "World of Warcraft, Золото": (SubCategoryTypes.CURRENCY, 2)}
+    assert [(i.id, i.status, i.date) for i in sales] == [
+        ("AB12CD34", OrderStatuses.PAID, datetime(2026, 10, 18, 14, 25)),
+        ("CD56EF78", OrderStatuses.CLOSED, datetime(2026, 10, 18, 0, 5)),
+        ("EF90GH12", OrderStatuses.REFUNDED, datetime(2026, 10, 17, 23, 59)),
+        ("GH34IJ56", OrderStatuses.CLOSED, datetime(2026, 5, 5, 9, 0)),
+        ("IJ78KL90", OrderStatuses.PAID, datetime(2025, 12, 28, 18, 30)),
+        ("KL12MN34", OrderStatuses.CLOSED, datetime(2024, 1, 1, 0, 0)),
+    ]
+    order = sales[0]
+    assert (order.description, order.price, order.currency) == \
+           ("Аккаунт CS2 Prime, 1000 часов, Global Elite", 1520.0, Currency.RUB)
+    assert (order.buyer_username, order.buyer_id, order.chat_id) == ("Buyer123", 2000, "users-1000-2000")
+    assert order.subcategory == (SubCategoryTypes.COMMON, 1000)
+    assert sales[3].buyer_username == "Старый & Добрый" and sales[3].subcategory is None
+    assert (sales[4].currency, sales[5].currency) == (Currency.EUR, Currency.RUB)
+
+
+def test_en_last_page():
+    next_order_id, sales, locale, subcategories = parse("parse_sales_page", "orders_trade_en_last.html")
+    assert (next_order_id, locale, subcategories) == (None, "en", None)
+    assert [(i.status, i.date, i.price) for i in sales] == [
+        (OrderStatuses.PAID, datetime(2026, 10, 18, 9, 5), 12.5),
+        (OrderStatuses.REFUNDED, datetime(2026, 10, 17, 10, 0), 1234.56),
+        (OrderStatuses.CLOSED, datetime(2026, 10, 12, 10, 0), 7.0),
+    ]
+
+
+def test_uk_continue_page():
+    next_order_id, sales, locale, _ = parse("parse_sales_page", "orders_trade_uk_continue.html")
+    assert (next_order_id, locale) == ("WX56YZ78", "uk")
+    assert [(i.status, i.date) for i in sales] == [
+        (OrderStatuses.CLOSED, datetime(2026, 10, 18, 8, 15)),
+        (OrderStatuses.REFUNDED, datetime(2026, 10, 17, 12, 0)),
+        (OrderStatuses.PAID, datetime(2025, 3, 15, 21, 45)),
+    ]
+
+
+def test_unauthorized_page():
+    html = load_fixture("orders_trade_ru.html").replace("user-link-name", "user-link-nickname")
+    account = make_account()
+    for parser in (account._Account__parse_sales_page, account._Account__parse_sales_page_bs):
+        with pytest.raises(exceptions.UnauthorizedError):
+            parser(html, FakeResponse(html), "https://funpay.com/orders/trade", None, True, True, True, [], None,
+                   None)
+
+
+@pytest.mark.parametrize("keep_html", [True, False])
+def test_get_sales(monkeypatch, keep_html):
+    account = make_account()
+    account.keep_html = keep_html
+    html = load_fixture("orders_trade_ru.html")
+    monkeypatch.setattr(account, "method", lambda *args, **kwargs: FakeResponse(html))
+
+    next_order_id, sales, locale, _ = account.get_sales()
+    assert (next_order_id, locale, len(sales)) == ("KL12MN34", "ru", 6)
+    assert account.csrf_token == "a1b2c3d4e5f6"
+    assert all((i.html is not None) == keep_html for i in sales)
+    if keep_html:
+        assert sales[0].html.startswith("<a ") and "#AB12CD34" in sales[0].html
+
+
+def test_get_sales_falls_back_to_bs(monkeypatch):
+    account = make_account()
+    html = load_fixture("orders_trade_ru.html")
+    monkeypatch.setattr(account, "method", lambda *args, **kwargs: FakeResponse(html))
+    expected = page_fields(account.get_sales())
+
+    calls = []
+
+    def broken(*args):
+        calls.append(args)
+        raise ValueError("unexpected markup")
+
+    monkeypatch.setattr(account, "_Account__parse_sales_page", broken)
+    assert page_fields(account.get_sales()) == expected
+    assert len(calls) == 1
+
+# END OF FILE FunPayCortex/tests/test_sales_page.py
@@ -0,0 +1,92 @@
+# START OF FILE FunPayCortex/tests/test_statistics_cp.py
+
+"""
+Команда /rebuild_stats (:func:`tg_bot.statistics_cp.init_statistics_cp`): доступ только администратору,
+отчет об успехе и об ошибке пересчета.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from tg_bot import statistics_cp
+
+ADMIN_ID, MANAGER_ID = 1, 2
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.sent.append(text)
+        return SimpleNamespace(chat=SimpleNamespace(id=chat_id), id=len(self.sent))
+
+    def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        self.sent.append(text)
+
+
+class FakeTelegram:
+    def __init__(self):
+        self.bot = FakeBot()
+        self.authorized_users = {ADMIN_ID: {"role": "admin"}, MANAGER_ID: {"role": "manager"}}
+        self.commands = {}
+
+    def msg_handler(self, handler, commands=None, **kwargs):
+        for command in commands or []:
+            self.commands[command] = handler
+
+    def cbq_handler(self, *args, **kwargs):
+        pass
+
+
+class FakeLedger:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.rebuilt = False
+
+    def rebuild_buckets(self):
+        if self.error:
+            raise self.error
+        self.rebuilt = True
+
+    def count(self):
+        return 42
+
+
+@pytest.fixture
+def tg():
+    tg = FakeTelegram()
+    executor = SimpleNamespace(submit_to=lambda lane, fn, *args: fn(*args))
+    statistics_cp.init_statistics_cp(SimpleNamespace(telegram=tg, executor=executor))
+    return tg
+
+
+def rebuild(tg, user_id: int):
+    tg.commands["rebuild_stats"](SimpleNamespace(chat=SimpleNamespace(id=100), from_user=SimpleNamespace(id=user_id)))
+
+
+def test_admin_only(tg, monkeypatch):
+    ledger = FakeLedger()
+    monkeypatch.setattr(statistics_cp, "get_ledger", lambda cortex: ledger)
+    rebuild(tg, MANAGER_ID)
+    assert tg.bot.sent == [statistics_cp._("admin_only_command")] and not ledger.rebuilt
+
+
+def test_rebuild(tg, monkeypatch):
+    ledger = FakeLedger()
+    monkeypatch.setattr(statistics_cp, "get_ledger", lambda cortex: ledger)
+    rebuild(tg, ADMIN_ID)
+    assert ledger.rebuilt
+    assert tg.bot.sent[0] == statistics_cp._("stat_rebuild_started")
+    assert "<b>42</b>" in tg.bot.sent[1]
+
+
+def test_rebuild_error(tg, monkeypatch, caplog):
+    monkeypatch.setattr(statistics_cp, "get_ledger", lambda cortex: FakeLedger(OSError("database is locked")))
+    rebuild(tg, ADMIN_ID)
+    assert "database is locked" in tg.bot.sent[-1]
+    assert tg.bot.sent[-1].startswith("❌")
+    assert "database is locked" in caplog.text
+
+# END OF FILE FunPayCortex/tests/test_statistics_cp.py
@@ -22,7 +22,8 @@ if TYPE_CHECKING:
 from tg_bot import utils, keyboards as kb, CBT, MENU_CFG
 from tg_bot.static_keyboards import CLEAR_STATE_BTN
 from telebot.types import InlineKeyboardMarkup as K, InlineKeyboardButton as B, Message, CallbackQuery
-from Utils import cortex_tools
+from Utils import cortex_tools, products_store
+from Utils.lane_executor import Lanes
 from locales.localizer import Localizer
 import logging
 import os
@@ -120,7 +121,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
             cortex_instance.AD_CFG.set(lot_title, "response", _("ad_default_response_text_new_lot"))
             cortex_instance.save_config(cortex_instance.AD_CFG, "configs/auto_delivery.cfg")
         
-        cortex_instance.executor.submit(_threaded_save)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_save)
         
         logger.info(_("log_ad_linked", m.from_user.username, m.from_user.id, lot_title))
 
@@ -160,7 +161,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
             cortex_instance.AD_CFG.set(lot_title, "response", _("ad_default_response_text_new_lot"))
             cortex_instance.save_config(cortex_instance.AD_CFG, "configs/auto_delivery.cfg")
         
-        cortex_instance.executor.submit(_threaded_save)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_save)
 
         new_ad_lot_index = len(cortex_instance.AD_CFG.sections()) - 1
         offset_new = utils.get_offset(new_ad_lot_index, MENU_CFG.AD_BTNS_AMOUNT)
@@ -183,7 +184,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
             c.data = f"{CBT.FP_LOTS_LIST}:{int(c.data.split(':')[1])}"
             open_fp_lots_list(c)
 
-        cortex_instance.executor.submit(_threaded_update)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_update)
 
 
     # ================================================================================= #
@@ -234,7 +235,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
             cortex_instance.AD_CFG.set(lot_name, "response", new_text)
             cortex_instance.save_config(cortex_instance.AD_CFG, "configs/auto_delivery.cfg")
         
-        cortex_instance.executor.submit(_threaded_save)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_save)
 
         logger.info(_("log_ad_text_changed", m.from_user.username, m.from_user.id, lot_name, new_text))
         bot.reply_to(m, _("ad_text_changed", utils.escape(lot_name), utils.escape(new_text)), reply_markup=kb_reply)
@@ -266,7 +267,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
 
         if file_name == "-":
             cortex_instance.AD_CFG.remove_option(lot_name, "productsFileName", fallback=None)
-            cortex_instance.executor.submit(_threaded_save)
+            cortex_instance.executor.submit_to(Lanes.panel, _threaded_save)
             
             logger.info(_("log_gf_unlinked", m.from_user.username, m.from_user.id, lot_name))
             bot.reply_to(m, _("ad_gf_unlinked", utils.escape(lot_name)), reply_markup=kb_reply)
@@ -295,7 +296,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
                 return
 
         cortex_instance.AD_CFG.set(lot_name, "productsFileName", file_name)
-        cortex_instance.executor.submit(_threaded_save)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_save)
         
         log_key = "log_gf_linked" if file_existed else "log_gf_created_and_linked"
         reply_key = "ad_gf_linked" if file_existed else "ad_gf_created_and_linked"
@@ -319,7 +320,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
             cortex_instance.AD_CFG.set(lot_name, param_name, new_value)
             cortex_instance.save_config(cortex_instance.AD_CFG, "configs/auto_delivery.cfg")
         
-        cortex_instance.executor.submit(_threaded_save)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_save)
         
         logger.info(_("log_param_changed", c.from_user.username, c.from_user.id, param_name, lot_name, new_value))
         
@@ -362,7 +363,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
             bot.edit_message_text(_("desc_ad_list"), c.message.chat.id, c.message.id,
                                   reply_markup=kb.lots_list(cortex_instance, new_offset))
         
-        cortex_instance.executor.submit(_threaded_delete)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_delete)
 
     # ================================================================================= #
     # ----------------------------- УПРАВЛЕНИЕ ФАЙЛАМИ ТОВАРОВ ---------------------------- #
@@ -413,7 +414,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
                 logger.error(f"Ошибка создания файла {file_path}: {e}", exc_info=True)
                 bot.reply_to(m, _("gf_creation_err", utils.escape(file_name)), reply_markup=kb_error)
 
-        cortex_instance.executor.submit(threaded_create)
+        cortex_instance.executor.submit_to(Lanes.panel, threaded_create)
 
     def open_gf_settings(c: CallbackQuery):
         """Открывает настройки конкретного файла товаров."""
@@ -501,9 +502,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
 
         def _threaded_write():
             try:
-                with open(full_selected_file_path, "a", encoding="utf-8") as f:
-                    if os.path.getsize(full_selected_file_path) > 0: f.write("\n")
-                    f.write("\n".join(products_to_add))
+                cortex_tools.add_products(full_selected_file_path, products_to_add)
                 
                 logger.info(_("log_gf_new_goods", m.from_user.username, m.from_user.id, len(products_to_add), selected_file_name))
                 keyboard_success = K().row(B(_("gl_back"), callback_data=back_btn_cb), B(_("gf_add_more"), callback_data=add_more_btn_cb))
@@ -514,7 +513,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
                 keyboard_error = K().row(B(_("gl_back"), callback_data=back_btn_cb), B(_("gf_try_add_again"), callback_data=try_again_btn_cb))
                 bot.reply_to(m, _("gf_add_goods_err"), reply_markup=keyboard_error)
 
-        cortex_instance.executor.submit(_threaded_write)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_write)
 
     def send_products_file(c: CallbackQuery):
         """Отправляет файл товаров пользователю."""
@@ -533,11 +532,14 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
             full_selected_file_path = os.path.join(products_dir, selected_file_name)
 
             try:
-                with open(full_selected_file_path, "r", encoding="utf-8") as f:
-                    if not f.read().strip():
-                        bot.answer_callback_query(c.id, _("gf_empty_error", utils.escape(selected_file_name)), show_alert=True)
-                        return
-                    
+                if not os.path.exists(full_selected_file_path):
+                    raise FileNotFoundError(full_selected_file_path)
+                if not cortex_tools.count_products(full_selected_file_path):
+                    bot.answer_callback_query(c.id, _("gf_empty_error", utils.escape(selected_file_name)), show_alert=True)
+                    return
+                # Отдаем только невыданные товары: перед отправкой вырезаем уже выданную часть файла.
+                products_store.compact(full_selected_file_path)
+
                 with open(full_selected_file_path, "rb") as file_to_send:
                     bot.send_document(c.message.chat.id, file_to_send, caption=f"📄 {utils.escape(selected_file_name)}")
                 logger.info(_("log_gf_downloaded", c.from_user.username, c.from_user.id, selected_file_name))
@@ -547,7 +549,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
                 logger.error(f"Ошибка при отправке файла {selected_file_name}: {e}")
                 bot.answer_callback_query(c.id, _("gl_error_try_again"), show_alert=True)
 
-        cortex_instance.executor.submit(_threaded_send)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_send)
 
     def ask_del_products_file(c: CallbackQuery):
         """Запрашивает подтверждение удаления файла товаров."""
@@ -594,6 +596,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
 
             try:
                 os.remove(full_path_to_delete)
+                products_store.forget(full_path_to_delete)
                 logger.info(_("log_gf_deleted", c.from_user.username, c.from_user.id, file_name_to_delete))
                 
                 new_offset = max(0, offset - MENU_CFG.PF_BTNS_AMOUNT if len(all_product_files)-1 < offset + MENU_CFG.PF_BTNS_AMOUNT else offset)
@@ -615,7 +618,7 @@ def init_auto_delivery_cp(cortex_instance: Cortex, *args):
                                       c.message.chat.id, c.message.id, reply_markup=keyboard_error_del)
                 return
 
-        cortex_instance.executor.submit(_threaded_delete)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_delete)
     
     # Регистрация обработчиков
     tg.cbq_handler(open_ad_lots_list, lambda c: c.data.startswith(f"{CBT.AD_LOTS_LIST}:"))
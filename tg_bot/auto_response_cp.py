@@ -16,6 +16,7 @@ if TYPE_CHECKING:
 
 from tg_bot import utils, keyboards, CBT, MENU_CFG
 from tg_bot.static_keyboards import CLEAR_STATE_BTN
+from Utils.lane_executor import Lanes
 from telebot.types import InlineKeyboardMarkup as K, InlineKeyboardButton as B, Message, CallbackQuery
 import logging
 from locales.localizer import Localizer
@@ -116,7 +117,7 @@ def init_auto_response_cp(cortex_instance: Cortex, *args):
             logger.info(_("log_ar_added", m.from_user.username, m.from_user.id, raw_cmd_for_cfg))
             bot.reply_to(m, _("ar_cmd_added", utils.escape(raw_cmd_for_cfg)), reply_markup=kb_success)
 
-        cortex_instance.executor.submit(threaded_add)
+        cortex_instance.executor.submit_to(Lanes.panel, threaded_add)
 
 
     def open_edit_command_cp(c: CallbackQuery):
@@ -178,7 +179,7 @@ def init_auto_response_cp(cortex_instance: Cortex, *args):
             bot.reply_to(m, _("ar_response_text_changed", utils.escape(raw_cmd), utils.escape(new_resp_text)),
                          reply_markup=kb_reply)
         
-        cortex_instance.executor.submit(threaded_edit)
+        cortex_instance.executor.submit_to(Lanes.panel, threaded_edit)
 
     def act_edit_command_notification(c: CallbackQuery):
         """Активирует режим ввода текста уведомления о команде."""
@@ -214,7 +215,7 @@ def init_auto_response_cp(cortex_instance: Cortex, *args):
             bot.reply_to(m, _("ar_notification_text_changed", utils.escape(raw_cmd), utils.escape(new_notif_text)),
                          reply_markup=kb_reply)
 
-        cortex_instance.executor.submit(threaded_edit)
+        cortex_instance.executor.submit_to(Lanes.panel, threaded_edit)
 
     def switch_notification(c: CallbackQuery):
         """Включает/выключает уведомление для команды."""
@@ -239,7 +240,7 @@ def init_auto_response_cp(cortex_instance: Cortex, *args):
             c.data = f"{CBT.EDIT_CMD}:{cmd_idx}:{offset}"
             open_edit_command_cp(c)
 
-        cortex_instance.executor.submit(threaded_switch)
+        cortex_instance.executor.submit_to(Lanes.panel, threaded_switch)
 
 
     def del_command(c: CallbackQuery):
@@ -264,7 +265,7 @@ def init_auto_response_cp(cortex_instance: Cortex, *args):
                                   reply_markup=keyboards.commands_list(cortex_instance, new_offset))
             bot.answer_callback_query(c.id, _("ar_command_deleted_successfully", command_name=utils.escape(cmd_to_delete)), show_alert=True)
         
-        cortex_instance.executor.submit(threaded_delete)
+        cortex_instance.executor.submit_to(Lanes.panel, threaded_delete)
     
     # Регистрация обработчиков
     tg.cbq_handler(open_commands_list, lambda c: c.data.startswith(f"{CBT.CMD_LIST}:"))
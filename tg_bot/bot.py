@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 import re
-from typing import TYPE_CHECKING, Literal
+from typing import TYPE_CHECKING, Literal, Any
 from FunPayAPI import Account
 from tg_bot.utils import NotificationTypes
 if TYPE_CHECKING:
@@ -19,8 +19,10 @@ import logging
 import requests
 from telebot.types import InlineKeyboardMarkup as K, InlineKeyboardButton as B, Message, CallbackQuery, BotCommand, InputFile
 from tg_bot import utils, static_keyboards as skb, keyboards as kb, CBT
+from tg_bot.notifier import NotificationDispatcher
 from Utils import cortex_tools
 from Utils.cortex_tools import validate_proxy, cache_proxy_dict
+from Utils.lane_executor import Lanes
 from locales.localizer import Localizer
 
 logger = logging.getLogger("TGBot")
@@ -41,6 +43,9 @@ class TGBot:
         self.cortex: Cortex = cortex_instance
         self.bot = telebot.TeleBot(self.cortex.MAIN_CFG["Telegram"]["token"], parse_mode="HTML",
                                    allow_sending_without_reply=True, num_threads=5)
+        self.notifier = NotificationDispatcher(self.bot,
+                                               coalesce_windows=utils.parse_coalesce_windows(
+                                                   self.cortex.MAIN_CFG["Telegram"]["coalesceWindows"]))
         self.file_handlers = {}
         self.attempts = {}
         self.init_messages = []
@@ -65,6 +70,8 @@ class TGBot:
             "logs": "cmd_logs",
             "about": "cmd_about",
             "sys": "cmd_sys",
+            "perf": "cmd_perf",
+            "rebuild_stats": "cmd_rebuild_stats",
             "get_backup": "cmd_get_backup",
             "create_backup": "cmd_create_backup",
             "del_logs": "cmd_del_logs",
@@ -398,7 +405,7 @@ class TGBot:
                     logger.error(f"Error checking proxy: {e}")
                     self.bot.edit_message_text(f"❌ <b>Прокси не работает!</b>\n\n{str(e)[:200]}\n\n👉 <b>Отправьте другой прокси:</b>", progress_msg.chat.id, progress_msg.id, parse_mode="HTML")
             
-            self.cortex.executor.submit(worker)
+            self.cortex.executor.submit_to(Lanes.panel, worker)
             
         except ValueError:
             self.bot.send_message(m.chat.id, "❌ <b>Неверный формат!</b>\nНужно: <code>login:pass@ip:port</code> или <code>ip:port</code>.\nПопробуйте снова:", parse_mode="HTML")
@@ -469,7 +476,7 @@ class TGBot:
                 self.bot.edit_message_text(_("profile_updating_error") + f"\n\n<i>{str(e)[:100]}</i>", progress_msg.chat.id, progress_msg.id)
                 logger.error(f"Ошибка при обновлении баланса через TG: {e}")
                 logger.debug("TRACEBACK", exc_info=True)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def act_change_cookie(self, m: Message):
         user_role = utils.get_user_role(self.authorized_users, m.from_user.id)
@@ -503,7 +510,7 @@ class TGBot:
                 logger.warning(f"Error checking token: {e}")
                 self.bot.edit_message_text(f"⚠️ <b>Не удалось авторизоваться!</b>\n\nПричина: {str(e)[:200]}\n\n👇 <b>Отправьте Golden Key еще раз:</b>", progress_msg.chat.id, progress_msg.id, parse_mode="HTML")
                 self.set_state(m.chat.id, progress_msg.id, m.from_user.id, CBT.CHANGE_GOLDEN_KEY)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def update_profile(self, c: CallbackQuery):
         self.bot.answer_callback_query(c.id)
@@ -525,7 +532,7 @@ class TGBot:
                 self.bot.edit_message_text(_("profile_updating_error") + f"\n\n<i>{str(e)[:100]}</i>", progress_msg.chat.id, progress_msg.id)
                 logger.error(f"Ошибка при обновлении профиля через TG: {e}")
                 logger.debug("TRACEBACK", exc_info=True)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def act_manual_delivery_test(self, m: Message):
         result = self.bot.send_message(m.chat.id, _("create_test_ad_key"), reply_markup=skb.CLEAR_STATE_BTN())
@@ -620,7 +627,7 @@ class TGBot:
                 self.bot.edit_message_text(_("logfile_error") + f"\n\n<i>{str(e)[:100]}</i>", progress_msg.chat.id, progress_msg.id)
                 logger.error(f"Ошибка при отправке логов: {e}")
                 logger.debug("TRACEBACK", exc_info=True)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def del_logs(self, m: Message):
         if utils.get_user_role(self.authorized_users, m.from_user.id) != "admin":
@@ -648,7 +655,7 @@ class TGBot:
                     logger.error(f"Непредвиденная ошибка при удалении файла {file_name}: {e}")
                     logger.debug("TRACEBACK", exc_info=True)
             self.bot.edit_message_text(_("logfile_deleted", deleted_count), progress_msg.chat.id, progress_msg.id)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def about(self, m: Message):
         self.bot.send_message(m.chat.id, _("about", self.cortex.VERSION), disable_web_page_preview=True)
@@ -676,7 +683,7 @@ class TGBot:
                     logger.debug("TRACEBACK", exc_info=True)
             else:
                 self.bot.edit_message_text("❌ Резервная копия еще не создана. Сначала создайте ее.", progress_msg.chat.id, progress_msg.id)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def create_backup(self, m: Message):
         progress_msg = self.bot.send_message(m.chat.id, "⚙️ Создаю резервную копию...")
@@ -686,7 +693,7 @@ class TGBot:
                 return
             self.bot.delete_message(progress_msg.chat.id, progress_msg.id)
             self.get_backup(m)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
         return True
 
     def send_system_info(self, m: Message):
@@ -704,6 +711,22 @@ class TGBot:
                                            psutil.Process().memory_info().rss // 1048576,
                                            cortex_tools.time_to_str(uptime_seconds), m.chat.id))
 
+    def send_perf_report(self, m: Message):
+        if utils.get_user_role(self.authorized_users, m.from_user.id) != "admin":
+            self.bot.send_message(m.chat.id, _("admin_only_command"))
+            return
+        top = self.cortex.handler_profiler.top(10)
+        if not top:
+            self.bot.send_message(m.chat.id, _("perf_no_data"))
+            return
+        lines = []
+        for i in top:
+            plugin = _("perf_plugin", i["plugin_uuid"]) if i["plugin_uuid"] else ""
+            lines.append(_("perf_handler", utils.escape(i["handler"]), i["event_type"], plugin, i["p50"] * 1000,
+                           i["p95"] * 1000, i["p99"] * 1000, i["max"] * 1000, i["calls"], i["errors"],
+                           i["error_rate"]))
+        self.bot.send_message(m.chat.id, _("perf_report", "\n\n".join(lines)))
+
     def restart_cortex(self, m: Message):
         if utils.get_user_role(self.authorized_users, m.from_user.id) != "admin":
             self.bot.send_message(m.chat.id, _("admin_only_command"))
@@ -715,7 +738,7 @@ class TGBot:
             time.sleep(2)
             cortex_tools.restart_program()
             
-        self.cortex.executor.submit(delayed_restart)
+        self.cortex.executor.submit_to(Lanes.panel, delayed_restart)
 
     def ask_power_off(self, m: Message):
         if utils.get_user_role(self.authorized_users, m.from_user.id) != "admin":
@@ -768,7 +791,7 @@ class TGBot:
             else:
                 self.bot.edit_message_text(_("msg_sending_error", node_id, utils.escape(username or "Пользователь")),
                                            progress_msg.chat.id, progress_msg.id, reply_markup=reply_kb)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def act_upload_image(self, m: Message):
         user_role = utils.get_user_role(self.authorized_users, m.from_user.id)
@@ -946,7 +969,7 @@ class TGBot:
                 else:
                     logger.error(f"Ошибка при расширении уведомления: {e}")
                     logger.debug("TRACEBACK", exc_info=True)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def ask_confirm_refund(self, call: CallbackQuery):
         split_data = call.data.split(":")
@@ -994,7 +1017,7 @@ class TGBot:
                     logger.warning(f"Не удалось обновить клавиатуру для заказа {order_id}: исходное сообщение не найдено.")
                 else:
                     logger.warning(f"Не удалось обновить клавиатуру для заказа {order_id}: {e}")
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def open_order_menu(self, c: CallbackQuery):
         split_data = c.data.split(":")
@@ -1173,7 +1196,7 @@ class TGBot:
             self.cortex.save_config(self.cortex.MAIN_CFG, os.path.join(self.cortex.base_path, "configs/_main.cfg"))
             c.data = f"{CBT.CATEGORY}:lang"
             self.open_settings_section(c)
-        self.cortex.executor.submit(worker)
+        self.cortex.executor.submit_to(Lanes.panel, worker)
 
     def show_help(self, c: CallbackQuery):
         try:
@@ -1224,6 +1247,7 @@ class TGBot:
         self.msg_handler(self.get_backup, commands=["get_backup"])
         self.msg_handler(self.create_backup, commands=["create_backup"])
         self.msg_handler(self.send_system_info, commands=["sys"])
+        self.msg_handler(self.send_perf_report, commands=["perf"])
         self.msg_handler(self.restart_cortex, commands=["restart"])
         self.msg_handler(self.ask_power_off, commands=["power_off"])
         self.msg_handler(self.send_announcements_kb, commands=["announcements"])
@@ -1291,28 +1315,26 @@ class TGBot:
     def send_notification(self, text: str | None, reply_markup: K | None = None,
                           notification_type: str = NotificationTypes.other, photo: bytes | io.BytesIO | None = None,
                           pin: bool = False, exclude_chat_id: int | None = None, caption: str | None = None,
-                          mute: bool = False): 
+                          mute: bool = False, coalesce_key: Any = None): 
         if not self.authorized_users:
             return
-        for user_id in self.authorized_users:
-            if exclude_chat_id and user_id == exclude_chat_id:
-                continue
-            if not self.is_notification_enabled(user_id, notification_type):
-                continue
-            try:
-                msg = None
-                if photo:
-                    if hasattr(photo, 'name'):
-                        # Передаем disable_notification=mute
-                        msg = self.bot.send_document(user_id, photo, caption=caption or text, reply_markup=reply_markup, disable_notification=mute)
-                    else:
-                        # Передаем disable_notification=mute
-                        msg = self.bot.send_photo(user_id, photo, caption=caption or text, reply_markup=reply_markup, disable_notification=mute)
-                elif text:
-                    # Передаем disable_notification=mute
-                    msg = self.bot.send_message(user_id, text, reply_markup=reply_markup, disable_notification=mute)
-                if pin and msg:
-                    try: self.bot.pin_chat_message(user_id, msg.id)
-                    except: pass
-            except Exception as e:
-                logger.error(_("log_tg_notification_error", user_id) + f": {e}")
\ No newline at end of file
+        recipients = [user_id for user_id in self.authorized_users
+                      if not (exclude_chat_id and user_id == exclude_chat_id)
+                      and self.is_notification_enabled(user_id, notification_type)]
+        # Текстовые уведомления с ключом (например, новые сообщения одного чата FunPay) объединяются в одно,
+        # если для их типа задано окно объединения (см. [Telegram] coalesceWindows).
+        if coalesce_key is not None and text and not photo and not pin and \
+                self.notifier.coalesce(notification_type, coalesce_key, recipients, text, reply_markup, mute):
+            return
+        # Рассылка идет в потоках диспетчера (с лимитами Telegram и повтором при 429), здесь не ждем ответа.
+        self.notifier.submit(recipients, text, reply_markup, photo, pin, caption, mute)
+
+    def flush_notifications(self, timeout: int | float | None = None) -> bool:
+        """
+        Ждет отправки всех уведомлений из очереди (например, перед перезапуском / выключением).
+
+        :param timeout: максимальное время ожидания (в секундах).
+
+        :return: True, если все уведомления отправлены.
+        """
+        return self.notifier.flush(timeout)
\ No newline at end of file
@@ -21,6 +21,7 @@ from telebot.types import CallbackQuery, Message
 
 from locales.localizer import Localizer
 from tg_bot import keyboards as kb, CBT
+from Utils.lane_executor import Lanes
 
 localizer = Localizer()
 _ = localizer.translate
@@ -104,7 +105,7 @@ def init_update_command(cortex_instance: Cortex, *args):
                     bot.edit_message_text(f"⚠️ **Критическая ошибка:**\n`{e}`", msg.chat.id, msg.id, parse_mode="Markdown")
                 except: pass
 
-        cortex_instance.executor.submit(do_request)
+        cortex_instance.executor.submit_to(Lanes.panel, do_request)
         
     tg.msg_handler(handle_update, commands=["update"])
 
@@ -133,7 +134,7 @@ def init_raise_category_updater(cortex_instance: Cortex, *args):
             else:
                 bot.edit_message_text(_("ad_lots_list_updating_err"), msg.chat.id, msg.id)
         
-        cortex_instance.executor.submit(threaded_update)
+        cortex_instance.executor.submit_to(Lanes.panel, threaded_update)
 
     tg.cbq_handler(update_raise_info, func=lambda c: c.data == CBT.UPDATE_RAISE_CATEGORIES)
 
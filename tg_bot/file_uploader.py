@@ -15,7 +15,8 @@ if TYPE_CHECKING:
     from cortex import Cortex
     from tg_bot.bot import TGBot
 
-from Utils import config_loader as cfg_loader, exceptions as excs, cortex_tools
+from Utils import config_loader as cfg_loader, exceptions as excs, cortex_tools, products_store
+from Utils.lane_executor import Lanes
 from telebot.types import InlineKeyboardButton as Button, InlineKeyboardMarkup as K
 from tg_bot import utils, keyboards, CBT, MENU_CFG
 from tg_bot.static_keyboards import CLEAR_STATE_BTN
@@ -128,6 +129,8 @@ def init_uploader(cortex_instance: Cortex):
             if not saved_file_path:
                 return
 
+            # Файл заменен целиком: старый курсор выдачи к нему не относится.
+            products_store.forget(saved_file_path)
             try:
                 products_count_str = str(cortex_tools.count_products(saved_file_path))
             except Exception as e:
@@ -150,7 +153,7 @@ def init_uploader(cortex_instance: Cortex):
             bot.edit_message_text(_("products_file_upload_success", filepath=utils.escape(saved_file_path.replace(tg.cortex.base_path, '.')), count=products_count_str),
                                   progress_msg.chat.id, progress_msg.id, reply_markup=keyboard_reply)
 
-        tg.cortex.executor.submit(threaded_task)
+        tg.cortex.executor.submit_to(Lanes.panel, threaded_task)
 
     # --- Загрузка основного конфига ---
     def act_upload_main_config(c: types.CallbackQuery):
@@ -184,7 +187,7 @@ def init_uploader(cortex_instance: Cortex):
             finally:
                 if os.path.exists(temp_path): os.remove(temp_path)
         
-        tg.cortex.executor.submit(threaded_task)
+        tg.cortex.executor.submit_to(Lanes.panel, threaded_task)
 
     # --- Загрузка конфига автоответчика ---
     def act_upload_auto_response_config(c: types.CallbackQuery):
@@ -219,7 +222,7 @@ def init_uploader(cortex_instance: Cortex):
             finally:
                 if os.path.exists(temp_path): os.remove(temp_path)
         
-        tg.cortex.executor.submit(threaded_task)
+        tg.cortex.executor.submit_to(Lanes.panel, threaded_task)
 
     # --- Загрузка конфига автовыдачи ---
     def act_upload_auto_delivery_config(c: types.CallbackQuery):
@@ -253,7 +256,7 @@ def init_uploader(cortex_instance: Cortex):
             finally:
                 if os.path.exists(temp_path): os.remove(temp_path)
         
-        tg.cortex.executor.submit(threaded_task)
+        tg.cortex.executor.submit_to(Lanes.panel, threaded_task)
 
     # --- Загрузка изображений ---
     def upload_image_generic_handler(tg: TGBot, m: types.Message, image_type: Literal["chat", "offer"]):
@@ -294,7 +297,7 @@ def init_uploader(cortex_instance: Cortex):
                 logger.error(f"Ошибка при загрузке изображения ({image_type}): {e}", exc_info=True)
                 tg.bot.reply_to(m, _("image_upload_error_generic"))
 
-        tg.cortex.executor.submit(threaded_task)
+        tg.cortex.executor.submit_to(Lanes.panel, threaded_task)
 
 
     def send_funpay_image_handler(tg: TGBot, m: types.Message):
@@ -341,7 +344,7 @@ def init_uploader(cortex_instance: Cortex):
                 logger.error(f"Ошибка при отправке изображения: {e}", exc_info=True)
                 tg.bot.reply_to(m, _("image_upload_error_generic"))
 
-        tg.cortex.executor.submit(threaded_task)
+        tg.cortex.executor.submit_to(Lanes.panel, threaded_task)
 
 
     def upload_chat_image_handler(tg: TGBot, m: types.Message):
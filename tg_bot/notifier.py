@@ -0,0 +1,329 @@
+# START OF FILE FunPayCortex/tg_bot/notifier.py
+
+"""
+В данном модуле описан диспетчер Telegram-уведомлений: рассылка получателям выполняется на собственном пуле
+потоков (вызывающий поток не ждет Telegram), с соблюдением лимитов Telegram (общего и на каждый чат),
+повтором запроса при ошибке 429 (через retry_after) и однократной загрузкой фото / файла: после первой отправки
+остальным получателям уходит file_id, а не сами байты.
+Кроме того, уведомления одного типа об одном и том же объекте (например, новые сообщения в одном чате FunPay),
+пришедшие в течение короткого окна, объединяются в одно сообщение.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from telebot import TeleBot
+    from telebot.types import InlineKeyboardMarkup as K
+
+import io
+import logging
+import queue
+import threading
+import time
+
+from telebot.apihelper import ApiTelegramException
+from locales.localizer import Localizer
+
+logger = logging.getLogger("TGBot")
+localizer = Localizer()
+_ = localizer.translate
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов (token bucket).
+
+    :param rate: кол-во запросов в секунду.
+    :param burst: максимальное кол-во запросов "залпом".
+    """
+    def __init__(self, rate: int | float, burst: int):
+        self.rate: int | float = rate
+        """Кол-во запросов в секунду."""
+        self.burst: int = burst
+        """Максимальное кол-во запросов "залпом"."""
+        self.__tokens: float = burst
+        self.__last: float = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Блокирует поток, пока не будет разрешен очередной запрос.
+        """
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(self.burst, self.__tokens + (now - self.__last) * self.rate)
+                self.__last = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                wait = (1 - self.__tokens) / self.rate
+            time.sleep(wait)
+
+
+class _Notification:
+    """
+    Одно уведомление (общее для всех получателей).
+    """
+    __slots__ = ("text", "reply_markup", "media", "media_name", "caption", "pin", "mute", "file_id", "waiting")
+
+    def __init__(self, text: str | None, reply_markup: K | None, media: bytes | None, media_name: str | None,
+                 caption: str | None, pin: bool, mute: bool):
+        self.text = text
+        self.reply_markup = reply_markup
+        self.media = media
+        self.media_name = media_name
+        self.caption = caption
+        self.pin = pin
+        self.mute = mute
+        self.file_id: str | None = None
+        self.waiting: list[int] = []
+
+
+class _Batch:
+    """
+    Накапливаемое (объединяемое) уведомление.
+    """
+    __slots__ = ("chat_ids", "texts", "length", "reply_markup", "mute", "timer")
+
+    def __init__(self):
+        self.chat_ids: list[int] = []
+        self.texts: list[str] = []
+        self.length: int = 0
+        self.reply_markup: K | None = None
+        self.mute: bool = True
+        self.timer: threading.Timer | None = None
+
+
+class NotificationDispatcher:
+    """
+    Диспетчер Telegram-уведомлений.
+
+    Каждый чат закреплен за одним потоком пула, поэтому уведомления в один чат приходят в порядке отправки,
+    а разные чаты обслуживаются параллельно. Исключение - фото / файлы: сначала их загружает первый получатель,
+    а остальным они ставятся в очередь только после загрузки (с file_id), поэтому поток никого не ждет,
+    но такое уведомление может прийти позже отправленных после него текстовых.
+
+    :param bot: экземпляр Telegram-бота.
+    :param workers: кол-во потоков рассылки.
+    :param global_rate: общий лимит сообщений в секунду.
+    :param chat_rate: лимит сообщений в секунду в один чат.
+    :param chat_burst: сколько сообщений в один чат можно отправить "залпом".
+    :param max_retries: сколько раз повторять запрос после ошибки 429.
+    :param coalesce_windows: окна объединения уведомлений ({тип уведомления: секунды}).
+    """
+    MAX_TEXT_LENGTH = 4000
+    """Максимальная длина объединенного уведомления (лимит Telegram - 4096 символов)."""
+
+    def __init__(self, bot: TeleBot, workers: int = 4, global_rate: int | float = 25,
+                 chat_rate: int | float = 1, chat_burst: int = 3, max_retries: int = 3,
+                 coalesce_windows: dict[str, int | float] | None = None):
+        self.bot: TeleBot = bot
+        """Экземпляр Telegram-бота."""
+        self.max_retries: int = max_retries
+        """Сколько раз повторять запрос после ошибки 429."""
+        self.global_limiter: RateLimiter = RateLimiter(global_rate, global_rate)
+        """Общий ограничитель частоты запросов."""
+        self.chat_rate: int | float = chat_rate
+        """Лимит сообщений в секунду в один чат."""
+        self.chat_burst: int = chat_burst
+        """Сколько сообщений в один чат можно отправить "залпом"."""
+        self.coalesce_windows: dict[str, int | float] = coalesce_windows or {}
+        """Окна объединения уведомлений ({тип уведомления: секунды}). Если типа нет в словаре (или окно 0),
+        уведомления этого типа отправляются сразу."""
+        self.coalesced: int = 0
+        """Кол-во уведомлений, объединенных с предыдущими (сэкономленных отправок на каждого получателя)."""
+        self.send_hook: Callable[[str, float, bool], None] | None = None
+        """Вызывается после каждого запроса к Telegram с аргументами: метод, время запроса (в секундах, без ожидания
+        лимитов), успешен ли запрос. Используется для сбора метрик."""
+
+        self.__chat_limiters: dict[int, RateLimiter] = {}
+        self.__queues: list[queue.Queue] = [queue.Queue() for _ in range(workers)]
+        self.__pending: int = 0
+        self.__pending_cond = threading.Condition()
+        self.__batches: dict[tuple[str, Any], _Batch] = {}
+        self.__batches_lock = threading.Lock()
+        for i, q in enumerate(self.__queues):
+            threading.Thread(target=self.__worker, args=(q,), name=f"TGNotify-{i}", daemon=True).start()
+
+    def submit(self, chat_ids: list[int], text: str | None, reply_markup: K | None = None,
+               photo: bytes | io.BytesIO | None = None, pin: bool = False, caption: str | None = None,
+               mute: bool = False):
+        """
+        Ставит уведомление в очередь рассылки и сразу возвращает управление.
+
+        :param chat_ids: ID чатов-получателей.
+        :param text: текст уведомления.
+        :param reply_markup: клавиатура.
+        :param photo: фото (байты / BytesIO) или файл (файловый объект с атрибутом name - отправляется документом).
+            Содержимое читается сразу, поэтому файл можно закрыть после вызова.
+        :param pin: закрепить ли сообщение.
+        :param caption: подпись к фото / файлу (по умолчанию - text).
+        :param mute: отправить ли уведомление без звука.
+        """
+        if not chat_ids:
+            return
+        media, media_name = None, None
+        if photo:
+            media_name = getattr(photo, "name", None)
+            if isinstance(photo, (bytes, bytearray)):
+                media = bytes(photo)
+            elif hasattr(photo, "getvalue"):
+                media = photo.getvalue()
+            else:
+                media = photo.read()
+        elif not text:
+            return
+
+        notification = _Notification(text, reply_markup, media, media_name, caption, pin, mute)
+        with self.__pending_cond:
+            self.__pending += len(chat_ids)
+        # Первый получатель загружает фото / файл, остальные ставятся в очередь после загрузки (см. __worker).
+        if media is not None:
+            notification.waiting = list(chat_ids[1:])
+            chat_ids = chat_ids[:1]
+        for chat_id in chat_ids:
+            self.__put(notification, chat_id, media is not None)
+
+    def __put(self, notification: _Notification, chat_id: int, uploader: bool):
+        self.__queues[hash(chat_id) % len(self.__queues)].put((notification, chat_id, uploader))
+
+    def coalesce(self, notification_type: str, key: Any, chat_ids: list[int], text: str,
+                 reply_markup: K | None = None, mute: bool = False) -> bool:
+        """
+        Добавляет текстовое уведомление в накапливаемое уведомление с тем же типом и ключом. Накопленное
+        уведомление отправляется (одним сообщением) через окно объединения после первого уведомления или раньше,
+        если текст становится слишком длинным.
+
+        :param notification_type: тип уведомления (см. :class:`tg_bot.utils.NotificationTypes`).
+        :param key: ключ объединения (например, ID чата FunPay).
+        :param chat_ids: ID чатов-получателей.
+        :param text: текст уведомления.
+        :param reply_markup: клавиатура (в объединенном уведомлении - клавиатура последнего уведомления).
+        :param mute: отправить ли уведомление без звука (объединенное - без звука, только если все без звука).
+
+        :return: True, если уведомление принято к объединению, False, если для данного типа объединение выключено
+            (тогда уведомление нужно отправить обычным способом).
+        """
+        if not (window := self.coalesce_windows.get(notification_type)):
+            return False
+        if not chat_ids or not text:
+            return True
+        text = text.rstrip()
+        batch_key = (notification_type, key)
+        with self.__batches_lock:
+            batch = self.__batches.get(batch_key)
+            if batch is not None and batch.length + len(text) + 2 > self.MAX_TEXT_LENGTH:
+                batch.timer.cancel()
+                self.__send_batch(batch_key, batch)
+                batch = None
+            if batch is None:
+                batch = self.__batches[batch_key] = _Batch()
+                batch.timer = threading.Timer(window, self.__flush_batch, args=(batch_key, batch))
+                batch.timer.daemon = True
+                batch.timer.start()
+            else:
+                self.coalesced += 1
+            batch.chat_ids = chat_ids
+            batch.texts.append(text)
+            batch.length += len(text) + 2
+            batch.reply_markup = reply_markup
+            batch.mute = batch.mute and mute
+        return True
+
+    def __flush_batch(self, batch_key: tuple[str, Any], batch: _Batch):
+        with self.__batches_lock:
+            if self.__batches.get(batch_key) is batch:
+                self.__send_batch(batch_key, batch)
+
+    def __send_batch(self, batch_key: tuple[str, Any], batch: _Batch):
+        del self.__batches[batch_key]
+        self.submit(batch.chat_ids, "\n\n".join(batch.texts), batch.reply_markup, mute=batch.mute)
+
+    def flush(self, timeout: int | float | None = None) -> bool:
+        """
+        Немедленно отправляет накапливаемые уведомления и ждет, пока все уведомления из очереди будут отправлены.
+
+        :param timeout: максимальное время ожидания (в секундах).
+
+        :return: True, если очередь опустела, False, если истек таймаут.
+        """
+        with self.__batches_lock:
+            for batch_key, batch in list(self.__batches.items()):
+                batch.timer.cancel()
+                self.__send_batch(batch_key, batch)
+        with self.__pending_cond:
+            return self.__pending_cond.wait_for(lambda: self.__pending == 0, timeout)
+
+    def __worker(self, q: queue.Queue):
+        while True:
+            notification, chat_id, uploader = q.get()
+            try:
+                self.__send(notification, chat_id, uploader)
+            except Exception as e:
+                logger.error(_("log_tg_notification_error", chat_id) + f": {e}")
+                logger.debug("TRACEBACK", exc_info=True)
+            finally:
+                # Загрузка завершена (успешно - остальным уйдет file_id, иначе - сами байты).
+                if uploader:
+                    for waiting_chat_id in notification.waiting:
+                        self.__put(notification, waiting_chat_id, False)
+                with self.__pending_cond:
+                    self.__pending -= 1
+                    if not self.__pending:
+                        self.__pending_cond.notify_all()
+
+    def __send(self, n: _Notification, chat_id: int, uploader: bool):
+        if n.media is None:
+            msg = self.__call(chat_id, lambda: self.bot.send_message(chat_id, n.text, reply_markup=n.reply_markup,
+                                                                     disable_notification=n.mute), "send_message")
+        else:
+            method = self.bot.send_document if n.media_name else self.bot.send_photo
+            msg = self.__call(chat_id, lambda: method(chat_id, n.file_id or self.__media(n),
+                                                      caption=n.caption or n.text, reply_markup=n.reply_markup,
+                                                      disable_notification=n.mute), method.__name__)
+            if uploader and msg:
+                if msg.document:
+                    n.file_id = msg.document.file_id
+                elif msg.photo:
+                    n.file_id = msg.photo[-1].file_id
+
+        if n.pin and msg:
+            try:
+                self.__call(chat_id, lambda: self.bot.pin_chat_message(chat_id, msg.id), "pin_chat_message")
+            except Exception:
+                pass
+
+    @staticmethod
+    def __media(n: _Notification) -> io.BytesIO:
+        # Новый объект на каждую попытку: telebot читает поток до конца.
+        media = io.BytesIO(n.media)
+        if n.media_name:
+            media.name = n.media_name
+        return media
+
+    def __call(self, chat_id: int, func: Callable[[], Any], method: str) -> Any:
+        if (limiter := self.__chat_limiters.get(chat_id)) is None:
+            limiter = self.__chat_limiters.setdefault(chat_id, RateLimiter(self.chat_rate, self.chat_burst))
+        attempt = 0
+        while True:
+            self.global_limiter.acquire()
+            limiter.acquire()
+            start, ok = time.perf_counter(), False
+            try:
+                result = func()
+                ok = True
+                return result
+            except ApiTelegramException as e:
+                if e.error_code != 429 or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                retry_after = ((e.result_json or {}).get("parameters") or {}).get("retry_after", 1)
+                logger.warning(f"Telegram: превышен лимит запросов (чат {chat_id}), повтор через {retry_after} сек.")
+                time.sleep(retry_after)
+            finally:
+                if self.send_hook:
+                    self.send_hook(method, time.perf_counter() - start, ok)
+
+# END OF FILE FunPayCortex/tg_bot/notifier.py
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import time
+import threading
 import telebot.apihelper
 import logging
 import os
@@ -9,6 +10,7 @@ if TYPE_CHECKING:
 
 from tg_bot import utils, static_keyboards as skb, keyboards as kb, CBT
 from Utils.cortex_tools import validate_proxy, cache_proxy_dict, check_proxy
+from Utils.lane_executor import Lanes
 from telebot.types import InlineKeyboardMarkup as K, InlineKeyboardButton as B, CallbackQuery, Message
 from locales.localizer import Localizer
 
@@ -54,7 +56,7 @@ def init_proxy_cp(cortex_instance: Cortex, *args):
     # Запускаем фоновый чекер один раз при инициализации
     if not getattr(init_proxy_cp, "_checker_thread_started", False):
         init_proxy_cp._checker_thread_started = True
-        cortex_instance.executor.submit(check_all_proxies_periodically)
+        threading.Thread(target=check_all_proxies_periodically, daemon=True).start()
 
 
     def open_proxy_list(c: CallbackQuery):
@@ -179,7 +181,7 @@ def init_proxy_cp(cortex_instance: Cortex, *args):
             c.data = f"{CBT.PROXY}:{offset}"
             open_proxy_list(c)
 
-        cortex_instance.executor.submit(_threaded_choose)
+        cortex_instance.executor.submit_to(Lanes.panel, _threaded_choose)
 
     def delete_proxy(c: CallbackQuery):
         """
@@ -209,7 +211,7 @@ def init_proxy_cp(cortex_instance: Cortex, *args):
                 # Сохраняем конфиг в отдельном потоке
                 def _threaded_save():
                     cortex_instance.save_config(cortex_instance.MAIN_CFG, os.path.join(cortex_instance.base_path, "configs/_main.cfg"))
-                cortex_instance.executor.submit(_threaded_save)
+                cortex_instance.executor.submit_to(Lanes.panel, _threaded_save)
                 
                 bot.answer_callback_query(c.id, "✅ Прокси удален. Переход на прямое соединение (без прокси).", show_alert=True)
             else:
@@ -6,6 +6,8 @@ import time
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
 import os
+import logging
+import threading
 import requests
 
 from FunPayAPI.common.enums import OrderStatuses
@@ -16,112 +18,98 @@ from FunPayAPI.types import MessageTypes
 from locales.localizer import Localizer
 from tg_bot import CBT, keyboards as kb, utils
 from tg_bot.static_keyboards import CLEAR_STATE_BTN
+from Utils.lane_executor import Lanes
+from Utils.sales_ledger import SalesLedger
 from telebot.types import CallbackQuery, Message
 
 if TYPE_CHECKING:
     from cortex import Cortex
 
+logger = logging.getLogger("TGBot")
 localizer = Localizer()
 _ = localizer.translate
 
 WITHDRAWAL_FORECAST_FILE = "storage/cache/withdrawal_forecast.json"
 LOCAL_STATS_FILE = "storage/cache/local_stats.json"
+"""Старый JSON-файл статистики (переносится в журнал продаж при первом запуске)."""
+SALES_LEDGER_FILE = "storage/cache/sales.sqlite3"
 
-# Убираем проверки уровня доступа, так как это self-hosted версия
-def ensure_files_exist(cortex: Cortex):
-    path = os.path.join(cortex.base_path, LOCAL_STATS_FILE)
-    if not os.path.exists(path):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump([], f)
+HEAD_SCAN_MAX_PAGES = 20
+"""Максимальное кол-во страниц продаж за одну инкрементальную проверку."""
+BACKFILL_DELAY = 3
+"""Пауза между страницами продаж (в секундах)."""
+BACKFILL_RATE_LIMIT_PAUSE = 120
+"""Пауза догрузки истории продаж после ответа FunPay 429 (в секундах)."""
+BACKFILL_MAX_ERRORS = 5
+"""Сколько ошибок подряд допускается до остановки догрузки истории (она продолжится при следующем запуске)."""
 
-def upload_sales_to_backend(cortex: Cortex, sales: list):
+REFUND_STATUSES = {"REFUNDED", "refunded", "OrderStatuses.REFUNDED"}
+SALE_STATUSES = {"CLOSED", "PAID", "closed", "paid", "OrderStatuses.CLOSED", "OrderStatuses.PAID"}
+
+_ledger: SalesLedger | None = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger(cortex: Cortex) -> SalesLedger:
     """
-    Вместо отправки на бэкенд, сохраняем продажи в локальный JSON.
+    Возвращает журнал продаж (при первом вызове открывает его и переносит продажи из старого JSON-файла).
     """
-    path = os.path.join(cortex.base_path, LOCAL_STATS_FILE)
-    ensure_files_exist(cortex)
-    
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            local_data = json.load(f)
-    except:
-        local_data = []
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = SalesLedger(os.path.join(cortex.base_path, SALES_LEDGER_FILE))
+            old_path = os.path.join(cortex.base_path, LOCAL_STATS_FILE)
+            if os.path.exists(old_path):
+                _ledger.import_json(old_path)
+        return _ledger
 
-    # Преобразуем входящие продажи в словарь для простоты
-    existing_ids = {item["order_id"] for item in local_data}
-    
-    updated = False
-    for sale in sales:
-        status_str = sale.status.name if hasattr(sale.status, 'name') else str(sale.status)
-        currency_str = str(sale.currency)
-        date_iso = sale.date.isoformat() if sale.date else datetime.now().isoformat()
-        
-        sale_obj = {
-            "order_id": sale.id,
-            "description": sale.description,
-            "price": sale.price,
-            "currency": currency_str,
-            "status": status_str,
-            "buyer_username": sale.buyer_username,
-            "date": date_iso,
-            "timestamp": sale.date.timestamp() if sale.date else time.time()
-        }
-
-        # Если заказ уже есть, обновляем его статус
-        found = False
-        for i, item in enumerate(local_data):
-            if item["order_id"] == sale.id:
-                local_data[i] = sale_obj
-                found = True
-                updated = True
-                break
-        
-        if not found:
-            local_data.append(sale_obj)
-            updated = True
 
-    if updated:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(local_data, f, ensure_ascii=False, indent=2)
+def sale_to_record(sale) -> dict:
+    """
+    Преобразует заказ (:class:`FunPayAPI.types.OrderShortcut`) в запись журнала продаж.
+    """
+    return {
+        "order_id": sale.id,
+        "description": sale.description,
+        "price": sale.price,
+        "currency": str(sale.currency),
+        "status": sale.status.name if hasattr(sale.status, 'name') else str(sale.status),
+        "buyer_username": sale.buyer_username,
+        "date": sale.date.isoformat() if sale.date else datetime.now().isoformat(),
+        "timestamp": sale.date.timestamp() if sale.date else time.time()
+    }
+
+
+def upload_sales_to_backend(cortex: Cortex, sales: list):
+    """
+    Вместо отправки на бэкенд, сохраняем продажи в локальный журнал продаж.
+    """
+    get_ledger(cortex).upsert(sale_to_record(sale) for sale in sales)
 
 
 def get_stats_from_backend(cortex: Cortex, period_days: int | None):
     """
-    Генерирует статистику на основе локального JSON файла.
+    Генерирует статистику на основе агрегатов локального журнала продаж (часовых и суточных корзин).
+    Возвращает None, если продаж за период нет или журнал недоступен.
     """
-    path = os.path.join(cortex.base_path, LOCAL_STATS_FILE)
-    ensure_files_exist(cortex)
-    
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except:
+        summary = get_ledger(cortex).summary(time.time() - period_days * 86400 if period_days is not None else None)
+    except Exception:
+        return None
+    if not summary:
         return None
-
-    # Фильтрация по времени
-    if period_days is not None:
-        cutoff_time = time.time() - (period_days * 86400)
-        filtered_data = [x for x in data if x.get("timestamp", 0) >= cutoff_time]
-    else:
-        filtered_data = data
 
     sales_count = 0
     sales_sum = {}
     refund_count = 0
     refund_sum = {}
 
-    for item in filtered_data:
-        curr = item["currency"]
-        price = item["price"]
-        status = item["status"]
-
-        # Логика подсчета (адаптируйте статусы под ваши Enum)
-        # Обычно 'closed', 'paid' - это успех. 'refunded' - возврат.
-        if status in ["refunded", "OrderStatuses.REFUNDED"]:
-            refund_count += 1
+    for status, curr, count, price in summary:
+        if status in REFUND_STATUSES:
+            refund_count += count
             refund_sum[curr] = refund_sum.get(curr, 0) + price
-        elif status in ["closed", "paid", "OrderStatuses.CLOSED", "OrderStatuses.PAID"]:
-            sales_count += 1
+        elif status in SALE_STATUSES:
+            sales_count += count
             sales_sum[curr] = sales_sum.get(curr, 0) + price
 
     return {
@@ -148,11 +136,12 @@ def save_forecast(cortex: Cortex):
         path = os.path.join(cortex.base_path, WITHDRAWAL_FORECAST_FILE)
         with open(path, "w", encoding="utf-8") as f:
             json.dump(cortex.withdrawal_forecast, f, ensure_ascii=False, indent=2)
-    cortex.executor.submit(threaded_save)
+    cortex.executor.submit_to(Lanes.stats, threaded_save)
 
 def periodic_sales_update(cortex: Cortex):
     load_forecast(cortex)
     scan_and_sync(cortex) # Первый скан
+    threading.Thread(target=backfill_sales, args=(cortex,), daemon=True, name="SalesBackfill").start()
     
     report_interval_hours = cortex.MAIN_CFG["Statistics"].getint("report_interval", 0)
     last_report_time = time.time()
@@ -172,23 +161,79 @@ def periodic_sales_update(cortex: Cortex):
         time.sleep(1800) 
         scan_and_sync(cortex)
 
+def sync_sales_page(cortex: Cortex, orders: list, meta: dict[str, str | None] | None = None) -> bool:
+    """
+    Сохраняет в журнал новые заказы страницы продаж и заказы с изменившимся статусом.
+
+    :param orders: заказы страницы.
+    :param meta: служебные значения журнала, которые нужно сохранить вместе с заказами (курсор догрузки).
+
+    :return: есть ли на странице уже известный заказ с прежним статусом.
+    """
+    ledger = get_ledger(cortex)
+    records = [sale_to_record(sale) for sale in orders]
+    known = ledger.statuses([i["order_id"] for i in records])
+    changed = [i for i in records if known.get(i["order_id"]) != i["status"]]
+    ledger.upsert(changed, meta)
+    return len(changed) < len(records)
+
+
 def scan_and_sync(cortex: Cortex):
-    # Убрана проверка уровня доступа
+    """
+    Инкрементальная проверка новых продаж: страницы продаж загружаются сверху, пока не встретится уже известный
+    заказ с прежним статусом (изменения статусов ниже отслеживает :func:`order_status_hook`).
+    """
     try:
         next_pos = None
-        for _ in range(3): 
-            time.sleep(1)
-            # Получаем продажи с FP
-            result = cortex.account.get_sales(start_from=next_pos, include_paid=True, include_closed=True, include_refunded=True)
-            next_pos, orders_list, _, _ = result
-            
-            if orders_list:
-                upload_sales_to_backend(cortex, orders_list) # Теперь это локальная функция
-            
-            if not next_pos:
+        for _ in range(HEAD_SCAN_MAX_PAGES):
+            next_pos, orders_list, _, _ = cortex.account.get_sales(start_from=next_pos, include_paid=True,
+                                                                   include_closed=True, include_refunded=True)
+            if sync_sales_page(cortex, orders_list) or not next_pos:
                 break
+            time.sleep(BACKFILL_DELAY)
     except Exception as e:
-        print(f"[Stats] Error during background scan: {e}")
+        logger.error(f"Ошибка при проверке продаж для статистики: {e}")
+        logger.debug("TRACEBACK", exc_info=True)
+
+
+def backfill_sales(cortex: Cortex):
+    """
+    Глубокая догрузка истории продаж: один раз проходит всю историю продаж с паузами между страницами.
+    Курсор (параметр continue следующей страницы) сохраняется в журнал в одной транзакции с заказами страницы,
+    поэтому после перезапуска догрузка продолжается с того же места.
+    """
+    ledger = get_ledger(cortex)
+    if ledger.get_meta("backfill_done"):
+        return
+    cursor = ledger.get_meta("backfill_cursor")
+    logger.info(f"Загружаю историю продаж для статистики{' (продолжение)' if cursor else ''}...")
+    pages = errors = 0
+    while True:
+        if time.time() - cortex.account.last_429_err_time < BACKFILL_RATE_LIMIT_PAUSE:
+            time.sleep(BACKFILL_RATE_LIMIT_PAUSE)
+            continue
+        try:
+            next_pos, orders_list, _, _ = cortex.account.get_sales(start_from=cursor, include_paid=True,
+                                                                   include_closed=True, include_refunded=True)
+        except Exception as e:
+            errors += 1
+            logger.warning(f"Ошибка при загрузке истории продаж ({errors}/{BACKFILL_MAX_ERRORS}): {e}")
+            logger.debug("TRACEBACK", exc_info=True)
+            if errors >= BACKFILL_MAX_ERRORS:
+                logger.error("Загрузка истории продаж прервана, она продолжится после перезапуска.")
+                return
+            time.sleep(60)
+            continue
+        errors = 0
+        pages += 1
+        if next_pos:
+            sync_sales_page(cortex, orders_list, {"backfill_cursor": next_pos})
+            cursor = next_pos
+            time.sleep(BACKFILL_DELAY)
+            continue
+        sync_sales_page(cortex, orders_list, {"backfill_cursor": None, "backfill_done": "1"})
+        logger.info(f"История продаж загружена: страниц за этот запуск - {pages}, продаж в журнале - {ledger.count()}.")
+        return
 
 # ... (format_price_summary и format_stats_message оставляем без изменений) ...
 def format_price_summary(price_dict: dict) -> str:
@@ -269,7 +314,7 @@ def init_statistics_cp(cortex: Cortex, *args):
                 bot.edit_message_text(msg_text, c.message.chat.id, c.message.id, reply_markup=kb.statistics_menu(cortex))
             except: pass
 
-        cortex.executor.submit(threaded_job)
+        cortex.executor.submit_to(Lanes.stats, threaded_job)
 
 
     def open_statistics_config(c: CallbackQuery):
@@ -298,7 +343,7 @@ def init_statistics_cp(cortex: Cortex, *args):
                 bot.send_message(m.chat.id, f"✅ Период анализа изменен на <b>{days}</b> дн.", reply_markup=kb.statistics_config_menu(cortex))
             except ValueError:
                 bot.send_message(m.chat.id, "❌ Неверное значение.")
-        cortex.executor.submit(threaded_save)
+        cortex.executor.submit_to(Lanes.panel, threaded_save)
             
     def set_report_interval(m: Message):
         # УБРАНА ПРОВЕРКА УРОВНЯ ДОСТУПА
@@ -312,12 +357,32 @@ def init_statistics_cp(cortex: Cortex, *args):
                 bot.send_message(m.chat.id, "✅ Интервал авто-отчетов успешно изменен.", reply_markup=kb.statistics_config_menu(cortex))
             except ValueError:
                 bot.send_message(m.chat.id, "❌ Неверное значение.")
-        cortex.executor.submit(threaded_save)
+        cortex.executor.submit_to(Lanes.panel, threaded_save)
+
+    def rebuild_stats(m: Message):
+        if utils.get_user_role(tg.authorized_users, m.from_user.id) != "admin":
+            bot.send_message(m.chat.id, _("admin_only_command"))
+            return
+        progress_msg = bot.send_message(m.chat.id, _("stat_rebuild_started"))
+
+        def threaded_rebuild():
+            start = time.time()
+            try:
+                ledger = get_ledger(cortex)
+                ledger.rebuild_buckets()
+                text = _("stat_rebuild_done", ledger.count(), time.time() - start)
+            except Exception as e:
+                logger.error(f"Ошибка при пересчете агрегатов статистики: {e}")
+                logger.debug("TRACEBACK", exc_info=True)
+                text = _("stat_rebuild_error", utils.escape(str(e)[:100]))
+            bot.edit_message_text(text, progress_msg.chat.id, progress_msg.id)
+        cortex.executor.submit_to(Lanes.stats, threaded_rebuild)
             
     tg.cbq_handler(open_statistics_menu, lambda c: c.data.startswith(f"{CBT.STATS_MENU}:"))
     tg.cbq_handler(open_statistics_config, lambda c: c.data.startswith(f"{CBT.STATS_CONFIG_MENU}:"))
     tg.msg_handler(set_analysis_period, func=lambda m: tg.check_state(m.chat.id, m.from_user.id, f"{CBT.STATS_CONFIG_MENU}:set_period"))
     tg.msg_handler(set_report_interval, func=lambda m: tg.check_state(m.chat.id, m.from_user.id, f"{CBT.STATS_CONFIG_MENU}:set_interval"))
+    tg.msg_handler(rebuild_stats, commands=["rebuild_stats"])
 
 def sales_update_hook(cortex: Cortex, event: NewOrderEvent):
     # Локальное сохранение
@@ -16,6 +16,7 @@ from typing import TYPE_CHECKING
 # from threading import Thread
 
 from Utils.cortex_tools import safe_text
+from Utils.lane_executor import Lanes
 
 if TYPE_CHECKING:
     from cortex import Cortex
@@ -199,7 +200,7 @@ def init_templates_cp(cortex_instance: Cortex, *args):
                 bot.send_message(c.message.chat.id, _("msg_sending_error", node_id, utils.escape(username or "Пользователь")))
 
         # ИЗМЕНЕНИЕ: Используем ThreadPoolExecutor из экземпляра Cortex
-        cortex_instance.executor.submit(threaded_send)
+        cortex_instance.executor.submit_to(Lanes.panel, threaded_send)
 
 
     # Регистрация всех обработчиков
@@ -24,6 +24,7 @@ import time
 from tg_bot import CBT
 from locales.localizer import Localizer
 import Utils.cortex_tools # Добавлен импорт для доступа к утилите
+from Utils.lane_executor import Lanes
 
 localizer = Localizer()
 _ = localizer.translate
@@ -48,6 +49,24 @@ class NotificationTypes:
     critical = "13"
     important_announcement = "14"
 
+
+def parse_coalesce_windows(value: str) -> dict[str, float]:
+    """
+    Парсит окна объединения уведомлений из конфига ([Telegram] coalesceWindows).
+    Формат: "new_message:1.5, new_order:0" -> {"2": 1.5, "4": 0.0}. Некорректные элементы пропускаются.
+    """
+    result = {}
+    for item in value.split(","):
+        name, _sep, seconds = item.partition(":")
+        notification_type = getattr(NotificationTypes, name.strip(), None)
+        if not isinstance(notification_type, str):
+            continue
+        try:
+            result[notification_type] = max(0.0, float(seconds))
+        except ValueError:
+            continue
+    return result
+
 # --- Функции для работы с данными (кэш и хостинг) ---
 def load_authorized_users(base_path: str) -> dict[int, dict[str, str | None]]:
     """
@@ -109,7 +128,7 @@ def save_authorized_users(cortex_instance: "Cortex", users: dict[int, dict]) ->
             json.dump(users, f, ensure_ascii=False, indent=4)
         cortex_instance.save_json_setting("authorized_users", users)
     
-    cortex_instance.executor.submit(threaded_save)
+    cortex_instance.executor.submit_to(Lanes.panel, threaded_save)
 
 
 def save_notification_settings(cortex_instance: "Cortex", settings: dict) -> None:
@@ -121,7 +140,7 @@ def save_notification_settings(cortex_instance: "Cortex", settings: dict) -> Non
             json.dump(settings, f, ensure_ascii=False, indent=4)
         cortex_instance.save_json_setting("notifications", settings)
 
-    cortex_instance.executor.submit(threaded_save)
+    cortex_instance.executor.submit_to(Lanes.panel, threaded_save)
 
 def save_answer_templates(cortex_instance: "Cortex", templates: list[str]) -> None:
     """Сохраняет шаблоны ответов в отдельном потоке."""
@@ -132,7 +151,7 @@ def save_answer_templates(cortex_instance: "Cortex", templates: list[str]) -> No
             json.dump(templates, f, ensure_ascii=False, indent=4)
         cortex_instance.save_json_setting("templates", templates)
 
-    cortex_instance.executor.submit(threaded_save)
+    cortex_instance.executor.submit_to(Lanes.panel, threaded_save)
 
 # --- Вспомогательные функции ---
 def get_user_role(users_dict: dict, user_id: int) -> str | None: